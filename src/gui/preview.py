@@ -0,0 +1,184 @@
+import threading
+import time
+
+import cv2
+import numpy as np
+
+from runtime.buffers import buffer_pool
+
+try:
+    import dearpygui.dearpygui as dpg
+except ImportError:
+    pass
+
+COLOR_CONVERSIONS = {
+    1: cv2.COLOR_GRAY2RGBA,
+    3: cv2.COLOR_BGR2RGBA,
+    4: cv2.COLOR_BGRA2RGBA,
+}
+
+
+class PreviewEngine:
+    fps = 10
+    next_due = 0.0
+    gui = True
+    web_thumbnails = False
+    jpeg_quality = 70
+    textures = {}
+    blank_textures = {}
+    thumbnails = {}
+    pending = {}
+    lock = None
+
+    def __init__(self, fps=10):
+        self.fps = fps
+        self.next_due = 0.0
+        self.gui = True
+        self.web_thumbnails = False
+        self.jpeg_quality = 70
+        self.textures = {}
+        self.blank_textures = {}
+        self.thumbnails = {}
+        self.pending = {}
+        self.lock = threading.Lock()
+
+    def set_fps(self, fps):
+        self.fps = fps if fps and fps > 0 else 10
+
+    def set_outputs(self, gui, web_thumbnails=False, jpeg_quality=70):
+        # Without GUI and web thumbnails, previews are not computed at all
+        self.gui = gui
+        self.web_thumbnails = web_thumbnails
+        self.jpeg_quality = jpeg_quality
+        with self.lock:
+            pending = self.pending
+            self.pending = {}
+            if not web_thumbnails:
+                self.thumbnails = {}
+        for image, _, _ in pending.values():
+            buffer_pool.release(image)
+
+    def is_enabled(self):
+        return self.gui or self.web_thumbnails
+
+    def submit(self, key, image, width, height):
+        # Keep only the latest frame of a node until the next preview update,
+        # with a lease of its buffer
+        if not self.is_enabled():
+            return
+        buffer_pool.lease(image)
+        with self.lock:
+            previous = self.pending.get(key, None)
+            self.pending[key] = (image, width, height)
+        if previous is not None:
+            buffer_pool.release(previous[0])
+
+    def render(self):
+        # Update previews on the preview cadence, called from the main loop so
+        # the pipeline never waits for previews
+        if not self.is_enabled():
+            return 0
+        now = time.monotonic()
+        if now < self.next_due:
+            return 0
+        self.next_due = now + 1.0 / self.fps
+        with self.lock:
+            pending = self.pending
+            self.pending = {}
+        updated = 0
+        for key, (image, width, height) in pending.items():
+            if self.update(key, image, width, height):
+                updated += 1
+            buffer_pool.release(image)
+        return updated
+
+    def update(self, key, image, width, height):
+        if self.web_thumbnails:
+            self.update_thumbnail(key, image, width, height)
+        if not self.gui:
+            return False
+        if not dpg.does_item_exist(key + ":image"):
+            return False
+        if not dpg.is_item_visible(key + ":image"):
+            return False
+        texture = self.get_image_texture(image, width, height, key)
+        dpg.set_value(key + ":texture", texture)
+        return True
+
+    def update_thumbnail(self, key, image, width, height):
+        # JPEG thumbnail of the node preview for the Web API
+        channels = image.shape[2] if image.ndim == 3 else 1
+        resize_buffer = buffer_pool.acquire(
+            (height, width, channels) if channels > 1 else (height, width),
+            image.dtype,
+        )
+        cv2.resize(image, dsize=(width, height), dst=resize_buffer)
+        result, thumbnail = cv2.imencode(
+            ".jpg", resize_buffer, [cv2.IMWRITE_JPEG_QUALITY, self.jpeg_quality]
+        )
+        buffer_pool.release(resize_buffer)
+        if result:
+            with self.lock:
+                self.thumbnails[key] = thumbnail.tobytes()
+
+    def get_thumbnail(self, key):
+        return self.thumbnails.get(key, None)
+
+    def get_blank_texture(self, width, height):
+        # Black RGBA float texture, built once per size and never written
+        blank_texture = self.blank_textures.get((width, height), None)
+        if blank_texture is None:
+            blank_texture = np.zeros((height, width, 4), dtype=np.float32)
+            blank_texture[:, :, 3] = 1.0
+            blank_texture = blank_texture.ravel()
+            with self.lock:
+                blank_texture = self.blank_textures.setdefault(
+                    (width, height), blank_texture
+                )
+        return blank_texture
+
+    def get_texture_buffer(self, key, width, height):
+        # One float32 RGBA buffer per node, reused on every refresh
+        texture = self.textures.get(key, None)
+        if texture is None or texture.shape != (height, width, 4):
+            texture = np.empty((height, width, 4), dtype=np.float32)
+            with self.lock:
+                self.textures[key] = texture
+        return texture
+
+    def get_image_texture(self, image, width, height, key=None):
+        # Resize a BGR, BGRA or gray image for Dear PyGui texture
+        if key is None:
+            texture = np.empty((height, width, 4), dtype=np.float32)
+        else:
+            texture = self.get_texture_buffer(key, width, height)
+        channels = image.shape[2] if image.ndim == 3 else 1
+        resize_buffer = buffer_pool.acquire(
+            (height, width, channels) if channels > 1 else (height, width),
+            image.dtype,
+        )
+        rgba_buffer = buffer_pool.acquire((height, width, 4), image.dtype)
+        cv2.resize(image, dsize=(width, height), dst=resize_buffer)
+        cv2.cvtColor(
+            resize_buffer,
+            COLOR_CONVERSIONS.get(channels, cv2.COLOR_BGR2RGBA),
+            dst=rgba_buffer,
+        )
+
+        # Convert to float32 and normalize in a single pass into the texture
+        np.multiply(rgba_buffer, np.float32(1.0 / 255.0), out=texture, casting="unsafe")
+        buffer_pool.release(resize_buffer)
+        buffer_pool.release(rgba_buffer)
+        return texture.ravel()
+
+    def release(self, key):
+        with self.lock:
+            self.textures.pop(key, None)
+            self.thumbnails.pop(key, None)
+            pending = self.pending.pop(key, None)
+        if pending is not None:
+            buffer_pool.release(pending[0])
+
+
+# Node preview textures of the process
+preview_engine = PreviewEngine()
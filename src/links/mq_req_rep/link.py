@@ -36,6 +36,12 @@ async def server(self, edge_ai_pipeline, **kwargs):
                 edge_ai_pipeline.import_pipeline(request["payload"])
             elif request["method"] == "export_pipeline":
                 response = edge_ai_pipeline.export_pipeline()
+            elif request["method"] == "get_pipeline_stats":
+                response = edge_ai_pipeline.get_pipeline_stats()
+            elif request["method"] == "get_model_stats":
+                response = edge_ai_pipeline.get_model_stats()
+            elif request["method"] == "get_thumbnail":
+                response = edge_ai_pipeline.get_thumbnail(request["payload"])
             await socket.send_json(response)
 
     async def client(self, **kwargs):
@@ -45,6 +51,10 @@ async def client(self, **kwargs):
         socket.connect("tcp://localhost:%s" % kwargs["port"])
         if "message" in kwargs:
             await socket.send_json(kwargs["message"])
+            if "timeout" in kwargs and await socket.poll(kwargs["timeout"]) == 0:
+                self.logger.warning("No reply from port {}".format(kwargs["port"]))
+                socket.close(linger=0)
+                return None
             reply = await socket.recv_json()
             self.logger.debug("Received reply: {}".format(reply))
             return reply
@@ -0,0 +1,232 @@
+#!/usr/bin/env python
+import argparse
+import json
+import logging
+import struct
+import time
+
+import cv2 as cv
+import numpy as np
+import zmq
+
+# Frame header: version, encoding, channels, height, width, sequence, timestamp
+HEADER = struct.Struct("!BBBHHQd")
+HEADER_VERSION = 1
+ENCODING_NONE = 0
+ENCODING_RAW = 1
+ENCODING_JPEG = 2
+
+
+def _json_default(value):
+    # Numpy scalars and arrays from inference results
+    if hasattr(value, "tolist"):
+        return value.tolist()
+    return str(value)
+
+
+def encode_frame(frame, message, sequence, encoding=ENCODING_JPEG, jpeg_quality=90):
+    # Multipart payload: [header, image, message]
+    height, width, channels = 0, 0, 0
+    payload = b""
+    if frame is not None:
+        height, width = frame.shape[:2]
+        channels = frame.shape[2] if frame.ndim == 3 else 1
+        if encoding == ENCODING_JPEG:
+            _, image = cv.imencode(
+                ".jpg", frame, [int(cv.IMWRITE_JPEG_QUALITY), jpeg_quality]
+            )
+            payload = image.tobytes()
+        else:
+            payload = np.ascontiguousarray(frame, dtype=np.uint8).tobytes()
+    else:
+        encoding = ENCODING_NONE
+    header = HEADER.pack(
+        HEADER_VERSION, encoding, channels, height, width, sequence, time.time()
+    )
+    message_bytes = (
+        b""
+        if message is None
+        else json.dumps(message, default=_json_default).encode("utf-8")
+    )
+    return [header, payload, message_bytes]
+
+
+def decode_frame(parts, logger=logging.getLogger(__name__)):
+    # Return frame, message, sequence and sender timestamp, or None when the
+    # multipart message is malformed
+    if len(parts) != 3 or len(parts[0]) != HEADER.size:
+        logger.warning(
+            "Drop malformed frame of {} parts, header {} bytes".format(
+                len(parts), len(parts[0]) if parts else 0
+            )
+        )
+        return None
+    header, payload, message_bytes = parts
+    version, encoding, channels, height, width, sequence, timestamp = HEADER.unpack(
+        header
+    )
+    if version != HEADER_VERSION:
+        logger.warning("Drop frame of header version {}".format(version))
+        return None
+    frame = None
+    if encoding == ENCODING_JPEG:
+        frame = cv.imdecode(np.frombuffer(payload, dtype=np.uint8), cv.IMREAD_COLOR)
+        if frame is None:
+            logger.warning("Drop frame #{}, JPEG decode failed".format(sequence))
+            return None
+    elif encoding == ENCODING_RAW:
+        shape = (height, width, channels) if channels > 1 else (height, width)
+        if len(payload) != height * width * max(channels, 1):
+            logger.warning("Drop frame #{}, RAW size mismatch".format(sequence))
+            return None
+        frame = np.frombuffer(payload, dtype=np.uint8).reshape(shape)
+    message = None
+    if len(message_bytes) > 0:
+        try:
+            message = json.loads(bytes(message_bytes).decode("utf-8"))
+        except ValueError as e:
+            logger.warning("Drop frame #{}, bad message: {}".format(sequence, e))
+            return None
+    return frame, message, sequence, timestamp
+
+
+class ZMQFrameLink:
+    context = zmq.Context()
+    patterns = {
+        "PUSH/PULL": (zmq.PUSH, zmq.PULL),
+        "PUB/SUB": (zmq.PUB, zmq.SUB),
+    }
+    encodings = {
+        "JPEG": ENCODING_JPEG,
+        "RAW": ENCODING_RAW,
+    }
+    socket = None
+    endpoint = None
+    pattern = None
+    encoding = None
+    jpeg_quality = None
+    sequence = 0
+    is_connected = False
+    logger = None
+
+    def __init__(
+        self,
+        endpoint,
+        pattern="PUSH/PULL",
+        encoding="JPEG",
+        jpeg_quality=90,
+        logger=logging.getLogger(__name__),
+    ):
+        self.endpoint = endpoint
+        self.pattern = pattern
+        self.encoding = self.encodings.get(encoding, ENCODING_JPEG)
+        self.jpeg_quality = jpeg_quality
+        self.logger = logger
+
+    def bind(self):
+        # Sender side, never blocks the pipeline when the receiver is slow
+        sender_type, _ = self.patterns[self.pattern]
+        self.socket = self.context.socket(sender_type)
+        self.socket.setsockopt(zmq.SNDHWM, 2)
+        self.socket.setsockopt(zmq.LINGER, 0)
+        try:
+            self.socket.bind(self.endpoint)
+            self.is_connected = True
+        except zmq.ZMQError:
+            self.release()
+
+    def connect(self):
+        # Receiver side
+        _, receiver_type = self.patterns[self.pattern]
+        self.socket = self.context.socket(receiver_type)
+        self.socket.setsockopt(zmq.RCVHWM, 2)
+        self.socket.setsockopt(zmq.LINGER, 0)
+        if receiver_type == zmq.SUB:
+            self.socket.setsockopt(zmq.SUBSCRIBE, b"")
+        try:
+            self.socket.connect(self.endpoint)
+            self.is_connected = True
+        except zmq.ZMQError:
+            self.release()
+
+    def release(self):
+        if self.socket is not None:
+            self.socket.close()
+        self.socket = None
+        self.is_connected = False
+
+    def send(self, frame, message, sequence=None):
+        # Use the caller sequence when the frame already has one
+        if not self.is_connected:
+            return False
+        if sequence is None:
+            sequence = self.sequence
+            self.sequence += 1
+        parts = encode_frame(frame, message, sequence, self.encoding, self.jpeg_quality)
+        try:
+            self.socket.send_multipart(parts, flags=zmq.NOBLOCK, copy=False)
+        except zmq.Again:
+            return False
+        return True
+
+    def receive_latest(self):
+        # Drain pending frames and keep only the newest one
+        parts = None
+        while self.is_connected:
+            try:
+                parts = self.socket.recv_multipart(flags=zmq.NOBLOCK)
+            except zmq.Again:
+                break
+        if parts is None:
+            return None
+        return decode_frame(parts, self.logger)
+
+
+if __name__ == "__main__":
+    # Arguments
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--mode", choices=["send", "receive"], default="send")
+    parser.add_argument("--endpoint", default="tcp://127.0.0.1:5560")
+    parser.add_argument("--pattern", choices=["PUSH/PULL", "PUB/SUB"])
+    parser.add_argument("--encoding", choices=["JPEG", "RAW"], default="JPEG")
+    parser.add_argument("--count", help="Frame Count", type=int, default=100)
+    args = parser.parse_args()
+    pattern = args.pattern or "PUSH/PULL"
+
+    # Logger
+    logging.basicConfig(
+        level=logging.DEBUG,
+        format="%(asctime)s- %(name)s - %(levelname)s - %(message)s",
+    )
+    logger = logging.getLogger(__name__)
+
+    # Link service
+    service = ZMQFrameLink(args.endpoint, pattern, args.encoding, logger=logger)
+    if args.mode == "send":
+        service.bind()
+        for i in range(args.count):
+            frame = np.full((480, 640, 3), i % 256, dtype=np.uint8)
+            sent = service.send(frame, [{"type": "test", "count": i}])
+            logger.info("sent #{}: {}".format(i, sent))
+            time.sleep(1 / 30)
+    else:
+        service.connect()
+        received = 0
+        while received < args.count:
+            result = service.receive_latest()
+            if result is None:
+                time.sleep(0.005)
+                continue
+            frame, message, sequence, timestamp = result
+            received += 1
+            logger.info(
+                "received #{} {} latency={:.1f}ms {}".format(
+                    sequence,
+                    frame.shape if frame is not None else None,
+                    (time.time() - timestamp) * 1000,
+                    message,
+                )
+            )
+
+    # Release
+    service.release()
@@ -3,7 +3,6 @@
 
 import argparse
 import asyncio
-import graphlib
 import json
 import logging
 import logging.config
@@ -18,29 +17,32 @@
 import numpy as np
 
 from gui.constants import tag
+from gui.preview import preview_engine
 from gui.studio import WeDXStudio
 from links.mq_req_rep.link import MessageQueueReqRep
 from managers.edge_ai_pipeline import EdgeAIPipeline
 from managers.user_preferences import UserPreferences
+from runtime.batching import inference_batcher
+from runtime.buffers import buffer_pool
+from runtime.clock import TickClock
+from runtime.executor import NodeExecutor
+from runtime.pipelined import PIPELINED, PipelinedScheduler
+from runtime.push import PUSH, SCHEDULER_MODES, PushScheduler
+from runtime.rate import RateGate
+from runtime.registry import model_registry
+from runtime.sessions import pin_cpus, session_factory
+from runtime.stats import PipelineStats
 from servers.netron import NetronServer
 from servers.webapi import run_api
 
 
-async def refresh_frame(edge_ai_pipeline, dpg_node_tag, node_frames, node_messages):
-    if dpg_node_tag not in node_frames:
-        node_frames[dpg_node_tag] = None
-    if dpg_node_tag not in node_messages:
-        node_messages[dpg_node_tag] = None
-    node_id, node_name = dpg_node_tag.split(":")
-    node_instance = edge_ai_pipeline.get_node_instance(node_name)
-    frame, message = await node_instance.refresh(
-        node_id,
-        edge_ai_pipeline.node_link_graph.get(dpg_node_tag, []),
-        node_frames,
-        node_messages,
-    )
-    node_frames[dpg_node_tag] = frame
-    node_messages[dpg_node_tag] = message
+async def refresh_frame(
+    executor, rate_gate, node_step, node_frames, node_messages, deadline
+):
+    frame, message = await executor.run(node_step, node_frames, node_messages, deadline)
+    rate_gate.set_output(node_step, frame, message)
+    node_frames[node_step.node_tag] = frame
+    node_messages[node_step.node_tag] = message
     await asyncio.sleep(0)
 
 
@@ -53,6 +55,11 @@ async def main():
     parser.add_argument("--no_webapi", action="store_true")
     parser.add_argument("--no_webapp", action="store_true")
     parser.add_argument("--iotedge", action="store_true")
+    parser.add_argument("--scheduler", choices=SCHEDULER_MODES)
+    parser.add_argument("--pipeline", help="Import a .wedx pipeline at startup")
+    parser.add_argument("--shm_name", default="wedx_shm")
+    parser.add_argument("--mq_port", type=int, default=5555)
+    parser.add_argument("--cpus", help="Pin this process to CPUs, e.g. 0,1 or 0-3")
     args = parser.parse_args()
 
     # Set window settings
@@ -65,6 +72,10 @@ async def main():
     logger = logging.getLogger(__name__)
     logger.debug("settings.json=" + json.dumps(settings))
 
+    # Pin process to CPU cores
+    if args.cpus:
+        pin_cpus(args.cpus, logger)
+
     # Detect all connected usb cameras
     valid_usb_cameras = []
     caps = []
@@ -94,17 +105,23 @@ async def main():
         settings["webapp"] = False
     if args.iotedge:
         settings["iotedge"] = True
+    if args.scheduler:
+        settings["scheduler_mode"] = args.scheduler
+    settings["shm_name"] = args.shm_name
+    settings["mq_port"] = args.mq_port
     shm_shape = np.zeros(
         (settings["video_streaming_height"], settings["video_streaming_width"], 3)
     ).astype(np.uint8)
     try:
         created_shm = shared_memory.SharedMemory(
-            name="wedx_shm", create=True, size=shm_shape.nbytes
+            name=settings["shm_name"], create=True, size=shm_shape.nbytes
         )
+        owns_shm = True
     except FileExistsError:
         created_shm = shared_memory.SharedMemory(
-            name="wedx_shm", create=False, size=shm_shape.nbytes
+            name=settings["shm_name"], create=False, size=shm_shape.nbytes
         )
+        owns_shm = args.shm_name == "wedx_shm"
     settings["shm"] = np.ndarray(
         shm_shape.shape, dtype=np.uint8, buffer=created_shm.buf
     )
@@ -122,7 +139,17 @@ async def main():
                     settings["netron_port"],
                 )
             ),
-            kwargs={"host": "0.0.0.0", "port": settings["webapi_port"]},
+            kwargs={
+                "host": "0.0.0.0",
+                "port": settings["webapi_port"],
+                "workers": [
+                    {
+                        "name": "wedx",
+                        "mq_port": settings["mq_port"],
+                        "shm_name": settings["shm_name"],
+                    }
+                ],
+            },
         )
         proc["webapi"].start()
         settings["netron"] = NetronServer(settings)
@@ -161,7 +188,9 @@ async def main():
 
     # Create Message Queue
     settings["mq"] = MessageQueueReqRep()
-    asyncio.create_task(settings["mq"].server(edge_ai_pipeline))
+    asyncio.create_task(
+        settings["mq"].server(edge_ai_pipeline, port=settings["mq_port"])
+    )
 
     # Create Viewport Menu Bar
     wedx.viewport_menu_bar()
@@ -175,6 +204,11 @@ async def main():
     # Create User Preferences widgets
     user_preferences.create_gui_widgets()
 
+    # Import pipeline file
+    if args.pipeline:
+        with open(args.pipeline) as fp:
+            edge_ai_pipeline.import_pipeline(json.load(fp))
+
     # Setup Dear PyGui
     wedx.setup_dearpygui()
 
@@ -182,47 +216,86 @@ async def main():
     wedx.show_viewport()
 
     # Updating nodes
+    model_registry.set_budget(settings["model_cache_budget_mb"] * 1024 * 1024)
+    inference_batcher.set_window(settings["batch_window_ms"] / 1000.0)
+    session_factory.set_profile(settings["onnxruntime"])
+    session_factory.set_cpu_affinity(settings["cpu_affinity"])
+    preview_engine.set_fps(settings["preview_fps"])
+    preview_engine.set_outputs(
+        settings["gui"], settings["web_thumbnails"], settings["web_thumbnail_quality"]
+    )
+    clock = TickClock(settings["fps"])
+    settings["pipeline_stats"] = PipelineStats()
+    settings["pipeline_stats"].clock = clock
+    executor = NodeExecutor(settings, settings["pipeline_stats"])
+    rate_gate = RateGate()
+    pipelined = PipelinedScheduler(
+        settings, executor, rate_gate, settings["pipeline_stats"]
+    )
+    push = PushScheduler(settings, executor, rate_gate, settings["pipeline_stats"])
     node_frames = {}
     node_messages = {}
-    prev_frame_time = 0
-    new_frame_time = 0
     while wedx.is_dearpygui_running():
-        await asyncio.sleep(0)
         if settings["init"]:
             node_frames = {}
             node_messages = {}
-            prev_frame_time = 0
-            new_frame_time = 0
+            clock.reset()
+            rate_gate.reset()
+            executor.stamper.reset()
+            settings["pipeline_stats"].reset()
             settings["init"] = False
-        new_frame_time = time.time()
-        time_elapsed = new_frame_time - prev_frame_time
-        if time_elapsed > 1.0 / settings["fps"]:
-            prev_frame_time = new_frame_time
+        clock.set_fps(settings["fps"])
+        if clock.is_due():
+            clock.mark_tick()
             if settings["state"] == "active":
-                graph = edge_ai_pipeline.node_refresh_graph
-                ts = graphlib.TopologicalSorter(graph)
-                ts.prepare()
-                while ts.is_active():
-                    ready_nodes = ts.get_ready()
-                    tasks = []
-                    for dpg_node_tag in ready_nodes:
-                        tasks.append(
-                            asyncio.create_task(
-                                refresh_frame(
-                                    edge_ai_pipeline,
-                                    dpg_node_tag,
-                                    node_frames,
-                                    node_messages,
+                executor.prepare(edge_ai_pipeline.execution_plan)
+                inference_batcher.set_plan(edge_ai_pipeline.execution_plan)
+                if settings["scheduler_mode"] == PIPELINED:
+                    pipelined.prepare(edge_ai_pipeline.execution_plan)
+                    pipelined.tick()
+                elif settings["scheduler_mode"] == PUSH:
+                    push.prepare(
+                        edge_ai_pipeline.execution_plan,
+                        edge_ai_pipeline.node_refresh_graph,
+                    )
+                else:
+                    plan = edge_ai_pipeline.execution_plan
+                    deadline = time.monotonic() + 1.0 / settings["fps"]
+                    for level, release_level in zip(plan.levels, plan.release_levels):
+                        tasks = []
+                        for node_step in rate_gate.get_due_steps(
+                            level, clock.tick_count, node_frames, node_messages
+                        ):
+                            tasks.append(
+                                asyncio.create_task(
+                                    refresh_frame(
+                                        executor,
+                                        rate_gate,
+                                        node_step,
+                                        node_frames,
+                                        node_messages,
+                                        deadline,
+                                    )
                                 )
                             )
-                        )
-                    await asyncio.wait(tasks)
-                    ts.done(*ready_nodes)
-
-        # Render Dear PyGui frame
-        wedx.render_dearpygui_frame()
+                        if len(tasks) > 0:
+                            await asyncio.wait(tasks)
+                        # Return frames whose last consumer has run to the pool
+                        for node_tag in release_level:
+                            buffer_pool.release(node_frames.pop(node_tag, None))
+
+        # Render Dear PyGui frame, or sleep until the next tick without GUI
+        preview_engine.render()
+        if settings["gui"]:
+            wedx.render_dearpygui_frame()
+            await asyncio.sleep(0)
+        else:
+            await clock.wait()
 
     # Release nodes
+    pipelined.stop()
+    push.stop()
+    executor.shutdown()
     node_list = edge_ai_pipeline.get_node_list()
     for node_id_name in node_list:
         node_id, node_name = node_id_name.split(":")
@@ -247,8 +320,10 @@ async def main():
     if settings["netron"]:
         settings["netron"].stop()
 
-    # Release shared memory
-    created_shm.unlink()
+    # Release shared memory, a supervisor owns the segments of its workers
+    created_shm.close()
+    if owns_shm:
+        created_shm.unlink()
 
 
 if __name__ == "__main__":
@@ -1,5 +1,7 @@
+import base64
 import copy
 import datetime
+import graphlib
 import json
 import logging
 import os
@@ -10,6 +12,12 @@
 from importlib import import_module
 
 from gui.constants import tag
+from gui.preview import preview_engine
+from runtime.backpressure import BACKPRESSURE_POLICIES
+from runtime.executor import EXECUTOR_MODES, INLINE, get_node_timeout
+from runtime.plan import EMPTY_PLAN, build_execution_plan
+from runtime.rate import DEFAULT_RATE, get_node_rate
+from runtime.registry import model_registry
 from version import __version__
 
 try:
@@ -28,6 +36,11 @@ class EdgeAIPipeline:
     node_links = []
     node_refresh_graph = {}
     node_link_graph = {}
+    node_executors = {}
+    node_rates = {}
+    node_input_policies = {}
+    node_timeouts = {}
+    execution_plan = EMPTY_PLAN
 
     def __init__(self, settings, logger=logging.getLogger(__name__)):
         self.settings = settings
@@ -402,6 +415,55 @@ def set_node_graph(self, node_tags, node_links):
                 node_refresh_graph[node_tag] = []
         self.node_refresh_graph = node_refresh_graph
         self.node_link_graph = node_link_graph
+        try:
+            self.execution_plan = build_execution_plan(
+                node_refresh_graph,
+                node_link_graph,
+                self.get_node_instance,
+                self.node_executors,
+                self.node_rates,
+                self.node_input_policies,
+                self.node_timeouts,
+                self.settings.get("node_timeout", None),
+            )
+        except graphlib.CycleError as e:
+            self.logger.error("Pipeline has a cycle: {}".format(e.args[1]))
+            self.execution_plan = EMPTY_PLAN
+
+    def set_node_executor(self, dpg_node_tag, executor):
+        if executor not in EXECUTOR_MODES:
+            self.logger.warning(
+                "Unknown executor '{}' for {}, use '{}'".format(
+                    executor, dpg_node_tag, INLINE
+                )
+            )
+            executor = INLINE
+        self.node_executors[dpg_node_tag] = executor
+
+    def set_node_input_policy(self, dpg_node_tag, input_policy):
+        if input_policy is None:
+            self.node_input_policies.pop(dpg_node_tag, None)
+        elif input_policy not in BACKPRESSURE_POLICIES:
+            self.logger.warning(
+                "Unknown input policy '{}' for {}".format(input_policy, dpg_node_tag)
+            )
+        else:
+            self.node_input_policies[dpg_node_tag] = input_policy
+
+    def get_pipeline_stats(self):
+        if "pipeline_stats" not in self.settings:
+            return {}
+        return self.settings["pipeline_stats"].get_stats()
+
+    def get_model_stats(self):
+        return model_registry.get_stats()
+
+    def get_thumbnail(self, node_tag):
+        # Base64 JPEG of the node preview, None if not available
+        thumbnail = preview_engine.get_thumbnail(node_tag)
+        if thumbnail is None:
+            return None
+        return base64.b64encode(thumbnail).decode("ascii")
 
     def callback_new_pipeline(self, sender, app_data, user_data):
         dpg.configure_item("modal_new_pipeline", show=False)
@@ -410,6 +472,7 @@ def callback_new_pipeline(self, sender, app_data, user_data):
     def new_pipeline(self):
         self.node_refresh_graph = {}
         self.node_link_graph = {}
+        self.execution_plan = EMPTY_PLAN
         for dpg_node_tag in self.node_tags:
             node_id, node_name = dpg_node_tag.split(":")
             node = self.menu_instances[node_name]
@@ -420,6 +483,10 @@ def new_pipeline(self):
         self.last_pos = None
         self.node_tags = []
         self.node_links = []
+        self.node_executors = {}
+        self.node_rates = {}
+        self.node_input_policies = {}
+        self.node_timeouts = {}
         self.node_id = 0
         self.settings["init"] = True
 
@@ -437,6 +504,12 @@ def export_pipeline(self):
             node_id, node_name = dpg_node_tag.split(":")
             node = self.menu_instances[node_name]
             params = node.get_export_params(node_id)
+            params["executor"] = self.node_executors.get(dpg_node_tag, INLINE)
+            node_rate = self.node_rates.get(dpg_node_tag, DEFAULT_RATE)
+            params["target_fps"] = node_rate.target_fps
+            params["tick_divisor"] = node_rate.divisor
+            params["input_policy"] = self.node_input_policies.get(dpg_node_tag, None)
+            params["timeout"] = self.node_timeouts.get(dpg_node_tag, None)
             export_data[dpg_node_tag] = {
                 "id": str(node_id),
                 "name": str(node_name),
@@ -470,6 +543,20 @@ def import_pipeline(self, import_data):
                     tag["node_editor"]["edge_ai_pipeline"], node_id, pos=position
                 )
                 node.set_import_params(node_id, import_data[dpg_node_tag]["params"])
+                self.set_node_executor(
+                    dpg_node_tag,
+                    import_data[dpg_node_tag]["params"].get("executor", INLINE),
+                )
+                self.node_rates[dpg_node_tag] = get_node_rate(
+                    import_data[dpg_node_tag]["params"]
+                )
+                self.set_node_input_policy(
+                    dpg_node_tag,
+                    import_data[dpg_node_tag]["params"].get("input_policy", None),
+                )
+                timeout = get_node_timeout(import_data[dpg_node_tag]["params"])
+                if timeout is not None:
+                    self.node_timeouts[dpg_node_tag] = timeout
             self.node_tags = import_data["node_tags"]
             self.node_links = import_data["node_links"]
             for node_link in self.node_links:
@@ -493,8 +580,12 @@ def callback_mv_key_del(self, sender, app_data, user_data):
             dpg_node_tag = dpg.get_item_alias(item_id)
             node_id, node_name = dpg_node_tag.split(":")
             node_instance = self.get_node_instance(node_name)
-            node_instance.close(node_id)
+            node_instance.delete(node_id)
             self.node_tags.remove(dpg_node_tag)
+            self.node_executors.pop(dpg_node_tag, None)
+            self.node_rates.pop(dpg_node_tag, None)
+            self.node_input_policies.pop(dpg_node_tag, None)
+            self.node_timeouts.pop(dpg_node_tag, None)
             copy_node_links = copy.deepcopy(self.node_links)
             for link_info in copy_node_links:
                 source_node = link_info[0].split(":")[:2]
@@ -504,7 +595,6 @@ def callback_mv_key_del(self, sender, app_data, user_data):
                 if source_node == dpg_node_tag or destination_node == dpg_node_tag:
                     self.node_links.remove(link_info)
             self.set_node_graph(self.node_tags, self.node_links)
-            dpg.delete_item(item_id)
 
     def get_node_id(self):
         return self.node_id
@@ -36,6 +36,9 @@ def __call__(self, image):
                 }
             )
         for text, bbox in zip(texts, bboxes):
+            # Copy on write, the input frame is shared read-only
+            if not image.flags.writeable:
+                image = image.copy()
             cv.line(
                 image,
                 (bbox[0][0], bbox[0][1]),
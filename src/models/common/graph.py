@@ -0,0 +1,93 @@
+import numpy as np
+
+try:
+    import onnx
+    from onnx import TensorProto, helper, numpy_helper
+except ImportError:
+    pass
+
+
+def get_np_dtype(elem_type):
+    if hasattr(helper, "tensor_dtype_to_np_dtype"):
+        return helper.tensor_dtype_to_np_dtype(elem_type)
+    return onnx.mapping.TENSOR_TYPE_TO_NP_TYPE[elem_type]
+
+
+def fold_preprocess(model, layout="NCHW", swap_rb=False, scale=None):
+    # Prepend the preprocessing to the graph of an image model, its input
+    # becomes a raw uint8 NHWC (BGR) frame of the same size. The channel swap
+    # and transpose run on uint8 before the cast
+    graph = model.graph
+    initializers = set(initializer.name for initializer in graph.initializer)
+    inputs = [value for value in graph.input if value.name not in initializers]
+    if len(inputs) != 1:
+        raise ValueError("Model has {} inputs, expected one".format(len(inputs)))
+    graph_input = inputs[0]
+    tensor_type = graph_input.type.tensor_type
+    dims = [
+        dim.dim_value if dim.HasField("dim_value") else dim.dim_param or None
+        for dim in tensor_type.shape.dim
+    ]
+    if len(dims) != 4:
+        raise ValueError("Input of rank {}, expected 4".format(len(dims)))
+    if layout == "NCHW":
+        dims = [dims[0], dims[2], dims[3], dims[1]]
+    name = graph_input.name
+    prefix = name + "_preprocess"
+    channel_axis = 3
+    nodes = []
+    value = prefix + "_raw"
+    if swap_rb:
+        graph.initializer.append(
+            numpy_helper.from_array(
+                np.array([2, 1, 0], dtype=np.int64), prefix + "_channels"
+            )
+        )
+        nodes.append(
+            helper.make_node(
+                "Gather",
+                [value, prefix + "_channels"],
+                [prefix + "_swapped"],
+                axis=channel_axis,
+            )
+        )
+        value = prefix + "_swapped"
+    if layout == "NCHW":
+        nodes.append(
+            helper.make_node(
+                "Transpose", [value], [prefix + "_transposed"], perm=[0, 3, 1, 2]
+            )
+        )
+        value = prefix + "_transposed"
+    cast_output = name if scale is None else prefix + "_cast"
+    nodes.append(
+        helper.make_node("Cast", [value], [cast_output], to=tensor_type.elem_type)
+    )
+    if scale is not None:
+        graph.initializer.append(
+            numpy_helper.from_array(
+                np.array(scale, dtype=get_np_dtype(tensor_type.elem_type)),
+                prefix + "_scale",
+            )
+        )
+        nodes.append(helper.make_node("Mul", [cast_output, prefix + "_scale"], [name]))
+
+    # Replace the input, every consumer of it now reads the folded output
+    index = list(graph.input).index(graph_input)
+    graph.input.remove(graph_input)
+    graph.input.insert(
+        index, helper.make_tensor_value_info(prefix + "_raw", TensorProto.UINT8, dims)
+    )
+    for node in reversed(nodes):
+        graph.node.insert(0, node)
+    onnx.checker.check_model(model)
+    return model
+
+
+def fold_model(model_path, output_path=None, **preprocess):
+    # Save the folded model, or return it serialized without an output path
+    model = fold_preprocess(onnx.load(model_path), **preprocess)
+    if output_path is None:
+        return model.SerializeToString()
+    onnx.save(model, output_path)
+    return output_path
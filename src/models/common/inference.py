@@ -0,0 +1,18 @@
+import numpy as np
+
+
+def run_batches(session, input_name, inputs, batch_size=None):
+    # First output of a session for a batch of inputs. A model exported with a
+    # fixed batch size runs in chunks of it, the last chunk is padded with
+    # copies of its last input and the padded outputs are dropped
+    if batch_size is None or batch_size == len(inputs):
+        return session.run(None, {input_name: inputs})[0]
+    outputs = []
+    for index in range(0, len(inputs), batch_size):
+        chunk = inputs[index : index + batch_size]
+        count = len(chunk)
+        if count < batch_size:
+            padding = np.repeat(chunk[-1:], batch_size - count, axis=0)
+            chunk = np.concatenate((chunk, padding))
+        outputs.append(session.run(None, {input_name: chunk})[0][:count])
+    return np.concatenate(outputs)
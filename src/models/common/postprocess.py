@@ -0,0 +1,144 @@
+import functools
+
+import cv2 as cv
+import numpy as np
+
+# Box decoding and NMS shared by the detection models. Every detector returns
+# (boxes, scores, class_ids): boxes as x1, y1, x2, y2 float32 rows, scores as
+# float32 and class ids as int64, sorted by descending score
+
+
+@functools.lru_cache(maxsize=16)
+def get_grids(input_shape, strides):
+    # Cell offsets and strides of an anchor-free (YOLOX) output per input shape
+    grids = []
+    expanded_strides = []
+    for stride in strides:
+        hsize, wsize = input_shape[0] // stride, input_shape[1] // stride
+        xv, yv = np.meshgrid(np.arange(wsize), np.arange(hsize))
+        grids.append(np.stack((xv, yv), 2).reshape(-1, 2))
+        expanded_strides.append(np.full((hsize * wsize, 1), stride))
+    grids = np.concatenate(grids).astype(np.float32)
+    expanded_strides = np.concatenate(expanded_strides).astype(np.float32)
+    grids.flags.writeable = False
+    expanded_strides.flags.writeable = False
+    return grids, expanded_strides
+
+
+@functools.lru_cache(maxsize=16)
+def get_anchor_grids(height, width, anchors):
+    # Cell offsets and anchor sizes of a YOLOv2 (Custom Vision) output grid
+    anchors = np.array(anchors, dtype=np.float32)
+    grid_x = np.arange(width, dtype=np.float32)[np.newaxis, :, np.newaxis]
+    grid_y = np.arange(height, dtype=np.float32)[:, np.newaxis, np.newaxis]
+    anchor_w = anchors[:, 0][np.newaxis, np.newaxis, :] / width
+    anchor_h = anchors[:, 1][np.newaxis, np.newaxis, :] / height
+    for grid in (grid_x, grid_y, anchor_w, anchor_h):
+        grid.flags.writeable = False
+    return grid_x, grid_y, anchor_w, anchor_h
+
+
+def decode_yolox(predictions, input_shape, strides=(8, 16, 32)):
+    # Boxes in input pixels and class scores of one YOLOX output
+    grids, expanded_strides = get_grids(tuple(input_shape), tuple(strides))
+    centers = (predictions[:, :2] + grids) * expanded_strides
+    sizes = np.exp(predictions[:, 2:4]) * expanded_strides
+    boxes = np.concatenate((centers - sizes / 2.0, centers + sizes / 2.0), axis=1)
+    scores = predictions[:, 4:5] * predictions[:, 5:]
+    return boxes, scores
+
+
+def decode_yolo_v2(outputs, anchors):
+    # Normalized boxes and class probabilities of one (C, H, W) YOLOv2 output
+    outputs = outputs.transpose((1, 2, 0))
+    height, width, channels = outputs.shape
+    num_anchors = len(anchors)
+    num_classes = channels // num_anchors - 5
+    outputs = outputs.reshape((height, width, num_anchors, -1))
+    grid_x, grid_y, anchor_w, anchor_h = get_anchor_grids(
+        height, width, tuple(map(tuple, anchors))
+    )
+    w = np.exp(outputs[..., 2]) * anchor_w
+    h = np.exp(outputs[..., 3]) * anchor_h
+    x = (outputs[..., 0] + grid_x) / width - w / 2
+    y = (outputs[..., 1] + grid_y) / height - h / 2
+    boxes = np.stack((x, y, x + w, y + h), axis=-1).reshape(-1, 4)
+    objectness = logistic(outputs[..., 4, np.newaxis])
+    class_probs = outputs[..., 5:]
+    class_probs = np.exp(class_probs - np.amax(class_probs, axis=3)[..., np.newaxis])
+    class_probs = (
+        class_probs / np.sum(class_probs, axis=3)[..., np.newaxis] * objectness
+    ).reshape(-1, num_classes)
+    return boxes, class_probs
+
+
+def logistic(x):
+    return np.where(x > 0, 1 / (1 + np.exp(-x)), np.exp(x) / (1 + np.exp(x)))
+
+
+def batched_nms(
+    boxes,
+    scores,
+    class_ids=None,
+    iou_threshold=0.45,
+    score_threshold=0.0,
+    max_detections=0,
+):
+    # Indices of the boxes kept by NMS, sorted by descending score. Boxes only
+    # suppress boxes of the same class unless class ids are omitted. The top_k
+    # of OpenCV truncates candidates before NMS, so detections are cut after it
+    if len(boxes) == 0:
+        return np.zeros(0, dtype=np.int64)
+    boxes = np.asarray(boxes, dtype=np.float64)
+    xywh = np.concatenate((boxes[:, :2], boxes[:, 2:4] - boxes[:, :2]), axis=1)
+    scores = np.asarray(scores, dtype=np.float32)
+    if class_ids is None:
+        keep = cv.dnn.NMSBoxes(xywh, scores, score_threshold, iou_threshold)
+    elif hasattr(cv.dnn, "NMSBoxesBatched"):
+        keep = cv.dnn.NMSBoxesBatched(
+            xywh,
+            scores,
+            np.asarray(class_ids, dtype=np.int32),
+            score_threshold,
+            iou_threshold,
+        )
+    else:
+        # Shift every class apart so that boxes of different classes never overlap
+        offsets = np.asarray(class_ids, dtype=np.float64) * (xywh.max() + 1.0)
+        xywh[:, :2] += offsets[:, np.newaxis]
+        keep = cv.dnn.NMSBoxes(xywh, scores, score_threshold, iou_threshold)
+    keep = np.array(keep, dtype=np.int64).reshape(-1)
+    if max_detections > 0:
+        keep = keep[:max_detections]
+    return keep
+
+
+def multiclass_nms(
+    boxes, scores, score_threshold, iou_threshold, class_agnostic=True, max_detections=0
+):
+    # Detections of (N, 4) boxes with (N, classes) scores. Class agnostic NMS
+    # keeps the best class of each box, otherwise every class scoring above the
+    # threshold is a candidate
+    if class_agnostic:
+        class_ids = scores.argmax(1)
+        class_scores = scores[np.arange(len(class_ids)), class_ids]
+        candidates = np.nonzero(class_scores > score_threshold)[0]
+        class_ids = class_ids[candidates]
+        class_scores = class_scores[candidates]
+    else:
+        candidates, class_ids = np.nonzero(scores > score_threshold)
+        class_scores = scores[candidates, class_ids]
+    boxes = boxes[candidates]
+    keep = batched_nms(
+        boxes,
+        class_scores,
+        None if class_agnostic else class_ids,
+        iou_threshold,
+        score_threshold,
+        max_detections,
+    )
+    return (
+        boxes[keep].astype(np.float32),
+        class_scores[keep].astype(np.float32),
+        class_ids[keep].astype(np.int64),
+    )
@@ -0,0 +1,113 @@
+import threading
+
+import cv2 as cv
+import numpy as np
+
+
+class Preprocessor:
+    # Resize BGR frames straight into a persistent input tensor. The resize of
+    # each frame resolution is computed once, and the channel swap, layout and
+    # dtype conversion happen in a single copy per frame
+    input_shape = (224, 224)  # Height, width
+    layout = "NCHW"
+    swap_rb = False
+    letterbox = False
+    pad_value = 114
+    scale = None
+    dtype = np.float32
+    resizes = {}  # (height, width) of a frame to (dsize, ratio)
+    local = None  # Buffers of each thread, a shared model runs in many threads
+
+    def __init__(
+        self,
+        input_shape,
+        layout="NCHW",
+        swap_rb=False,
+        letterbox=False,
+        pad_value=114,
+        scale=None,
+        dtype=np.float32,
+    ):
+        self.input_shape = tuple(input_shape)
+        self.layout = layout
+        self.swap_rb = swap_rb
+        self.letterbox = letterbox
+        self.pad_value = pad_value
+        self.scale = scale
+        self.dtype = dtype
+        self.resizes = {}
+        self.local = threading.local()
+
+    def get_resize(self, height, width):
+        # Letterbox keeps the aspect ratio and pads right and bottom, otherwise
+        # the frame is stretched and has no ratio
+        resize = self.resizes.get((height, width), None)
+        if resize is None:
+            if self.letterbox:
+                ratio = min(self.input_shape[0] / height, self.input_shape[1] / width)
+                dsize = (int(width * ratio), int(height * ratio))
+            else:
+                ratio = None
+                dsize = (self.input_shape[1], self.input_shape[0])
+            resize = (dsize, ratio)
+            self.resizes[(height, width)] = resize
+        return resize
+
+    def get_inputs(self, count):
+        inputs = getattr(self.local, "inputs", None)
+        if inputs is None or len(inputs) < count:
+            if self.layout == "NCHW":
+                shape = (count, 3, self.input_shape[0], self.input_shape[1])
+            else:
+                shape = (count, self.input_shape[0], self.input_shape[1], 3)
+            inputs = np.empty(shape, dtype=self.dtype)
+            self.local.inputs = inputs
+            self.local.dsizes = [None] * count
+        return inputs
+
+    def get_resized(self, dsize, dtype):
+        resized = getattr(self.local, "resized", None)
+        if resized is None or resized.shape != (dsize[1], dsize[0], 3):
+            resized = np.empty((dsize[1], dsize[0], 3), dtype=dtype)
+            self.local.resized = resized
+        return resized
+
+    def __call__(self, images):
+        # Input tensor of the images (valid until the next call of the thread)
+        # and the letterbox ratio of each image
+        inputs = self.get_inputs(len(images))
+        dsizes = self.local.dsizes
+        ratios = []
+        for index, image in enumerate(images):
+            if image.ndim == 2:
+                image = cv.cvtColor(image, cv.COLOR_GRAY2BGR)
+            dsize, ratio = self.get_resize(image.shape[0], image.shape[1])
+            resized = cv.resize(
+                image,
+                dsize,
+                dst=self.get_resized(dsize, image.dtype),
+                interpolation=cv.INTER_LINEAR,
+            )
+            if self.layout == "NCHW":
+                source = resized.transpose((2, 0, 1))
+                source = source[::-1] if self.swap_rb else source
+                target = inputs[index, :, : dsize[1], : dsize[0]]
+            else:
+                source = resized[..., ::-1] if self.swap_rb else resized
+                target = inputs[index, : dsize[1], : dsize[0]]
+
+            # Padding is written only when the frame resolution of a slot changes
+            if dsizes[index] != dsize:
+                pad_value = self.pad_value
+                if self.scale is not None:
+                    pad_value *= self.scale
+                inputs[index].fill(pad_value)
+                dsizes[index] = dsize
+            if self.scale is None:
+                np.copyto(target, source, casting="unsafe")
+            else:
+                np.multiply(
+                    source, self.dtype(self.scale), out=target, casting="unsafe"
+                )
+            ratios.append(ratio)
+        return inputs[: len(images)], ratios
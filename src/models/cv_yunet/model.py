@@ -97,6 +97,9 @@ def __call__(self, image):
             message = message_squeeze.tolist()
         for det in results if results is not None else []:
             bbox = det[0:4].astype(np.int32)
+            # Copy on write, the input frame is shared read-only
+            if not image.flags.writeable:
+                image = image.copy()
             cv.rectangle(
                 image,
                 (bbox[0], bbox[1]),
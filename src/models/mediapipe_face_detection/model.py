@@ -52,6 +52,9 @@ def __call__(self, image):
                         "y": keypoint.y,
                         "score": detection.score[0],
                     }
+                # Copy on write, the input frame is shared read-only
+                if not image.flags.writeable:
+                    image = image.copy()
                 mp_drawing.draw_detection(image, detection)
             message = message_landmark
         return image, message
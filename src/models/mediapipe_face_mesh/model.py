@@ -39,6 +39,9 @@ def __call__(self, image):
                         "y": landmark.y,
                         "z": landmark.z,
                     }
+                # Copy on write, the input frame is shared read-only
+                if not image.flags.writeable:
+                    image = image.copy()
                 mp_drawing.draw_landmarks(
                     image=image,
                     landmark_list=face_landmarks,
@@ -41,6 +41,9 @@ def __call__(self, image):
                         }
                     )
                 message_multi_landmark.append(message_landmark)
+                # Copy on write, the input frame is shared read-only
+                if not image.flags.writeable:
+                    image = image.copy()
                 mp_drawing.draw_landmarks(
                     image,
                     hand_landmarks,
@@ -38,6 +38,9 @@ def __call__(self, image):
                     }
                 )
             message = message_landmark
+            # Copy on write, the input frame is shared read-only
+            if not image.flags.writeable:
+                image = image.copy()
             mp_drawing.draw_landmarks(
                 image,
                 results.pose_landmarks,
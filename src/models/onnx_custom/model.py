@@ -23,6 +23,7 @@ def connect(
         input_dtype="float32",
         output_item_count=2,
         device="CUDA",
+        session_factory=None,
     ):
         if not os.path.exists(model_filepath):
             self.state = False
@@ -30,7 +31,9 @@ def connect(
         providers = ["CUDAExecutionProvider", "CPUExecutionProvider"]
         if device == "CPU":
             providers = ["CPUExecutionProvider"]
-        self.session = ort.InferenceSession(model_filepath, providers=providers)
+        if session_factory is None:
+            session_factory = ort.InferenceSession
+        self.session = session_factory(model_filepath, providers=providers)
         self.input_shape = input_shape
         self.input_dtype = input_dtype
         self.output_item_count = output_item_count
@@ -60,6 +63,9 @@ def __call__(self, image):
                 str(class_id),
                 score,
             )
+            # Copy on write, the input frame is shared read-only
+            if not image.flags.writeable:
+                image = image.copy()
             image = cv.putText(
                 image,
                 text,
@@ -3,6 +3,7 @@
 import logging
 import operator
 import os
+import sys
 
 import cv2 as cv
 import numpy as np
@@ -10,6 +11,15 @@
 import onnxruntime as ort
 from PIL import Image
 
+try:
+    from models.common.postprocess import decode_yolo_v2, multiclass_nms
+    from models.common.preprocess import Preprocessor
+except ImportError:
+    # Run as a script from the model directory
+    sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "../.."))
+    from models.common.postprocess import decode_yolo_v2, multiclass_nms
+    from models.common.preprocess import Preprocessor
+
 MAX_DETECTIONS = 64  # Max number of boxes to detect
 IOU_THRESHOLD = 0.45
 
@@ -22,49 +32,12 @@ def __init__(self, max_detections, prob_threshold, iou_threshold, logger=logging
         self.logger = logger
 
     def __call__(self, boxes, class_probs):
-        classes = np.argmax(class_probs, axis=1)
-        probs = class_probs[np.arange(len(class_probs)), classes]
-        valid_indices = probs > self.prob_threshold
-        boxes, classes, probs = (
-            boxes[valid_indices, :],
-            classes[valid_indices],
-            probs[valid_indices],
-        )
-        areas = (boxes[:, 2] - boxes[:, 0]) * (boxes[:, 3] - boxes[:, 1])
-        selected_boxes = []
-        selected_classes = []
-        selected_probs = []
-        max_detections = min(self.max_detections, len(boxes))
-        while len(selected_boxes) < max_detections:
-            i = np.argmax(probs)
-            if probs[i] < self.prob_threshold:
-                break
-
-            # Save the selected prediction
-            selected_boxes.append(boxes[i])
-            selected_classes.append(classes[i])
-            selected_probs.append(probs[i])
-            box = boxes[i]
-            other_indices = np.concatenate((np.arange(i), np.arange(i + 1, len(boxes))))
-            other_boxes = boxes[other_indices]
-
-            # Get overlap between the 'box' and 'other_boxes'
-            xy = np.maximum(box[0:2], other_boxes[:, 0:2])
-            xy2 = np.minimum(box[2:4], other_boxes[:, 2:4])
-            wh = np.maximum(0, xy2 - xy)
-
-            # Calculate Intersection Over Union (IOU)
-            overlap_area = wh[:, 0] * wh[:, 1]
-            iou = overlap_area / (areas[i] + areas[other_indices] - overlap_area)
-
-            # Find the overlapping predictions
-            overlapping_indices = other_indices[np.where(iou > self.iou_threshold)[0]]
-            overlapping_indices = np.append(overlapping_indices, i)
-            probs[overlapping_indices] = 0
-        return (
-            np.array(selected_boxes),
-            np.array(selected_classes),
-            np.array(selected_probs),
+        return multiclass_nms(
+            boxes,
+            class_probs,
+            self.prob_threshold,
+            self.iou_threshold,
+            max_detections=self.max_detections,
         )
 
 
@@ -74,6 +47,7 @@ class CustomVisionObjectDetection:
     )
     threshold = 0.55
     is_active = False
+    preprocessor = None
 
     def __init__(self, logger=logging.getLogger(__name__)):
         self.logger = logger
@@ -94,6 +68,7 @@ def connect(
         ),
         threshold=0.55,
         device="CUDA",
+        session_factory=None,
     ):
         if not os.path.exists(model_filepath) or not os.path.exists(labels_filepath):
             self.is_active = False
@@ -103,13 +78,6 @@ def connect(
             providers = ["CUDAExecutionProvider", "CPUExecutionProvider"]
             if device == "CPU":
                 providers = ["CPUExecutionProvider"]
-            self.session = ort.InferenceSession(model_filepath, providers=providers)
-            self.input_shape = self.session.get_inputs()[0].shape[2:]
-            self.input_name = self.session.get_inputs()[0].name
-            self.input_type = {"tensor(float)": np.float32, "tensor(float16)": np.float16}[
-                self.session.get_inputs()[0].type
-            ]
-            self.output_names = [o.name for o in self.session.get_outputs()]
             self.is_bgr = False
             self.is_range255 = False
             onnx_model = onnx.load(model_filepath)
@@ -121,6 +89,34 @@ def connect(
                     and metadata.value == "NominalRange_0_255"
                 ):
                     self.is_range255 = True
+            if session_factory is None:
+                self.session = ort.InferenceSession(model_filepath, providers=providers)
+            else:
+                self.session = session_factory(
+                    model_filepath,
+                    providers=providers,
+                    preprocess={
+                        "layout": "NCHW",
+                        "swap_rb": self.is_bgr,
+                        "scale": None if self.is_range255 else 1 / 255,
+                    },
+                )
+            self.input_name = self.session.get_inputs()[0].name
+            self.input_type = {
+                "tensor(float)": np.float32,
+                "tensor(float16)": np.float16,
+                "tensor(uint8)": np.uint8,
+            }[self.session.get_inputs()[0].type]
+            if self.input_type == np.uint8:
+                # Preprocessing is folded into the graph, frames go in as uint8
+                self.input_shape = self.session.get_inputs()[0].shape[1:3]
+                self.preprocessor = Preprocessor(
+                    self.input_shape, layout="NHWC", dtype=np.uint8
+                )
+            else:
+                self.input_shape = self.session.get_inputs()[0].shape[2:]
+                self.preprocessor = None
+            self.output_names = [o.name for o in self.session.get_outputs()]
             labels = []
             with open(labels_filepath) as f:
                 for readline in f:
@@ -132,16 +128,18 @@ def connect(
     def __call__(self, image):
         message = []
         h, w = image.shape[:2]
-        image_array = Image.fromarray(image).resize(self.input_shape)
-        input_array = np.array(image_array, dtype=np.float32)[np.newaxis, :, :, :]
-        input_array = input_array.transpose((0, 3, 1, 2))  # N, C, H, W
-        if self.is_bgr:
-            input_array = input_array[:, (2, 1, 0), :, :]
-        if not self.is_range255:
-            input_array = input_array / 255  # Pixel values should be in range [0, 1]
-        outputs = self.session.run(
-            self.output_names, {self.input_name: input_array.astype(self.input_type)}
-        )
+        if self.preprocessor is None:
+            image_array = Image.fromarray(image).resize(self.input_shape)
+            input_array = np.array(image_array, dtype=np.float32)[np.newaxis, :, :, :]
+            input_array = input_array.transpose((0, 3, 1, 2))  # N, C, H, W
+            if self.is_bgr:
+                input_array = input_array[:, (2, 1, 0), :, :]
+            if not self.is_range255:
+                input_array = input_array / 255  # Pixel values should be in range [0, 1]
+            input_array = input_array.astype(self.input_type)
+        else:
+            input_array, _ = self.preprocessor([image])
+        outputs = self.session.run(self.output_names, {self.input_name: input_array})
         outputs = {name: outputs[i] for i, name in enumerate(self.output_names)}
         if "model_outputs0" in outputs:
             # General (compact) domain for Object Detection requires special postprocessing logic
@@ -157,6 +155,9 @@ def __call__(self, image):
                 if score > self.threshold:
                     x1, y1, x2, y2 = bbox[0], bbox[1], bbox[2], bbox[3]
                     color = self._get_color(int(class_id))
+                    # Copy on write, the input frame is shared read-only
+                    if not image.flags.writeable:
+                        image = image.copy()
                     image = cv.rectangle(
                         image,
                         (int(x1 * w), int(y1 * h)),
@@ -197,39 +198,18 @@ def get_status(self):
         return self.status
 
     def _postprocess(self, outputs, anchors):
-        outputs = outputs.transpose((1, 2, 0))
-        num_anchors = anchors.shape[0]
-        height, width, channels = outputs.shape
-        num_classes = channels // num_anchors - 5
-        outputs = outputs.reshape((height, width, num_anchors, -1))
-        x = (outputs[..., 0] + np.arange(width)[np.newaxis, :, np.newaxis]) / width
-        y = (outputs[..., 1] + np.arange(height)[:, np.newaxis, np.newaxis]) / height
-        w = np.exp(outputs[..., 2]) * anchors[:, 0][np.newaxis, np.newaxis, :] / width
-        h = np.exp(outputs[..., 3]) * anchors[:, 1][np.newaxis, np.newaxis, :] / height
-        x = x - w / 2
-        y = y - h / 2
-        boxes = np.stack((x, y, x + w, y + h), axis=-1).reshape(-1, 4)
-        objectness = self._logistic(outputs[..., 4, np.newaxis])
-        class_probs = outputs[..., 5:]
-        class_probs = np.exp(
-            class_probs - np.amax(class_probs, axis=3)[..., np.newaxis]
-        )
-        class_probs = (
-            class_probs / np.sum(class_probs, axis=3)[..., np.newaxis] * objectness
-        ).reshape(-1, num_classes)
-        detected_boxes, detected_classes, detected_scores = self.nms(boxes, class_probs)
+        boxes, class_probs = decode_yolo_v2(outputs, anchors)
+        detected_boxes, detected_scores, detected_classes = self.nms(boxes, class_probs)
         return {
             "detected_boxes": detected_boxes.reshape(1, -1, 4),
             "detected_classes": detected_classes.reshape(1, -1),
             "detected_scores": detected_scores.reshape(1, -1),
         }
 
-    def _logistic(self, x):
-        return np.where(x > 0, 1 / (1 + np.exp(-x)), np.exp(x) / (1 + np.exp(x)))
-
 
 class CustomVisionClassification:
     is_active = False
+    preprocessor = None
 
     def __init__(self, logger=logging.getLogger(__name__)):
         self.logger = logger
@@ -249,6 +229,7 @@ def connect(
             )
         ),
         device="CUDA",
+        session_factory=None,
     ):
         if not os.path.exists(model_filepath) or not os.path.exists(labels_filepath):
             self.is_active = False
@@ -256,14 +237,6 @@ def connect(
             providers = ["CUDAExecutionProvider", "CPUExecutionProvider"]
             if device == "CPU":
                 providers = ["CPUExecutionProvider"]
-            self.session = ort.InferenceSession(model_filepath, providers=providers)
-            self.input_shape = self.session.get_inputs()[0].shape[2:]
-            self.input_name = self.session.get_inputs()[0].name
-            self.input_type = {
-                "tensor(float)": np.float32,
-                "tensor(float16)": np.float16,
-            }[self.session.get_inputs()[0].type]
-            self.output_names = [o.name for o in self.session.get_outputs()]
             self.is_bgr = False
             self.is_range255 = False
             onnx_model = onnx.load(model_filepath)
@@ -278,6 +251,34 @@ def connect(
                     and metadata.value == "NominalRange_0_255"
                 ):
                     self.is_range255 = True
+            if session_factory is None:
+                self.session = ort.InferenceSession(model_filepath, providers=providers)
+            else:
+                self.session = session_factory(
+                    model_filepath,
+                    providers=providers,
+                    preprocess={
+                        "layout": "NCHW",
+                        "swap_rb": self.is_bgr,
+                        "scale": None if self.is_range255 else 1 / 255,
+                    },
+                )
+            self.input_name = self.session.get_inputs()[0].name
+            self.input_type = {
+                "tensor(float)": np.float32,
+                "tensor(float16)": np.float16,
+                "tensor(uint8)": np.uint8,
+            }[self.session.get_inputs()[0].type]
+            if self.input_type == np.uint8:
+                # Preprocessing is folded into the graph, frames go in as uint8
+                self.input_shape = self.session.get_inputs()[0].shape[1:3]
+                self.preprocessor = Preprocessor(
+                    self.input_shape, layout="NHWC", dtype=np.uint8
+                )
+            else:
+                self.input_shape = self.session.get_inputs()[0].shape[2:]
+                self.preprocessor = None
+            self.output_names = [o.name for o in self.session.get_outputs()]
             labels = []
             with open(labels_filepath) as f:
                 for readline in f:
@@ -288,16 +289,18 @@ def connect(
 
     def __call__(self, image):
         message = []
-        image_array = Image.fromarray(image).resize(self.input_shape)
-        input_array = np.array(image_array, dtype=np.float32)[np.newaxis, :, :, :]
-        input_array = input_array.transpose((0, 3, 1, 2))  # N, C, H, W
-        if self.is_bgr:
-            input_array = input_array[:, (2, 1, 0), :, :]
-        if not self.is_range255:
-            input_array = input_array / 255  # Pixel values should be in range [0, 1]
-        outputs = self.session.run(
-            self.output_names, {self.input_name: input_array.astype(self.input_type)}
-        )
+        if self.preprocessor is None:
+            image_array = Image.fromarray(image).resize(self.input_shape)
+            input_array = np.array(image_array, dtype=np.float32)[np.newaxis, :, :, :]
+            input_array = input_array.transpose((0, 3, 1, 2))  # N, C, H, W
+            if self.is_bgr:
+                input_array = input_array[:, (2, 1, 0), :, :]
+            if not self.is_range255:
+                input_array = input_array / 255  # Pixel values should be in range [0, 1]
+            input_array = input_array.astype(self.input_type)
+        else:
+            input_array, _ = self.preprocessor([image])
+        outputs = self.session.run(self.output_names, {self.input_name: input_array})
         outputs = {name: outputs[i] for i, name in enumerate(self.output_names)}
         if "model_output" in outputs:
             # General (compact) [S1] ONNX Model
@@ -314,6 +317,9 @@ def __call__(self, image):
                     str(self.class_names[int(class_id)]),
                     score,
                 )
+                # Copy on write, the input frame is shared read-only
+                if not image.flags.writeable:
+                    image = image.copy()
                 image = cv.putText(
                     image,
                     text,
@@ -341,6 +347,9 @@ def __call__(self, image):
                     class_name,
                     score,
                 )
+                # Copy on write, the input frame is shared read-only
+                if not image.flags.writeable:
+                    image = image.copy()
                 image = cv.putText(
                     image,
                     text,
@@ -2,11 +2,21 @@
 import argparse
 import logging
 import os
+import sys
 
 import cv2 as cv
 import numpy as np
 import onnxruntime as ort
 
+try:
+    from models.common.inference import run_batches
+    from models.common.preprocess import Preprocessor
+except ImportError:
+    # Run as a script from the model directory
+    sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "../.."))
+    from models.common.inference import run_batches
+    from models.common.preprocess import Preprocessor
+
 imagenet_class_names = {
     0: "Tench",
     1: "Goldfish",
@@ -1012,6 +1022,8 @@
 
 
 class EfficientNetB0:
+    thread_safe = True  # Shared by nodes of several threads
+
     def __init__(
         self,
         model_path=os.path.abspath(
@@ -1022,31 +1034,43 @@ def __init__(
         ),
         input_shape=(224, 224),
         device="CUDA",
+        session_factory=None,
         logger=logging.getLogger(__name__),
     ):
         providers = ["CUDAExecutionProvider", "CPUExecutionProvider"]
         if device == "CPU":
             providers = ["CPUExecutionProvider"]
-        self.session = ort.InferenceSession(model_path, providers=providers)
+        if session_factory is None:
+            self.session = ort.InferenceSession(model_path, providers=providers)
+        else:
+            self.session = session_factory(
+                model_path,
+                providers=providers,
+                preprocess={"layout": "NHWC", "swap_rb": True},
+            )
         self.input_shape = input_shape
+        if self.session.get_inputs()[0].type == "tensor(uint8)":
+            # Preprocessing is folded into the graph, frames go in as uint8 BGR
+            self.preprocessor = Preprocessor(input_shape, layout="NHWC", dtype=np.uint8)
+        else:
+            self.preprocessor = Preprocessor(input_shape, layout="NHWC", swap_rb=True)
         self.input_name = self.session.get_inputs()[0].name
+        batch_size = self.session.get_inputs()[0].shape[0]
+        self.batch_size = batch_size if isinstance(batch_size, int) else None
         self.logger = logger
 
     def __call__(self, image):
+        return self.batch([image])[0]
+
+    def batch(self, images):
+        # Resize every image into one input batch and run it at once
+        inputs, _ = self.preprocessor(images)
+        outputs = run_batches(self.session, self.input_name, inputs, self.batch_size)
+        return [self._draw(image, outputs[index]) for index, image in enumerate(images)]
+
+    def _draw(self, image, outputs):
         message = []
-        outputs = self.session.run(
-            None,
-            {
-                self.input_name: np.expand_dims(
-                    cv.resize(
-                        cv.cvtColor(image, cv.COLOR_BGR2RGB),
-                        dsize=(self.input_shape[1], self.input_shape[0]),
-                    ),
-                    axis=0,
-                ).astype("float32")
-            },
-        )
-        outputs = np.array(outputs).squeeze()
+        outputs = outputs.squeeze()
         class_ids = np.argsort(outputs)[::-1][:5]
         class_scores = outputs[class_ids]
         for index, (class_score, class_id) in enumerate(zip(class_scores, class_ids)):
@@ -1056,6 +1080,9 @@ def __call__(self, image):
                 str(imagenet_class_names[int(class_id)]),
                 score,
             )
+            # Copy on write, the input frame is shared read-only
+            if not image.flags.writeable:
+                image = image.copy()
             image = cv.putText(
                 image,
                 text,
@@ -24,6 +24,7 @@ def connect(
             "signature.json",
         ),
         device="CUDA",
+        session_factory=None,
     ):
         model_dir = os.path.dirname(signature_filepath)
         if not os.path.exists(signature_filepath):
@@ -48,7 +49,9 @@ def connect(
         providers = ["CUDAExecutionProvider", "CPUExecutionProvider"]
         if device == "CPU":
             providers = ["CPUExecutionProvider"]
-        self.session = ort.InferenceSession(self.model_filepath, providers=providers)
+        if session_factory is None:
+            session_factory = ort.InferenceSession
+        self.session = session_factory(self.model_filepath, providers=providers)
         self.input_shape = self.signature_inputs.get("Image").get("shape")[1:3]
         self.input_dtype = self.signature_inputs.get("Image").get("dtype")
         self.input_name = self.signature_inputs.get("Image").get("name")
@@ -85,6 +88,9 @@ def __call__(self, image):
         for index, item in enumerate(sorted_output[:5]):
             score = "%.2f" % item["confidence"]
             text = "%s(%s)" % (item["label"], score)
+            # Copy on write, the input frame is shared read-only
+            if not image.flags.writeable:
+                image = image.copy()
             image = cv.putText(
                 image,
                 text,
@@ -20,12 +20,15 @@ def __init__(
         ),
         input_shape=(256, 256),
         device="CUDA",
+        session_factory=None,
         logger=logging.getLogger(__name__),
     ):
         providers = ["CUDAExecutionProvider", "CPUExecutionProvider"]
         if device == "CPU":
             providers = ["CPUExecutionProvider"]
-        self.session = ort.InferenceSession(
+        if session_factory is None:
+            session_factory = ort.InferenceSession
+        self.session = session_factory(
             model_path,
             providers=providers,
         )
@@ -69,6 +72,9 @@ def __call__(self, image):
         score_th = 0.5
         message = results_list
         for results in results_list:
+            # Copy on write, the input frame is shared read-only
+            if not image.flags.writeable:
+                image = image.copy()
             for id in range(17):
                 landmark_x, landmark_y = results[id][0], results[id][1]
                 visibility = results[id][2]
@@ -1,13 +1,24 @@
 #!/usr/bin/env python
 import argparse
-import copy
 import logging
 import os
+import sys
 
 import cv2 as cv
 import numpy as np
 import onnxruntime as ort
 
+try:
+    from models.common.inference import run_batches
+    from models.common.postprocess import decode_yolox, multiclass_nms
+    from models.common.preprocess import Preprocessor
+except ImportError:
+    # Run as a script from the model directory
+    sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "../.."))
+    from models.common.inference import run_batches
+    from models.common.postprocess import decode_yolox, multiclass_nms
+    from models.common.preprocess import Preprocessor
+
 coco_class_names = {
     0: "person",
     1: "bicycle",
@@ -93,6 +104,8 @@
 
 
 class YOLOXNano:
+    thread_safe = True  # Shared by nodes of several threads
+
     def __init__(
         self,
         model_path=os.path.abspath(
@@ -107,6 +120,7 @@ def __init__(
         with_p6=False,
         input_shape=(416, 416),
         device="CUDA",
+        session_factory=None,
         logger=logging.getLogger(__name__),
     ):
         providers = ["CUDAExecutionProvider", "CPUExecutionProvider"]
@@ -116,25 +130,44 @@ def __init__(
         self.nms_th = nms_th
         self.nms_score_th = nms_score_th
         self.with_p6 = with_p6
-        self.session = ort.InferenceSession(
-            model_path,
-            providers=providers,
-        )
+        if session_factory is None:
+            self.session = ort.InferenceSession(model_path, providers=providers)
+        else:
+            self.session = session_factory(
+                model_path,
+                providers=providers,
+                preprocess={"layout": "NCHW"},
+            )
         self.input_shape = input_shape
+        if self.session.get_inputs()[0].type == "tensor(uint8)":
+            # Preprocessing is folded into the graph, frames go in as uint8 BGR
+            self.preprocessor = Preprocessor(
+                input_shape, layout="NHWC", letterbox=True, dtype=np.uint8
+            )
+        else:
+            self.preprocessor = Preprocessor(input_shape, letterbox=True, pad_value=114)
         self.input_name = self.session.get_inputs()[0].name
+        batch_size = self.session.get_inputs()[0].shape[0]
+        self.batch_size = batch_size if isinstance(batch_size, int) else None
         self.logger = logger
 
     def __call__(self, image):
-        temp_image = copy.deepcopy(image)
+        return self.batch([image])[0]
+
+    def batch(self, images):
+        # Letterbox every image into one input batch and run it at once
+        inputs, ratios = self.preprocessor(images)
+        outputs = run_batches(self.session, self.input_name, inputs, self.batch_size)
+        return [
+            self._draw(image, outputs[index : index + 1], ratios[index])
+            for index, image in enumerate(images)
+        ]
+
+    def _draw(self, image, output, ratio):
         image_height, image_width = image.shape[0], image.shape[1]
-        temp_image, ratio = self._preprocess(temp_image, self.input_shape)
         message = []
-        outputs = self.session.run(
-            None,
-            {self.input_name: temp_image[None, :, :, :]},
-        )
         bboxes, scores, class_ids = self._postprocess(
-            outputs[0],
+            output,
             self.input_shape,
             ratio,
             self.nms_th,
@@ -149,6 +182,9 @@ def __call__(self, image):
             x1, y1, x2, y2 = int(bbox[0]), int(bbox[1]), int(bbox[2]), int(bbox[3])
             if score_th > score:
                 continue
+            # Copy on write, the input frame is shared read-only
+            if not image.flags.writeable:
+                image = image.copy()
             color = self._get_color(class_id)
             image = cv.rectangle(
                 image,
@@ -171,27 +207,6 @@ def __call__(self, image):
             message.append([x1, x2, y1, y2, int(class_id)])
         return image, message
 
-    def _preprocess(self, image, input_size, swap=(2, 0, 1)):
-        if len(image.shape) == 3:
-            padded_image = (
-                np.ones((input_size[0], input_size[1], 3), dtype=np.uint8) * 114
-            )
-        else:
-            padded_image = np.ones(input_size, dtype=np.uint8) * 114
-        ratio = min(input_size[0] / image.shape[0], input_size[1] / image.shape[1])
-        resized_image = cv.resize(
-            image,
-            (int(image.shape[1] * ratio), int(image.shape[0] * ratio)),
-            interpolation=cv.INTER_LINEAR,
-        )
-        resized_image = resized_image.astype(np.uint8)
-        padded_image[
-            : int(image.shape[0] * ratio), : int(image.shape[1] * ratio)
-        ] = resized_image
-        padded_image = padded_image.transpose(swap)
-        padded_image = np.ascontiguousarray(padded_image, dtype=np.float32)
-        return padded_image, ratio
-
     def _postprocess(
         self,
         outputs,
@@ -203,131 +218,15 @@ def _postprocess(
         max_height,
         p6=False,
     ):
-        grids = []
-        expanded_strides = []
-        if not p6:
-            strides = [8, 16, 32]
-        else:
-            strides = [8, 16, 32, 64]
-        hsizes = [img_size[0] // stride for stride in strides]
-        wsizes = [img_size[1] // stride for stride in strides]
-        for hsize, wsize, stride in zip(hsizes, wsizes, strides):
-            xv, yv = np.meshgrid(np.arange(wsize), np.arange(hsize))
-            grid = np.stack((xv, yv), 2).reshape(1, -1, 2)
-            grids.append(grid)
-            shape = grid.shape[:2]
-            expanded_strides.append(np.full((*shape, 1), stride))
-        grids = np.concatenate(grids, 1)
-        expanded_strides = np.concatenate(expanded_strides, 1)
-        outputs[..., :2] = (outputs[..., :2] + grids) * expanded_strides
-        outputs[..., 2:4] = np.exp(outputs[..., 2:4]) * expanded_strides
-        predictions = outputs[0]
-        boxes = predictions[:, :4]
-        scores = predictions[:, 4:5] * predictions[:, 5:]
-        boxes_xyxy = np.ones_like(boxes)
-        boxes_xyxy[:, 0] = boxes[:, 0] - boxes[:, 2] / 2.0
-        boxes_xyxy[:, 1] = boxes[:, 1] - boxes[:, 3] / 2.0
-        boxes_xyxy[:, 2] = boxes[:, 0] + boxes[:, 2] / 2.0
-        boxes_xyxy[:, 3] = boxes[:, 1] + boxes[:, 3] / 2.0
-        boxes_xyxy /= ratio
-        dets = self._multiclass_nms(
-            boxes_xyxy,
-            scores,
-            nms_thr=nms_th,
-            score_thr=nms_score_th,
-        )
-        bboxes, scores, class_ids = [], [], []
-        if dets is not None:
-            bboxes, scores, class_ids = dets[:, :4], dets[:, 4], dets[:, 5]
-            for bbox in bboxes:
-                bbox[0] = max(0, bbox[0])
-                bbox[1] = max(0, bbox[1])
-                bbox[2] = min(bbox[2], max_width)
-                bbox[3] = min(bbox[3], max_height)
+        strides = (8, 16, 32, 64) if p6 else (8, 16, 32)
+        boxes, scores = decode_yolox(outputs[0], img_size, strides)
+        boxes /= ratio
+        bboxes, scores, class_ids = multiclass_nms(boxes, scores, nms_score_th, nms_th)
+        bboxes[:, :2] = np.maximum(bboxes[:, :2], 0)
+        bboxes[:, 2] = np.minimum(bboxes[:, 2], max_width)
+        bboxes[:, 3] = np.minimum(bboxes[:, 3], max_height)
         return bboxes, scores, class_ids
 
-    def _nms(self, boxes, scores, nms_thr):
-        x1 = boxes[:, 0]
-        y1 = boxes[:, 1]
-        x2 = boxes[:, 2]
-        y2 = boxes[:, 3]
-        areas = (x2 - x1 + 1) * (y2 - y1 + 1)
-        order = scores.argsort()[::-1]
-        keep = []
-        while order.size > 0:
-            i = order[0]
-            keep.append(i)
-            xx1 = np.maximum(x1[i], x1[order[1:]])
-            yy1 = np.maximum(y1[i], y1[order[1:]])
-            xx2 = np.minimum(x2[i], x2[order[1:]])
-            yy2 = np.minimum(y2[i], y2[order[1:]])
-            w = np.maximum(0.0, xx2 - xx1 + 1)
-            h = np.maximum(0.0, yy2 - yy1 + 1)
-            inter = w * h
-            ovr = inter / (areas[i] + areas[order[1:]] - inter)
-            inds = np.where(ovr <= nms_thr)[0]
-            order = order[inds + 1]
-        return keep
-
-    def _multiclass_nms(
-        self,
-        boxes,
-        scores,
-        nms_thr,
-        score_thr,
-        class_agnostic=True,
-    ):
-        if class_agnostic:
-            nms_method = self._multiclass_nms_class_agnostic
-        else:
-            nms_method = self._multiclass_nms_class_aware
-        return nms_method(boxes, scores, nms_thr, score_thr)
-
-    def _multiclass_nms_class_aware(self, boxes, scores, nms_thr, score_thr):
-        final_dets = []
-        num_classes = scores.shape[1]
-        for cls_ind in range(num_classes):
-            cls_scores = scores[:, cls_ind]
-            valid_score_mask = cls_scores > score_thr
-            if valid_score_mask.sum() == 0:
-                continue
-            else:
-                valid_scores = cls_scores[valid_score_mask]
-                valid_boxes = boxes[valid_score_mask]
-                keep = self._nms(valid_boxes, valid_scores, nms_thr)
-                if len(keep) > 0:
-                    cls_inds = np.ones((len(keep), 1)) * cls_ind
-                    dets = np.concatenate(
-                        [valid_boxes[keep], valid_scores[keep, None], cls_inds],
-                        1,
-                    )
-                    final_dets.append(dets)
-        if len(final_dets) == 0:
-            return None
-        return np.concatenate(final_dets, 0)
-
-    def _multiclass_nms_class_agnostic(self, boxes, scores, nms_thr, score_thr):
-        cls_inds = scores.argmax(1)
-        cls_scores = scores[np.arange(len(cls_inds)), cls_inds]
-        valid_score_mask = cls_scores > score_thr
-        if valid_score_mask.sum() == 0:
-            return None
-        valid_scores = cls_scores[valid_score_mask]
-        valid_boxes = boxes[valid_score_mask]
-        valid_cls_inds = cls_inds[valid_score_mask]
-        keep = self._nms(valid_boxes, valid_scores, nms_thr)
-        dets = None
-        if keep:
-            dets = np.concatenate(
-                [
-                    valid_boxes[keep],
-                    valid_scores[keep, None],
-                    valid_cls_inds[keep, None],
-                ],
-                1,
-            )
-        return dets
-
     def _get_color(self, index):
         temp_index = abs(int(index + 5)) * 3
         color = (
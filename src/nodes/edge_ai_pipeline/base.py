@@ -1,10 +1,7 @@
-import array
 from abc import ABCMeta, abstractmethod
 
-import cv2
-import numpy as np
-
 from gui.constants import Attribute, PinShape
+from gui.preview import preview_engine
 
 
 class BaseNode(metaclass=ABCMeta):
@@ -15,6 +12,7 @@ class BaseNode(metaclass=ABCMeta):
     settings = None  # WeDX settings
     logger = None  # Application Logging
     configs = None  # Each node configuration
+    batch_aware = False  # Refresh takes runtime.frame.FrameBatch inputs as is
 
     # Video and Message position constants
     VIDEO_IN = 0
@@ -47,28 +45,20 @@ def set_import_params(self, node_id, params):
         pass
 
     def get_blank_texture(self, width, height):
-        # Generate black raw texture
-        texture_data = []
-        for _ in range(0, width * height):
-            texture_data.append(0)
-            texture_data.append(0)
-            texture_data.append(0)
-            texture_data.append(255 / 255)
-        raw_texture = array.array("f", texture_data)
-        return raw_texture
+        # Cached black raw texture
+        return preview_engine.get_blank_texture(width, height)
+
+    def get_image_texture(self, image, width, height, texture_key=None):
+        # Texture written into the buffer kept for texture_key (node tag)
+        return preview_engine.get_image_texture(image, width, height, texture_key)
 
-    def get_image_texture(self, image, width, height):
-        # Resize image for Dear PyGui texture
-        resize_image = cv2.resize(image, dsize=(width, height))
-        resize_image = cv2.cvtColor(resize_image, cv2.COLOR_BGR2RGBA)
-        resize_image = resize_image.ravel()  # Flatten camera data to a 1 d stricture
-        resize_image = np.asfarray(
-            resize_image, dtype="f"
-        )  # Change data type to 32bit floats
+    def update_preview(self, texture_key, image, width, height):
+        # Queue the latest frame, the texture is made on the preview cadence.
+        # No-op without GUI unless web thumbnails are enabled
+        preview_engine.submit(texture_key, image, width, height)
 
-        # Normalize image data to prepare for GPU
-        image_texture = np.true_divide(resize_image, 255.0)
-        return image_texture
+    def release_image_texture(self, texture_key):
+        preview_engine.release(texture_key)
 
     def get_tag_list(self, node_tag):
         # Video Input, Video Output, Message Input, Message Output
@@ -100,15 +100,14 @@ async def refresh(self, node_id, node_links, node_frames, node_messages):
         if self.settings["gui"]:
             # Get linked node tag
             for link in node_links:
-                link_pin_shape = link[0].split(":")[2]
-                message_id = link[1].split(":")[4]
+                message_id = link.input_index
                 message_switch_tag = dpg_node_tag + ":message_switch:" + str(message_id)
                 if (
-                    link_pin_shape == str(int(PinShape.QUAD))
+                    link.pin_shape == PinShape.QUAD
                     and dpg.get_item_label(message_switch_tag)
                     == self.configs["label_on"]
                 ):
-                    linked_node_tag_message = ":".join(link[0].split(":")[:2])
+                    linked_node_tag_message = link.source_node_tag
                     message = node_messages.get(linked_node_tag_message, None)
 
             # Update console
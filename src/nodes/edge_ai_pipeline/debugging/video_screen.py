@@ -94,7 +94,9 @@ def add_node(self, parent, node_id, pos):
                 with dpg.node_attribute(
                     attribute_type=int(Attribute.STATIC),
                 ):
-                    dpg.add_image(dpg_node_tag + ":texture")
+                    dpg.add_image(
+                        dpg_node_tag + ":texture", tag=dpg_node_tag + ":image"
+                    )
 
         # Return Dear PyGui Tag
         return dpg_node_tag
@@ -106,25 +108,23 @@ async def refresh(self, node_id, node_links, node_frames, node_messages):
             # Get linked node tag
             linked_node_tag = None
             for link in node_links:
-                link_pin_shape = link[0].split(":")[2]
-                video_id = link[1].split(":")[4]
+                video_id = link.input_index
                 video_switch_tag = dpg_node_tag + ":video_switch:" + str(video_id)
                 if (
-                    link_pin_shape == str(int(PinShape.CIRCLE_FILLED))
+                    link.pin_shape == PinShape.CIRCLE_FILLED
                     and dpg.get_item_label(video_switch_tag) == self.configs["label_on"]
                 ):
-                    linked_node_tag = ":".join(link[0].split(":")[:2])
+                    linked_node_tag = link.source_node_tag
 
             # Get frame
             frame = node_frames.get(linked_node_tag, None)
             if frame is not None:
-                texture = self.get_image_texture(
+                self.update_preview(
+                    dpg_node_tag,
                     frame,
                     self.settings["debugging_width"],
                     self.settings["debugging_height"],
                 )
-                if dpg.does_item_exist(dpg_node_tag + ":texture"):
-                    dpg.set_value(dpg_node_tag + ":texture", texture)
 
         # Return frame and message
         return None, None
@@ -134,6 +134,7 @@ def close(self, node_id):
 
     def delete(self, node_id):
         dpg_node_tag = str(node_id) + ":" + self.name.lower().replace(" ", "_")
+        self.release_image_texture(dpg_node_tag)
         del self.configs["video_input_count"][dpg_node_tag]
         if self.settings["gui"]:
             dpg.delete_item(dpg_node_tag + ":texture")
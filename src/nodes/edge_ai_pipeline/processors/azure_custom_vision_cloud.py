@@ -1,9 +1,9 @@
-import copy
 import logging
 
 from gui.constants import Attribute, PinShape
 from links.azure_custom_vision.link import AzureCustomVision
 from nodes.edge_ai_pipeline.base import BaseNode
+from runtime.frame import get_writable_frame
 
 try:
     import dearpygui.dearpygui as dpg
@@ -194,7 +194,9 @@ def add_node(self, parent, node_id, pos):
 
                 # Add an image from a specified texture
                 with dpg.node_attribute(attribute_type=int(Attribute.STATIC)):
-                    dpg.add_image(dpg_node_tag + ":texture")
+                    dpg.add_image(
+                        dpg_node_tag + ":texture", tag=dpg_node_tag + ":image"
+                    )
 
         # Return Dear PyGui Tag
         return dpg_node_tag
@@ -207,23 +209,22 @@ async def refresh(self, node_id, node_links, node_frames, node_messages):
         # Get linked node tag
         linked_node_tag = None
         for link in node_links:
-            link_pin_shape = link[0].split(":")[2]
-            if link_pin_shape == str(int(PinShape.QUAD)):
-                linked_node_tag_message = ":".join(link[0].split(":")[:2])
+            if link.pin_shape == PinShape.QUAD:
+                linked_node_tag_message = link.source_node_tag
                 message = node_messages.get(linked_node_tag_message, None)
-            if link_pin_shape == str(int(PinShape.CIRCLE_FILLED)):
-                linked_node_tag = ":".join(link[0].split(":")[:2])
+            if link.pin_shape == PinShape.CIRCLE_FILLED:
+                linked_node_tag = link.source_node_tag
 
         # Inference
         linked_frame = node_frames.get(linked_node_tag, None)
         if linked_frame is not None:
-            frame = copy.deepcopy(linked_frame)
+            frame = linked_frame
             self.configs["frames"][dpg_node_tag] = frame
 
             # Draw landmarks
             if dpg_node_tag in self.configs["messages"]:
                 frame = self.configs["instances"][dpg_node_tag].draw_landmarks(
-                    frame, self.configs["messages"][dpg_node_tag]
+                    get_writable_frame(frame), self.configs["messages"][dpg_node_tag]
                 )
 
                 # Generate message
@@ -238,14 +239,12 @@ async def refresh(self, node_id, node_links, node_frames, node_messages):
                 )
 
             # Update texture
-            texture = self.get_image_texture(
+            self.update_preview(
+                dpg_node_tag,
                 frame,
                 self.settings["node_width"],
                 self.settings["node_height"],
             )
-            if self.settings["gui"]:
-                if dpg.does_item_exist(dpg_node_tag + ":texture"):
-                    dpg.set_value(dpg_node_tag + ":texture", texture)
 
         # Control output
         if self.settings["gui"]:
@@ -262,6 +261,7 @@ def close(self, node_id):
 
     def delete(self, node_id):
         dpg_node_tag = str(node_id) + ":" + self.name.lower().replace(" ", "_")
+        self.release_image_texture(dpg_node_tag)
         if dpg_node_tag in self.configs["instances"]:
             del self.configs["instances"][dpg_node_tag]
         if dpg_node_tag in self.configs["messages"]:
@@ -1,4 +1,3 @@
-import copy
 import logging
 import os
 import webbrowser
@@ -9,6 +8,8 @@
     CustomVisionObjectDetection,
 )
 from nodes.edge_ai_pipeline.base import BaseNode
+from runtime.registry import get_model_key, model_registry
+from runtime.sessions import session_factory
 
 try:
     import dearpygui.dearpygui as dpg
@@ -238,7 +239,9 @@ def add_node(self, parent, node_id, pos):
 
                 # Add an image from a specified texture
                 with dpg.node_attribute(attribute_type=int(Attribute.STATIC)):
-                    dpg.add_image(dpg_node_tag + ":texture")
+                    dpg.add_image(
+                        dpg_node_tag + ":texture", tag=dpg_node_tag + ":image"
+                    )
 
         # Return Dear PyGui Tag
         return dpg_node_tag
@@ -251,17 +254,16 @@ async def refresh(self, node_id, node_models, node_frames, node_messages):
         # Get linked node tag
         linked_node_tag = None
         for link in node_models:
-            link_pin_shape = link[0].split(":")[2]
-            if link_pin_shape == str(int(PinShape.QUAD)):
-                linked_node_tag_message = ":".join(link[0].split(":")[:2])
+            if link.pin_shape == PinShape.QUAD:
+                linked_node_tag_message = link.source_node_tag
                 message = node_messages.get(linked_node_tag_message, None)
-            if link_pin_shape == str(int(PinShape.CIRCLE_FILLED)):
-                linked_node_tag = ":".join(link[0].split(":")[:2])
+            if link.pin_shape == PinShape.CIRCLE_FILLED:
+                linked_node_tag = link.source_node_tag
 
         # Inference
         linked_frame = node_frames.get(linked_node_tag, None)
         if linked_frame is not None:
-            frame = copy.deepcopy(linked_frame)
+            frame = linked_frame
             if dpg_node_tag in self.configs["instances"]:
                 frame, inference_message = self.configs["instances"][dpg_node_tag](
                     frame
@@ -275,14 +277,12 @@ async def refresh(self, node_id, node_models, node_frames, node_messages):
                         "inference": inference_message,
                     }
                 )
-            texture = self.get_image_texture(
+            self.update_preview(
+                dpg_node_tag,
                 frame,
                 self.settings["node_width"],
                 self.settings["node_height"],
             )
-            if self.settings["gui"]:
-                if dpg.does_item_exist(dpg_node_tag + ":texture"):
-                    dpg.set_value(dpg_node_tag + ":texture", texture)
 
         # Control output
         if self.settings["gui"]:
@@ -299,6 +299,9 @@ def close(self, node_id):
 
     def delete(self, node_id):
         dpg_node_tag = str(node_id) + ":" + self.name.lower().replace(" ", "_")
+        self.release_image_texture(dpg_node_tag)
+        self.configs["instances"].pop(dpg_node_tag, None)
+        model_registry.release(dpg_node_tag)
         if self.settings["gui"]:
             dpg.delete_item(dpg_node_tag + ":modal")
             dpg.delete_item(dpg_node_tag + ":file_dialog_model")
@@ -345,14 +348,9 @@ def set_import_params(self, node_id, params):
             dpg_node_tag in self.configs["model_filepaths"]
             and dpg_node_tag in self.configs["labels_filepaths"]
         ):
-            link_class = self.configs["models"][self.forms["model"][dpg_node_tag]]
             if self.settings["gui"]:
                 dpg.set_item_label(dpg_node_tag + ":connect", "...")
-            self.configs["instances"][dpg_node_tag] = link_class()
-            self.configs["instances"][dpg_node_tag].connect(
-                model_filepath=self.configs["model_filepaths"][dpg_node_tag],
-                labels_filepath=self.configs["labels_filepaths"][dpg_node_tag],
-            )
+            self.connect(dpg_node_tag)
             if self.configs["instances"][dpg_node_tag].is_active:
                 self.configs["status"][dpg_node_tag] = "active"
                 if self.settings["gui"]:
@@ -364,9 +362,32 @@ def set_import_params(self, node_id, params):
                     dpg.disable_item(dpg_node_tag + ":labelsfile")
                     dpg.show_item(dpg_node_tag + ":modelfileNetron")
             else:
+                del self.configs["instances"][dpg_node_tag]
+                model_registry.release(dpg_node_tag, discard=True)
                 if self.settings["gui"]:
                     dpg.set_item_label(dpg_node_tag + ":connect", self.configs["label_connect"])
 
+    def connect(self, dpg_node_tag):
+        # Nodes with the same model and labels files share one model
+        link_class = self.configs["models"][self.forms["model"][dpg_node_tag]]
+        model_filepath = self.configs["model_filepaths"][dpg_node_tag]
+        labels_filepath = self.configs["labels_filepaths"][dpg_node_tag]
+
+        def load():
+            instance = link_class()
+            instance.connect(
+                model_filepath=model_filepath,
+                labels_filepath=labels_filepath,
+                session_factory=session_factory,
+            )
+            return instance
+
+        self.configs["instances"][dpg_node_tag] = model_registry.acquire(
+            dpg_node_tag,
+            get_model_key(link_class, model_filepath, labels_filepath=labels_filepath),
+            load,
+        )
+
     def callback_button_connect(self, sender, data, user_data):
         dpg_node_tag = user_data
         if (
@@ -374,22 +395,16 @@ def callback_button_connect(self, sender, data, user_data):
             == self.configs["label_connect"]
         ):
             if dpg_node_tag not in self.configs["instances"]:
-                link_class = self.configs["models"][
-                    dpg.get_value(dpg_node_tag + ":model")
-                    if dpg.does_item_exist(dpg_node_tag + ":model")
-                    else None
-                ]
                 dpg.set_item_label(dpg_node_tag + ":connect", "...")
-                self.configs["instances"][dpg_node_tag] = link_class()
                 if (
                     dpg_node_tag in self.configs["model_filepaths"]
                     and dpg_node_tag in self.configs["labels_filepaths"]
                 ):
-                    self.configs["instances"][dpg_node_tag].connect(
-                        model_filepath=self.configs["model_filepaths"][dpg_node_tag],
-                        labels_filepath=self.configs["labels_filepaths"][dpg_node_tag],
-                    )
-            if self.configs["instances"][dpg_node_tag].is_active:
+                    self.connect(dpg_node_tag)
+            if (
+                dpg_node_tag in self.configs["instances"]
+                and self.configs["instances"][dpg_node_tag].is_active
+            ):
                 dpg.set_item_label(
                     dpg_node_tag + ":connect", self.configs["label_connected"]
                 )
@@ -399,7 +414,8 @@ def callback_button_connect(self, sender, data, user_data):
                 dpg.show_item(dpg_node_tag + ":modelfileNetron")
                 self.configs["status"][dpg_node_tag] = "active"
             else:
-                del self.configs["instances"][dpg_node_tag]
+                self.configs["instances"].pop(dpg_node_tag, None)
+                model_registry.release(dpg_node_tag, discard=True)
                 dpg.set_item_label(
                     dpg_node_tag + ":connect", self.configs["label_connect"]
                 )
@@ -410,6 +426,7 @@ def callback_button_connect(self, sender, data, user_data):
             == self.configs["label_connected"]
         ):
             del self.configs["instances"][dpg_node_tag]
+            model_registry.release(dpg_node_tag)
             dpg.set_item_label(dpg_node_tag + ":connect", self.configs["label_connect"])
             self.configs["status"][dpg_node_tag] = "inactive"
             dpg.enable_item(dpg_node_tag + ":model")
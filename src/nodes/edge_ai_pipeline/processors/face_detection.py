@@ -1,4 +1,3 @@
-import copy
 import logging
 
 from gui.constants import Attribute, PinShape
@@ -6,6 +5,8 @@
 from models.mediapipe_face_detection.model import MediaPipeFaceDetection
 from models.mediapipe_face_mesh.model import MediaPipeFaceMesh
 from nodes.edge_ai_pipeline.base import BaseNode
+from runtime.registry import get_model_key, model_registry
+from runtime.sessions import load_model
 
 try:
     import dearpygui.dearpygui as dpg
@@ -27,7 +28,6 @@ def __init__(self, settings, logger=logging.getLogger(__name__)):
             "MediaPipe Face Detection": MediaPipeFaceDetection,
             "MediaPipe Face Mesh": MediaPipeFaceMesh,
         }
-        self.configs["instances"] = {}
         self.forms = {}
         self.forms["model"] = {}
 
@@ -131,7 +131,9 @@ def add_node(self, parent, node_id, pos):
 
                 # Add an image from a specified texture
                 with dpg.node_attribute(attribute_type=int(Attribute.STATIC)):
-                    dpg.add_image(dpg_node_tag + ":texture")
+                    dpg.add_image(
+                        dpg_node_tag + ":texture", tag=dpg_node_tag + ":image"
+                    )
 
         # Return Dear PyGui Tag
         return dpg_node_tag
@@ -146,28 +148,28 @@ async def refresh(self, node_id, node_links, node_frames, node_messages):
         # Get linked node tag
         linked_node_tag = None
         for link in node_links:
-            link_pin_shape = link[0].split(":")[2]
-            if link_pin_shape == str(int(PinShape.QUAD)):
-                linked_node_tag_message = ":".join(link[0].split(":")[:2])
+            if link.pin_shape == PinShape.QUAD:
+                linked_node_tag_message = link.source_node_tag
                 message = node_messages.get(linked_node_tag_message, None)
-            if link_pin_shape == str(int(PinShape.CIRCLE_FILLED)):
-                linked_node_tag = ":".join(link[0].split(":")[:2])
+            if link.pin_shape == PinShape.CIRCLE_FILLED:
+                linked_node_tag = link.source_node_tag
 
         # Inference
         linked_frame = node_frames.get(linked_node_tag, None)
         if linked_frame is not None:
-            frame = copy.deepcopy(linked_frame)
-            if model_name not in self.configs["instances"]:
-                self.configs["instances"][model_name] = model_class()
-            frame, inference_message = self.configs["instances"][model_name](frame)
-            texture = self.get_image_texture(
+            frame = linked_frame
+            model = model_registry.acquire(
+                dpg_node_tag,
+                get_model_key(model_class),
+                lambda: load_model(model_class),
+            )
+            frame, inference_message = model(frame)
+            self.update_preview(
+                dpg_node_tag,
                 frame,
                 self.settings["node_width"],
                 self.settings["node_height"],
             )
-            if self.settings["gui"]:
-                if dpg.does_item_exist(dpg_node_tag + ":texture"):
-                    dpg.set_value(dpg_node_tag + ":texture", texture)
 
             # Generate message
             if message is None:
@@ -195,6 +197,8 @@ def close(self, node_id):
 
     def delete(self, node_id):
         dpg_node_tag = str(node_id) + ":" + self.name.lower().replace(" ", "_")
+        self.release_image_texture(dpg_node_tag)
+        model_registry.release(dpg_node_tag)
         if self.settings["gui"]:
             dpg.delete_item(dpg_node_tag + ":texture")
             dpg.delete_item(dpg_node_tag)
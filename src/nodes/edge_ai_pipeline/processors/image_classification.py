@@ -1,10 +1,13 @@
-import copy
 import logging
 
 from gui.constants import Attribute, PinShape
 from models.onnx_efficientnetb0.model import EfficientNetB0
 from models.onnx_mobilenetv3small.model import MobileNetV3Small
 from nodes.edge_ai_pipeline.base import BaseNode
+from runtime.batching import inference_batcher
+from runtime.frame import FrameBatch, get_batch_item
+from runtime.registry import get_model_key, model_registry
+from runtime.sessions import load_model
 
 try:
     import dearpygui.dearpygui as dpg
@@ -18,6 +21,7 @@ def __init__(self, settings, logger=logging.getLogger(__name__)):
         self.name = "Image Classification"
         self.theme_titlebar = [102, 51, 0]
         self.theme_titlebar_selected = [153, 76, 0]
+        self.batch_aware = True
         self.settings = settings
         self.logger = logger
         self.configs = {}
@@ -25,7 +29,6 @@ def __init__(self, settings, logger=logging.getLogger(__name__)):
             "MobileNet V3 Small": MobileNetV3Small,
             "EfficientNet B0": EfficientNetB0,
         }
-        self.configs["instances"] = {}
         self.forms = {}
         self.forms["model"] = {}
 
@@ -129,7 +132,9 @@ def add_node(self, parent, node_id, pos):
 
                 # Add an image from a specified texture
                 with dpg.node_attribute(attribute_type=int(Attribute.STATIC)):
-                    dpg.add_image(dpg_node_tag + ":texture")
+                    dpg.add_image(
+                        dpg_node_tag + ":texture", tag=dpg_node_tag + ":image"
+                    )
 
         # Return Dear PyGui Tag
         return dpg_node_tag
@@ -144,28 +149,43 @@ async def refresh(self, node_id, node_links, node_frames, node_messages):
         # Get linked node tag
         linked_node_tag = None
         for link in node_links:
-            link_pin_shape = link[0].split(":")[2]
-            if link_pin_shape == str(int(PinShape.QUAD)):
-                linked_node_tag_message = ":".join(link[0].split(":")[:2])
+            if link.pin_shape == PinShape.QUAD:
+                linked_node_tag_message = link.source_node_tag
                 message = node_messages.get(linked_node_tag_message, None)
-            if link_pin_shape == str(int(PinShape.CIRCLE_FILLED)):
-                linked_node_tag = ":".join(link[0].split(":")[:2])
+            if link.pin_shape == PinShape.CIRCLE_FILLED:
+                linked_node_tag = link.source_node_tag
 
-        # Inference
+        # Inference, a micro-batch of frames runs in one model call
         linked_frame = node_frames.get(linked_node_tag, None)
-        if linked_frame is not None:
-            frame = copy.deepcopy(linked_frame)
-            if model_name not in self.configs["instances"]:
-                self.configs["instances"][model_name] = model_class()
-            frame, inference_message = self.configs["instances"][model_name](frame)
-            texture = self.get_image_texture(
+        if isinstance(linked_frame, FrameBatch):
+            model = model_registry.acquire(
+                dpg_node_tag,
+                get_model_key(model_class),
+                lambda: load_model(model_class),
+            )
+            frame, message = self.refresh_batch(
+                dpg_node_tag, model, linked_frame, message
+            )
+        elif linked_frame is not None:
+            frame = linked_frame
+            model = model_registry.acquire(
+                dpg_node_tag,
+                get_model_key(model_class),
+                lambda: load_model(model_class),
+            )
+            frame, inference_message = await inference_batcher.infer(
+                model,
+                frame,
+                model_registry.get_references(
+                    dpg_node_tag, inference_batcher.get_peers(dpg_node_tag)
+                ),
+            )
+            self.update_preview(
+                dpg_node_tag,
                 frame,
                 self.settings["node_width"],
                 self.settings["node_height"],
             )
-            if self.settings["gui"]:
-                if dpg.does_item_exist(dpg_node_tag + ":texture"):
-                    dpg.set_value(dpg_node_tag + ":texture", texture)
 
             # Generate message
             if message is None:
@@ -187,11 +207,38 @@ async def refresh(self, node_id, node_links, node_frames, node_messages):
         # Return frame and message
         return frame, message
 
+    def refresh_batch(self, dpg_node_tag, model, linked_frames, linked_messages):
+        frames = FrameBatch()
+        messages = FrameBatch()
+        results = model.batch(linked_frames) if len(linked_frames) > 0 else []
+        for index, (frame, inference_message) in enumerate(results):
+            message = get_batch_item(linked_messages, index)
+            message = list(message) if message is not None else []
+            message.append(
+                {
+                    "type": "processor",
+                    "subtype": self.name.lower().replace(" ", "_"),
+                    "inference": inference_message,
+                }
+            )
+            frames.append(frame)
+            messages.append(message)
+        if len(frames) > 0:
+            self.update_preview(
+                dpg_node_tag,
+                frames[-1],
+                self.settings["node_width"],
+                self.settings["node_height"],
+            )
+        return frames, messages
+
     def close(self, node_id):
         pass
 
     def delete(self, node_id):
         dpg_node_tag = str(node_id) + ":" + self.name.lower().replace(" ", "_")
+        self.release_image_texture(dpg_node_tag)
+        model_registry.release(dpg_node_tag)
         if self.settings["gui"]:
             dpg.delete_item(dpg_node_tag + ":texture")
             dpg.delete_item(dpg_node_tag)
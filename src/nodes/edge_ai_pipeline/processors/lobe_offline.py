@@ -1,4 +1,3 @@
-import copy
 import logging
 import os
 import webbrowser
@@ -6,6 +5,8 @@
 from gui.constants import Attribute, PinShape
 from models.onnx_lobe.model import LobeClassification
 from nodes.edge_ai_pipeline.base import BaseNode
+from runtime.registry import get_model_key, model_registry
+from runtime.sessions import session_factory
 
 try:
     import dearpygui.dearpygui as dpg
@@ -203,7 +204,9 @@ def add_node(self, parent, node_id, pos):
 
                 # Add an image from a specified texture
                 with dpg.node_attribute(attribute_type=int(Attribute.STATIC)):
-                    dpg.add_image(dpg_node_tag + ":texture")
+                    dpg.add_image(
+                        dpg_node_tag + ":texture", tag=dpg_node_tag + ":image"
+                    )
 
         # Return Dear PyGui Tag
         return dpg_node_tag
@@ -216,17 +219,16 @@ async def refresh(self, node_id, node_models, node_frames, node_messages):
         # Get linked node tag
         linked_node_tag = None
         for link in node_models:
-            link_pin_shape = link[0].split(":")[2]
-            if link_pin_shape == str(int(PinShape.QUAD)):
-                linked_node_tag_message = ":".join(link[0].split(":")[:2])
+            if link.pin_shape == PinShape.QUAD:
+                linked_node_tag_message = link.source_node_tag
                 message = node_messages.get(linked_node_tag_message, None)
-            if link_pin_shape == str(int(PinShape.CIRCLE_FILLED)):
-                linked_node_tag = ":".join(link[0].split(":")[:2])
+            if link.pin_shape == PinShape.CIRCLE_FILLED:
+                linked_node_tag = link.source_node_tag
 
         # Inference
         linked_frame = node_frames.get(linked_node_tag, None)
         if linked_frame is not None:
-            frame = copy.deepcopy(linked_frame)
+            frame = linked_frame
             if dpg_node_tag in self.configs["instances"]:
                 frame, inference_message = self.configs["instances"][dpg_node_tag](
                     frame
@@ -240,14 +242,12 @@ async def refresh(self, node_id, node_models, node_frames, node_messages):
                         "inference": inference_message,
                     }
                 )
-            texture = self.get_image_texture(
+            self.update_preview(
+                dpg_node_tag,
                 frame,
                 self.settings["node_width"],
                 self.settings["node_height"],
             )
-            if self.settings["gui"]:
-                if dpg.does_item_exist(dpg_node_tag + ":texture"):
-                    dpg.set_value(dpg_node_tag + ":texture", texture)
 
         # Control output
         if self.settings["gui"]:
@@ -264,6 +264,9 @@ def close(self, node_id):
 
     def delete(self, node_id):
         dpg_node_tag = str(node_id) + ":" + self.name.lower().replace(" ", "_")
+        self.release_image_texture(dpg_node_tag)
+        self.configs["instances"].pop(dpg_node_tag, None)
+        model_registry.release(dpg_node_tag)
         if self.settings["gui"]:
             dpg.delete_item(dpg_node_tag + ":modal")
             dpg.delete_item(dpg_node_tag + ":file_dialog_model")
@@ -295,13 +298,9 @@ def set_import_params(self, node_id, params):
                 value="Select Signature : selected",
             )
         if dpg_node_tag in self.configs["signature_filepaths"]:
-            link_class = self.configs["models"][self.forms["model"][dpg_node_tag]]
             if self.settings["gui"]:
                 dpg.set_item_label(dpg_node_tag + ":connect", "...")
-            self.configs["instances"][dpg_node_tag] = link_class()
-            self.configs["instances"][dpg_node_tag].connect(
-                signature_filepath=self.configs["signature_filepaths"][dpg_node_tag]
-            )
+            self.connect(dpg_node_tag)
             if self.configs["instances"][dpg_node_tag].is_connect():
                 self.configs["status"][dpg_node_tag] = "active"
                 if self.settings["gui"]:
@@ -312,11 +311,30 @@ def set_import_params(self, node_id, params):
                     dpg.disable_item(dpg_node_tag + ":signaturefile")
                     dpg.show_item(dpg_node_tag + ":modelfileNetron")
             else:
+                del self.configs["instances"][dpg_node_tag]
+                model_registry.release(dpg_node_tag, discard=True)
                 if self.settings["gui"]:
                     dpg.set_item_label(
                         dpg_node_tag + ":connect", self.configs["label_connect"]
                     )
 
+    def connect(self, dpg_node_tag):
+        # Nodes with the same signature file share one model
+        link_class = self.configs["models"][self.forms["model"][dpg_node_tag]]
+        signature_filepath = self.configs["signature_filepaths"][dpg_node_tag]
+
+        def load():
+            instance = link_class()
+            instance.connect(
+                signature_filepath=signature_filepath,
+                session_factory=session_factory,
+            )
+            return instance
+
+        self.configs["instances"][dpg_node_tag] = model_registry.acquire(
+            dpg_node_tag, get_model_key(link_class, signature_filepath), load
+        )
+
     def callback_button_connect(self, sender, data, user_data):
         dpg_node_tag = user_data
         if (
@@ -325,13 +343,12 @@ def callback_button_connect(self, sender, data, user_data):
         ):
             if dpg_node_tag not in self.configs["instances"]:
                 dpg.set_item_label(dpg_node_tag + ":connect", "...")
-                link_class = self.configs["models"][self.forms["model"][dpg_node_tag]]
-                self.configs["instances"][dpg_node_tag] = link_class()
                 if dpg_node_tag in self.configs["signature_filepaths"]:
-                    self.configs["instances"][dpg_node_tag].connect(
-                        signature_filepath=self.configs["signature_filepaths"][dpg_node_tag]
-                    )
-            if self.configs["instances"][dpg_node_tag].is_connect():
+                    self.connect(dpg_node_tag)
+            if (
+                dpg_node_tag in self.configs["instances"]
+                and self.configs["instances"][dpg_node_tag].is_connect()
+            ):
                 dpg.set_item_label(
                     dpg_node_tag + ":connect", self.configs["label_connected"]
                 )
@@ -340,7 +357,8 @@ def callback_button_connect(self, sender, data, user_data):
                 dpg.show_item(dpg_node_tag + ":modelfileNetron")
                 self.configs["status"][dpg_node_tag] = "active"
             else:
-                del self.configs["instances"][dpg_node_tag]
+                self.configs["instances"].pop(dpg_node_tag, None)
+                model_registry.release(dpg_node_tag, discard=True)
                 dpg.set_item_label(
                     dpg_node_tag + ":connect", self.configs["label_connect"]
                 )
@@ -352,6 +370,7 @@ def callback_button_connect(self, sender, data, user_data):
         ):
             if dpg_node_tag in self.configs["instances"]:
                 del self.configs["instances"][dpg_node_tag]
+                model_registry.release(dpg_node_tag)
             dpg.set_item_label(dpg_node_tag + ":connect", self.configs["label_connect"])
             self.configs["status"][dpg_node_tag] = "inactive"
             dpg.enable_item(dpg_node_tag + ":model")
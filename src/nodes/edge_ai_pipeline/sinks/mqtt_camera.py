@@ -194,7 +194,9 @@ def add_node(self, parent, node_id, pos):
 
                 # Add an image from a specified texture
                 with dpg.node_attribute(attribute_type=int(Attribute.STATIC)):
-                    dpg.add_image(dpg_node_tag + ":texture")
+                    dpg.add_image(
+                        dpg_node_tag + ":texture", tag=dpg_node_tag + ":image"
+                    )
 
         # Return Dear PyGui Tag
         return dpg_node_tag
@@ -205,9 +207,8 @@ async def refresh(self, node_id, node_links, node_frames, node_messages):
         # Get linked node tag
         linked_node_tag = None
         for link in node_links:
-            link_pin_shape = link[0].split(":")[2]
-            if link_pin_shape == str(int(PinShape.CIRCLE_FILLED)):
-                linked_node_tag = ":".join(link[0].split(":")[:2])
+            if link.pin_shape == PinShape.CIRCLE_FILLED:
+                linked_node_tag = link.source_node_tag
 
         # Publish
         linked_frame = node_frames.get(linked_node_tag, None)
@@ -215,14 +216,12 @@ async def refresh(self, node_id, node_links, node_frames, node_messages):
             if self.configs["states"][dpg_node_tag] == NoteState.CONNECTED:
                 if dpg_node_tag in self.configs["instances"]:
                     self.configs["instances"][dpg_node_tag].publish_image(linked_frame)
-            texture = self.get_image_texture(
+            self.update_preview(
+                dpg_node_tag,
                 linked_frame,
                 self.settings["node_width"],
                 self.settings["node_height"],
             )
-            if self.settings["gui"]:
-                if dpg.does_item_exist(dpg_node_tag + ":texture"):
-                    dpg.set_value(dpg_node_tag + ":texture", texture)
 
         # Return frame and message
         return None, None
@@ -234,6 +233,7 @@ def close(self, node_id):
 
     def delete(self, node_id):
         dpg_node_tag = str(node_id) + ":" + self.name.lower().replace(" ", "_")
+        self.release_image_texture(dpg_node_tag)
         if dpg_node_tag in self.configs["instances"]:
             self.configs["instances"][dpg_node_tag].release()
         if self.settings["gui"]:
@@ -6,6 +6,7 @@
 
 from gui.constants import Attribute, PinShape
 from nodes.edge_ai_pipeline.base import BaseNode
+from runtime.buffers import buffer_pool
 
 try:
     import dearpygui.dearpygui as dpg
@@ -113,7 +114,9 @@ def add_node(self, parent, node_id, pos):
 
                 # Add an image from a specified texture
                 with dpg.node_attribute(attribute_type=int(Attribute.STATIC)):
-                    dpg.add_image(dpg_node_tag + ":texture")
+                    dpg.add_image(
+                        dpg_node_tag + ":texture", tag=dpg_node_tag + ":image"
+                    )
 
         # Return Dear PyGui Tag
         return dpg_node_tag
@@ -126,22 +129,30 @@ async def refresh(self, node_id, node_links, node_frames, node_messages):
         # Get linked node tag
         linked_node_tag = None
         for link in node_links:
-            link_pin_shape = link[0].split(":")[2]
-            if link_pin_shape == str(int(PinShape.CIRCLE_FILLED)):
-                linked_node_tag = ":".join(link[0].split(":")[:2])
+            if link.pin_shape == PinShape.CIRCLE_FILLED:
+                linked_node_tag = link.source_node_tag
 
         # Get frame
         linked_frame = node_frames.get(linked_node_tag, None)
         if linked_frame is not None:
             if dpg_node_tag in self.configs["video_writers"]:
-                frame = cv2.resize(
+                frame_buffer = buffer_pool.acquire(
+                    (
+                        self.settings["video_writer_height"],
+                        self.settings["video_writer_width"],
+                        3,
+                    )
+                )
+                cv2.resize(
                     linked_frame,
                     (
                         self.settings["video_writer_width"],
                         self.settings["video_writer_height"],
                     ),
+                    dst=frame_buffer,
                 )
-                self.configs["video_writers"][dpg_node_tag].write(frame)
+                self.configs["video_writers"][dpg_node_tag].write(frame_buffer)
+                buffer_pool.release(frame_buffer)
 
                 # Check if fps change
                 if dpg_node_tag in self.configs["video_fps"]:
@@ -185,14 +196,12 @@ async def refresh(self, node_id, node_links, node_frames, node_messages):
                     else:
                         self.configs["timer_on"][dpg_node_tag] = False
 
-            texture = self.get_image_texture(
+            self.update_preview(
+                dpg_node_tag,
                 linked_frame,
                 self.settings["node_width"],
                 self.settings["node_height"],
             )
-            if self.settings["gui"]:
-                if dpg.does_item_exist(dpg_node_tag + ":texture"):
-                    dpg.set_value(dpg_node_tag + ":texture", texture)
             self.configs["prev_frame_flags"][dpg_node_tag] = True
         else:
             if self.settings["gui"]:
@@ -214,7 +223,9 @@ def close(self, node_id):
             del self.configs["video_writers"][dpg_node_tag]
 
     def delete(self, node_id):
+        self.close(node_id)
         dpg_node_tag = str(node_id) + ":" + self.name.lower().replace(" ", "_")
+        self.release_image_texture(dpg_node_tag)
         if self.settings["gui"]:
             dpg.delete_item(dpg_node_tag + ":texture")
             dpg.delete_item(dpg_node_tag)
@@ -0,0 +1,281 @@
+import logging
+
+from gui.constants import Attribute, NoteState, PinShape
+from links.zmq_frame.link import ZMQFrameLink
+from nodes.edge_ai_pipeline.base import BaseNode
+from runtime.frame import get_frame_envelope
+
+try:
+    import dearpygui.dearpygui as dpg
+except ImportError:
+    pass
+
+
+class EdgeAINode(BaseNode):
+    def __init__(self, settings, logger=logging.getLogger(__name__)):
+        self.version = "0.1.0"
+        self.name = "Remote Sink"
+        self.theme_titlebar = [102, 0, 102]
+        self.theme_titlebar_selected = [153, 0, 153]
+        self.settings = settings
+        self.logger = logger
+        self.configs = {}
+        self.configs["patterns"] = list(ZMQFrameLink.patterns.keys())
+        self.configs["encodings"] = list(ZMQFrameLink.encodings.keys())
+        self.configs["instances"] = {}
+        self.configs["states"] = {}
+        self.forms = {}
+        self.forms["pattern"] = {}
+        self.forms["endpoint"] = {}
+        self.forms["encoding"] = {}
+
+    def add_node(self, parent, node_id, pos):
+        # Describe node attribute tags
+        dpg_node_tag = str(node_id) + ":" + self.name.lower().replace(" ", "_")
+        dpg_pin_tags = self.get_tag_list(dpg_node_tag)
+        self.configs["states"][dpg_node_tag] = NoteState.CONNECT
+        self.forms["pattern"][dpg_node_tag] = self.configs["patterns"][0]
+        self.forms["endpoint"][dpg_node_tag] = "tcp://*:5560"
+        self.forms["encoding"][dpg_node_tag] = self.configs["encodings"][0]
+
+        if self.settings["gui"]:
+            # Add a dynamic texture and a raw texture
+            with dpg.texture_registry(show=False):
+                dpg.add_raw_texture(
+                    self.settings["node_width"],
+                    self.settings["node_height"],
+                    self.get_blank_texture(
+                        self.settings["node_width"], self.settings["node_height"]
+                    ),
+                    tag=dpg_node_tag + ":texture",
+                    format=dpg.mvFormat_Float_rgba,
+                )
+
+            # Add a Popup window
+            with dpg.window(
+                label="Connection Failure",
+                modal=True,
+                show=False,
+                width=200,
+                pos=[200, 200],
+                tag=dpg_node_tag + ":modal",
+            ):
+                dpg.add_button(
+                    label="OK",
+                    width=-1,
+                    callback=lambda: dpg.configure_item(
+                        dpg_node_tag + ":modal", show=False
+                    ),
+                )
+
+            # Add a node to a node editor
+            with dpg.node(
+                tag=dpg_node_tag, parent=parent, label=self.name, pos=pos
+            ) as dpg_node:
+                # Set node color
+                with dpg.theme() as dpg_theme:
+                    with dpg.theme_component(dpg.mvNode):
+                        dpg.add_theme_color(
+                            dpg.mvNodeCol_TitleBar,
+                            self.theme_titlebar,
+                            category=dpg.mvThemeCat_Nodes,
+                        )
+                        dpg.add_theme_color(
+                            dpg.mvNodeCol_TitleBarHovered,
+                            self.theme_titlebar_selected,
+                            category=dpg.mvThemeCat_Nodes,
+                        )
+                        dpg.add_theme_color(
+                            dpg.mvNodeCol_TitleBarSelected,
+                            self.theme_titlebar_selected,
+                            category=dpg.mvThemeCat_Nodes,
+                        )
+                        dpg.add_theme_color(
+                            dpg.mvNodeCol_NodeOutline,
+                            self.theme_titlebar,
+                            category=dpg.mvThemeCat_Nodes,
+                        )
+                        dpg.bind_item_theme(dpg_node, dpg_theme)
+
+                # Add pins that allows linking inputs and outputs
+                with dpg.node_attribute(
+                    attribute_type=int(Attribute.INPUT),
+                    tag=dpg_pin_tags[self.VIDEO_IN],
+                ):
+                    dpg.add_text("VIDEO IN")
+                with dpg.node_attribute(
+                    attribute_type=int(Attribute.INPUT),
+                    shape=int(PinShape.QUAD),
+                    tag=dpg_pin_tags[self.MESSAGE_IN],
+                ):
+                    dpg.add_text("MESSAGE IN")
+
+                # Add combo dropdowns that allows selecting pattern and encoding
+                with dpg.node_attribute(attribute_type=int(Attribute.STATIC)):
+                    dpg.add_spacer(height=5)
+                    dpg.add_combo(
+                        self.configs["patterns"],
+                        default_value=self.forms["pattern"][dpg_node_tag],
+                        width=self.settings["node_width"],
+                        tag=dpg_node_tag + ":pattern",
+                    )
+                    dpg.add_combo(
+                        self.configs["encodings"],
+                        default_value=self.forms["encoding"][dpg_node_tag],
+                        width=self.settings["node_width"],
+                        tag=dpg_node_tag + ":encoding",
+                    )
+
+                # Add an input for the bind endpoint
+                with dpg.node_attribute(attribute_type=int(Attribute.STATIC)):
+                    dpg.add_input_text(
+                        label="Endpoint",
+                        no_spaces=True,
+                        width=self.settings["node_width"] - 65,
+                        default_value=self.forms["endpoint"][dpg_node_tag],
+                        tag=dpg_node_tag + ":endpoint",
+                    )
+                    with dpg.tooltip(dpg_node_tag + ":endpoint"):
+                        dpg.add_text(
+                            "Bind Endpoint (e.g. tcp://*:5560)",
+                            tag=dpg_node_tag + ":endpoint:tooltip",
+                        )
+
+                # Add a button for binding
+                with dpg.node_attribute(attribute_type=int(Attribute.STATIC)):
+                    dpg.add_button(
+                        label=self.configs["states"][dpg_node_tag],
+                        width=self.settings["node_width"],
+                        callback=self.callback_button_connect,
+                        user_data=dpg_node_tag,
+                        tag=dpg_node_tag + ":connect",
+                    )
+
+                # Add an image from a specified texture
+                with dpg.node_attribute(attribute_type=int(Attribute.STATIC)):
+                    dpg.add_image(
+                        dpg_node_tag + ":texture", tag=dpg_node_tag + ":image"
+                    )
+
+        # Return Dear PyGui Tag
+        return dpg_node_tag
+
+    async def refresh(self, node_id, node_links, node_frames, node_messages):
+        dpg_node_tag = str(node_id) + ":" + self.name.lower().replace(" ", "_")
+
+        # Get linked node tag
+        linked_node_tag_frame = None
+        linked_node_tag_message = None
+        for link in node_links:
+            if link.pin_shape == PinShape.CIRCLE_FILLED:
+                linked_node_tag_frame = link.source_node_tag
+            elif link.pin_shape == PinShape.QUAD:
+                linked_node_tag_message = link.source_node_tag
+
+        # Send frame and message to the remote instance
+        linked_frame = node_frames.get(linked_node_tag_frame, None)
+        linked_message = node_messages.get(linked_node_tag_message, None)
+        if linked_frame is not None or linked_message is not None:
+            if self.configs["states"][dpg_node_tag] == NoteState.CONNECTED:
+                if dpg_node_tag in self.configs["instances"]:
+                    envelope = get_frame_envelope(linked_frame)
+                    self.configs["instances"][dpg_node_tag].send(
+                        linked_frame,
+                        linked_message,
+                        sequence=envelope.sequence if envelope is not None else None,
+                    )
+        if linked_frame is not None:
+            self.update_preview(
+                dpg_node_tag,
+                linked_frame,
+                self.settings["node_width"],
+                self.settings["node_height"],
+            )
+
+        # Return frame and message
+        return None, None
+
+    def close(self, node_id):
+        dpg_node_tag = str(node_id) + ":" + self.name.lower().replace(" ", "_")
+        if dpg_node_tag in self.configs["instances"]:
+            self.configs["instances"][dpg_node_tag].release()
+
+    def delete(self, node_id):
+        dpg_node_tag = str(node_id) + ":" + self.name.lower().replace(" ", "_")
+        self.release_image_texture(dpg_node_tag)
+        if dpg_node_tag in self.configs["instances"]:
+            self.configs["instances"][dpg_node_tag].release()
+            del self.configs["instances"][dpg_node_tag]
+        if self.settings["gui"]:
+            dpg.delete_item(dpg_node_tag + ":modal")
+            dpg.delete_item(dpg_node_tag + ":texture")
+            dpg.delete_item(dpg_node_tag)
+
+    def get_export_params(self, node_id):
+        dpg_node_tag = str(node_id) + ":" + self.name.lower().replace(" ", "_")
+        params = {}
+        params["version"] = self.version
+        params["position"] = [0, 0]
+        params["pattern"] = self.forms["pattern"][dpg_node_tag]
+        params["endpoint"] = self.forms["endpoint"][dpg_node_tag]
+        params["encoding"] = self.forms["encoding"][dpg_node_tag]
+        if self.settings["gui"]:
+            params["position"] = dpg.get_item_pos(dpg_node_tag)
+        return params
+
+    def set_import_params(self, node_id, params):
+        dpg_node_tag = str(node_id) + ":" + self.name.lower().replace(" ", "_")
+        for key in ["pattern", "endpoint", "encoding"]:
+            if key in params:
+                self.forms[key][dpg_node_tag] = params[key]
+                if self.settings["gui"]:
+                    dpg.set_value(dpg_node_tag + ":" + key, params[key])
+        if "endpoint" in params:
+            self.connect(dpg_node_tag)
+            if self.configs["states"][dpg_node_tag] != NoteState.CONNECTED:
+                self.logger.warning(
+                    "{} failed to bind {}".format(dpg_node_tag, params["endpoint"])
+                )
+
+    def connect(self, dpg_node_tag):
+        instance = ZMQFrameLink(
+            self.forms["endpoint"][dpg_node_tag],
+            pattern=self.forms["pattern"][dpg_node_tag],
+            encoding=self.forms["encoding"][dpg_node_tag],
+        )
+        instance.bind()
+        if instance.is_connected:
+            self.configs["instances"][dpg_node_tag] = instance
+            self.configs["states"][dpg_node_tag] = NoteState.CONNECTED
+            if self.settings["gui"]:
+                dpg.set_item_label(dpg_node_tag + ":connect", NoteState.CONNECTED)
+                dpg.disable_item(dpg_node_tag + ":pattern")
+                dpg.disable_item(dpg_node_tag + ":endpoint")
+                dpg.disable_item(dpg_node_tag + ":encoding")
+
+    def callback_button_connect(self, sender, data, user_data):
+        dpg_node_tag = user_data
+        if self.configs["states"][dpg_node_tag] == NoteState.CONNECT:
+            dpg.set_item_label(dpg_node_tag + ":connect", "...")
+            self.forms["pattern"][dpg_node_tag] = dpg.get_value(
+                dpg_node_tag + ":pattern"
+            )
+            self.forms["endpoint"][dpg_node_tag] = dpg.get_value(
+                dpg_node_tag + ":endpoint"
+            )
+            self.forms["encoding"][dpg_node_tag] = dpg.get_value(
+                dpg_node_tag + ":encoding"
+            )
+            self.connect(dpg_node_tag)
+            if self.configs["states"][dpg_node_tag] != NoteState.CONNECTED:
+                dpg.set_item_label(dpg_node_tag + ":connect", NoteState.CONNECT)
+                dpg.show_item(dpg_node_tag + ":modal")
+        elif self.configs["states"][dpg_node_tag] == NoteState.CONNECTED:
+            if dpg_node_tag in self.configs["instances"]:
+                self.configs["instances"][dpg_node_tag].release()
+                del self.configs["instances"][dpg_node_tag]
+            self.configs["states"][dpg_node_tag] = NoteState.CONNECT
+            dpg.set_item_label(dpg_node_tag + ":connect", NoteState.CONNECT)
+            dpg.enable_item(dpg_node_tag + ":pattern")
+            dpg.enable_item(dpg_node_tag + ":endpoint")
+            dpg.enable_item(dpg_node_tag + ":encoding")
@@ -101,7 +101,9 @@ def add_node(self, parent, node_id, pos):
 
                 # Add an image from a specified texture
                 with dpg.node_attribute(attribute_type=int(Attribute.STATIC)):
-                    dpg.add_image(dpg_node_tag + ":texture")
+                    dpg.add_image(
+                        dpg_node_tag + ":texture", tag=dpg_node_tag + ":image"
+                    )
 
         # Return Dear PyGui Tag
         return dpg_node_tag
@@ -112,30 +114,28 @@ async def refresh(self, node_id, node_links, node_frames, node_messages):
         # Get linked node tag
         linked_node_tag = None
         for link in node_links:
-            link_pin_shape = link[0].split(":")[2]
-            if link_pin_shape == str(int(PinShape.CIRCLE_FILLED)):
-                linked_node_tag = ":".join(link[0].split(":")[:2])
+            if link.pin_shape == PinShape.CIRCLE_FILLED:
+                linked_node_tag = link.source_node_tag
 
         # Get frame
         linked_frame = node_frames.get(linked_node_tag, None)
         if linked_frame is not None:
-            resized_frame = cv2.resize(
+            # Resize straight into the shared memory for video streaming
+            cv2.resize(
                 linked_frame,
                 (
                     self.settings["video_streaming_width"],
                     self.settings["video_streaming_height"],
                 ),
+                dst=self.settings["shm"],
                 interpolation=cv2.INTER_AREA,
             )
-            self.settings["shm"][:] = resized_frame
-            texture = self.get_image_texture(
+            self.update_preview(
+                dpg_node_tag,
                 linked_frame,
                 self.settings["node_width"],
                 self.settings["node_height"],
             )
-            if self.settings["gui"]:
-                if dpg.does_item_exist(dpg_node_tag + ":texture"):
-                    dpg.set_value(dpg_node_tag + ":texture", texture)
 
         # Return Dear PyGui Tag
         return None, None
@@ -145,6 +145,7 @@ def close(self, node_id):
 
     def delete(self, node_id):
         dpg_node_tag = str(node_id) + ":" + self.name.lower().replace(" ", "_")
+        self.release_image_texture(dpg_node_tag)
         if self.settings["gui"]:
             dpg.delete_item(dpg_node_tag + ":texture")
             dpg.delete_item(dpg_node_tag)
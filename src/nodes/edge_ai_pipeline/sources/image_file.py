@@ -154,7 +154,9 @@ def add_node(self, parent, node_id, pos):
 
                 # Add an image from a specified texture
                 with dpg.node_attribute(attribute_type=int(Attribute.STATIC)):
-                    dpg.add_image(dpg_node_tag + ":texture")
+                    dpg.add_image(
+                        dpg_node_tag + ":texture", tag=dpg_node_tag + ":image"
+                    )
 
         # Return Dear PyGui Tag
         return dpg_node_tag
@@ -177,12 +179,12 @@ async def refresh(self, node_id, node_links, node_frames, node_messages):
 
         # Capture frame-by-frame
         if frame is not None:
-            texture = self.get_image_texture(
-                frame, self.settings["node_width"], self.settings["node_height"]
+            self.update_preview(
+                dpg_node_tag,
+                frame,
+                self.settings["node_width"],
+                self.settings["node_height"],
             )
-            if self.settings["gui"]:
-                if dpg.does_item_exist(dpg_node_tag + ":texture"):
-                    dpg.set_value(dpg_node_tag + ":texture", texture)
 
             # Generate message
             h, w, _ = frame.shape
@@ -213,6 +215,7 @@ def close(self, node_id):
 
     def delete(self, node_id):
         dpg_node_tag = str(node_id) + ":" + self.name.lower().replace(" ", "_")
+        self.release_image_texture(dpg_node_tag)
         if dpg_node_tag in self.configs["prev_image_paths"]:
             del self.configs["prev_image_paths"][dpg_node_tag]
         if dpg_node_tag in self.configs["image_paths"]:
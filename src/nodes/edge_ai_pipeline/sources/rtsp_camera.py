@@ -4,6 +4,7 @@
 
 from gui.constants import Attribute, PinShape
 from nodes.edge_ai_pipeline.base import BaseNode
+from runtime.buffers import read_capture
 
 try:
     import dearpygui.dearpygui as dpg
@@ -149,7 +150,9 @@ def add_node(self, parent, node_id, pos):
 
                 # Add an image from a specified texture
                 with dpg.node_attribute(attribute_type=int(Attribute.STATIC)):
-                    dpg.add_image(dpg_node_tag + ":texture")
+                    dpg.add_image(
+                        dpg_node_tag + ":texture", tag=dpg_node_tag + ":image"
+                    )
 
         # Return Dear PyGui Tag
         return dpg_node_tag
@@ -163,14 +166,14 @@ async def refresh(self, node_id, node_links, node_frames, node_messages):
         # Capture frame-by-frame
         if self.forms["connect"][dpg_node_tag] == self.configs["label_connected"]:
             if dpg_node_tag in self.configs["instances"]:
-                ret, frame = self.configs["instances"][dpg_node_tag].read()
+                ret, frame = read_capture(self.configs["instances"][dpg_node_tag])
                 if ret == True:
-                    texture = self.get_image_texture(
-                        frame, self.settings["node_width"], self.settings["node_height"]
+                    self.update_preview(
+                        dpg_node_tag,
+                        frame,
+                        self.settings["node_width"],
+                        self.settings["node_height"],
                     )
-                    if self.settings["gui"]:
-                        if dpg.does_item_exist(dpg_node_tag + ":texture"):
-                            dpg.set_value(dpg_node_tag + ":texture", texture)
 
                 # Generate message
                 message = [
@@ -205,7 +208,9 @@ def close(self, node_id):
             self.configs["instances"][dpg_node_tag].release()
 
     def delete(self, node_id):
+        self.close(node_id)
         dpg_node_tag = str(node_id) + ":" + self.name.lower().replace(" ", "_")
+        self.release_image_texture(dpg_node_tag)
         if self.settings["gui"]:
             dpg.delete_item(dpg_node_tag + ":modal")
             dpg.delete_item(dpg_node_tag + ":texture")
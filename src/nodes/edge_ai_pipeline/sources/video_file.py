@@ -5,6 +5,8 @@
 
 from gui.constants import Attribute, PinShape
 from nodes.edge_ai_pipeline.base import BaseNode
+from runtime.buffers import buffer_pool, read_capture
+from runtime.frame import FrameBatch
 
 try:
     import dearpygui.dearpygui as dpg
@@ -28,6 +30,7 @@ def __init__(self, settings, logger=logging.getLogger(__name__)):
         self.forms = {}
         self.forms["loop"] = {}
         self.forms["skiprate"] = {}
+        self.forms["batchsize"] = {}
 
     def add_node(self, parent, node_id, pos):
         # Describe node attribute tags
@@ -35,6 +38,7 @@ def add_node(self, parent, node_id, pos):
         dpg_pin_tags = self.get_tag_list(dpg_node_tag)
         self.forms["loop"][dpg_node_tag] = True
         self.forms["skiprate"][dpg_node_tag] = 1
+        self.forms["batchsize"][dpg_node_tag] = 1
 
         if self.settings["gui"]:
             # Add a dynamic texture and a raw texture
@@ -180,9 +184,29 @@ def add_node(self, parent, node_id, pos):
                             tag=dpg_node_tag + ":skiprate",
                         )
 
+                # Add slider for micro-batch size (throughput mode)
+                with dpg.node_attribute(attribute_type=int(Attribute.STATIC)):
+                    dpg.add_slider_int(
+                        label="Batch",
+                        width=int(self.settings["node_width"] / 2),
+                        default_value=self.forms["batchsize"][dpg_node_tag],
+                        min_value=1,
+                        max_value=16,
+                        callback=self.callback_change_batchsize,
+                        user_data=dpg_node_tag,
+                        tag=dpg_node_tag + ":batchsize",
+                    )
+                    with dpg.tooltip(dpg_node_tag + ":batchsize"):
+                        dpg.add_text(
+                            "Frames emitted per tick, for offline throughput",
+                            tag=dpg_node_tag + ":batchsize:tooltip",
+                        )
+
                 # Add an image from a specified texture
                 with dpg.node_attribute(attribute_type=int(Attribute.STATIC)):
-                    dpg.add_image(dpg_node_tag + ":texture")
+                    dpg.add_image(
+                        dpg_node_tag + ":texture", tag=dpg_node_tag + ":image"
+                    )
 
         # Return Dear PyGui Tag
         return dpg_node_tag
@@ -205,54 +229,44 @@ async def refresh(self, node_id, node_links, node_frames, node_messages):
             self.configs["video_captures"][dpg_node_tag] = cv2.VideoCapture(movie_path)
             self.configs["prev_video_paths"][dpg_node_tag] = movie_path
             self.configs["frame_counts"][dpg_node_tag] = 0
-        loop_flag = self.forms["loop"][dpg_node_tag]
-        skip_rate = int(self.forms["skiprate"][dpg_node_tag])
+        batch_size = int(self.forms["batchsize"][dpg_node_tag])
 
         # capturing from Video file
         if dpg_node_tag in self.configs["video_captures"]:
-            while True:
-                ret, frame = self.configs["video_captures"][dpg_node_tag].read()
-                if not ret:
-                    if loop_flag:
-                        self.configs["video_captures"][dpg_node_tag].set(
-                            cv2.CAP_PROP_POS_FRAMES, 0
-                        )
-                        _, frame = self.configs["video_captures"][dpg_node_tag].read()
-                    else:
-                        self.configs["video_captures"][dpg_node_tag].release()
-                        del self.configs["video_captures"][dpg_node_tag]
-                        del self.configs["video_paths"][dpg_node_tag]
-                        del self.configs["prev_video_paths"][dpg_node_tag]
+            if batch_size > 1:
+                # Throughput mode, emit a micro-batch of consecutive frames
+                frame = FrameBatch()
+                message = FrameBatch()
+                for _ in range(batch_size):
+                    batch_frame = self.read_frame(dpg_node_tag)
+                    if batch_frame is None:
                         break
-                self.configs["frame_counts"][dpg_node_tag] += 1
-                if (self.configs["frame_counts"][dpg_node_tag] % skip_rate) == 0:
-                    break
+                    frame.append(batch_frame)
+                    message.append(self.get_message(dpg_node_tag, movie_path))
+                if len(frame) > 0:
+                    self.update_preview(
+                        dpg_node_tag,
+                        frame[-1],
+                        self.settings["node_width"],
+                        self.settings["node_height"],
+                    )
+                else:
+                    frame = None
+                    message = None
+            else:
+                frame = self.read_frame(dpg_node_tag)
 
             # Capture frame-by-frame
-            if frame is not None:
-                texture = self.get_image_texture(
-                    frame, self.settings["node_width"], self.settings["node_height"]
+            if frame is not None and not isinstance(frame, FrameBatch):
+                self.update_preview(
+                    dpg_node_tag,
+                    frame,
+                    self.settings["node_width"],
+                    self.settings["node_height"],
                 )
-                if self.settings["gui"]:
-                    if dpg.does_item_exist(dpg_node_tag + ":texture"):
-                        dpg.set_value(dpg_node_tag + ":texture", texture)
 
                 # Generate message
-                message = [
-                    {
-                        "type": "source",
-                        "subtype": self.name.lower().replace(" ", "_"),
-                        "image": {
-                            "source": movie_path,
-                            "width": self.configs["video_captures"][dpg_node_tag].get(
-                                cv2.CAP_PROP_FRAME_WIDTH
-                            ),
-                            "height": self.configs["video_captures"][dpg_node_tag].get(
-                                cv2.CAP_PROP_FRAME_HEIGHT
-                            ),
-                        },
-                    }
-                ]
+                message = self.get_message(dpg_node_tag, movie_path)
 
         # Control output
         if self.settings["gui"]:
@@ -264,11 +278,54 @@ async def refresh(self, node_id, node_links, node_frames, node_messages):
         # Return frame and message
         return frame, message
 
+    def read_frame(self, dpg_node_tag):
+        # Next frame after skipping, None at the end of a video without loop
+        frame = None
+        loop_flag = self.forms["loop"][dpg_node_tag]
+        skip_rate = int(self.forms["skiprate"][dpg_node_tag])
+        while dpg_node_tag in self.configs["video_captures"]:
+            # Skipped frames give their buffer back for the next read
+            buffer_pool.release(frame)
+            ret, frame = read_capture(self.configs["video_captures"][dpg_node_tag])
+            if not ret:
+                if loop_flag:
+                    self.configs["video_captures"][dpg_node_tag].set(
+                        cv2.CAP_PROP_POS_FRAMES, 0
+                    )
+                    _, frame = read_capture(
+                        self.configs["video_captures"][dpg_node_tag]
+                    )
+                else:
+                    self.configs["video_captures"][dpg_node_tag].release()
+                    del self.configs["video_captures"][dpg_node_tag]
+                    del self.configs["video_paths"][dpg_node_tag]
+                    del self.configs["prev_video_paths"][dpg_node_tag]
+                    break
+            self.configs["frame_counts"][dpg_node_tag] += 1
+            if (self.configs["frame_counts"][dpg_node_tag] % skip_rate) == 0:
+                break
+        return frame
+
+    def get_message(self, dpg_node_tag, movie_path):
+        video_capture = self.configs["video_captures"][dpg_node_tag]
+        return [
+            {
+                "type": "source",
+                "subtype": self.name.lower().replace(" ", "_"),
+                "image": {
+                    "source": movie_path,
+                    "width": video_capture.get(cv2.CAP_PROP_FRAME_WIDTH),
+                    "height": video_capture.get(cv2.CAP_PROP_FRAME_HEIGHT),
+                },
+            }
+        ]
+
     def close(self, node_id):
         pass
 
     def delete(self, node_id):
         dpg_node_tag = str(node_id) + ":" + self.name.lower().replace(" ", "_")
+        self.release_image_texture(dpg_node_tag)
         if dpg_node_tag in self.configs["prev_video_paths"]:
             del self.configs["prev_video_paths"][dpg_node_tag]
         if dpg_node_tag in self.configs["video_paths"]:
@@ -285,6 +342,7 @@ def get_export_params(self, node_id):
         params["position"] = [0, 0]
         params["loop"] = self.forms["loop"][dpg_node_tag]
         params["skiprate"] = int(self.forms["skiprate"][dpg_node_tag])
+        params["batchsize"] = int(self.forms["batchsize"][dpg_node_tag])
         params["video_filepath"] = ""
         if dpg_node_tag in self.configs["video_paths"]:
             params["video_filepath"] = self.configs["video_paths"][dpg_node_tag]
@@ -301,6 +359,9 @@ def set_import_params(self, node_id, params):
             if "skiprate" in params:
                 self.forms["skiprate"][dpg_node_tag] = params["skiprate"]
                 dpg.set_value(dpg_node_tag + ":skiprate", params["skiprate"])
+            if "batchsize" in params:
+                self.forms["batchsize"][dpg_node_tag] = params["batchsize"]
+                dpg.set_value(dpg_node_tag + ":batchsize", params["batchsize"])
             if "video_filepath" in params and os.path.exists(params["video_filepath"]):
                 self.configs["video_paths"][dpg_node_tag] = params["video_filepath"]
         else:
@@ -308,6 +369,8 @@ def set_import_params(self, node_id, params):
                 self.forms["loop"][dpg_node_tag] = params["loop"]
             if "skiprate" in params:
                 self.forms["skiprate"][dpg_node_tag] = params["skiprate"]
+            if "batchsize" in params:
+                self.forms["batchsize"][dpg_node_tag] = params["batchsize"]
             if "video_filepath" in params and os.path.exists(params["video_filepath"]):
                 self.configs["video_paths"][dpg_node_tag] = params["video_filepath"]
 
@@ -340,3 +403,7 @@ def callback_change_loop(self, sender, data, user_data):
     def callback_change_skiprate(self, sender, data, user_data):
         dpg_node_tag = user_data
         self.forms["skiprate"][dpg_node_tag] = data
+
+    def callback_change_batchsize(self, sender, data, user_data):
+        dpg_node_tag = user_data
+        self.forms["batchsize"][dpg_node_tag] = data
@@ -0,0 +1,74 @@
+import queue
+import threading
+from collections import deque
+
+DROP_OLDEST = "drop_oldest"
+DROP_NEWEST = "drop_newest"
+BLOCK = "block"
+KEEP_LATEST = "keep_latest"
+# Ordered from the policy that keeps the most frames to the one keeping fewest
+BACKPRESSURE_POLICIES = [BLOCK, DROP_NEWEST, DROP_OLDEST, KEEP_LATEST]
+
+
+def get_queue_policy(policies, default=BLOCK):
+    # A shared queue never drops frames that one of its consumers wants to keep
+    if len(policies) == 0:
+        return default
+    return min(policies, key=BACKPRESSURE_POLICIES.index)
+
+
+class FrameQueue:
+    maxsize = 1
+    policy = BLOCK
+    on_drop = None  # Called with every item the policy drops
+    items = None
+    condition = None
+
+    def __init__(self, maxsize=2, policy=BLOCK, on_drop=None):
+        self.maxsize = 1 if policy == KEEP_LATEST else max(1, maxsize)
+        self.policy = policy
+        self.on_drop = on_drop
+        self.items = deque()
+        self.condition = threading.Condition()
+
+    def put(self, item, block=True, force=False):
+        # Apply the policy when full and return the number of dropped items,
+        # a blocking policy raises queue.Full when block is False
+        with self.condition:
+            dropped = 0
+            if len(self.items) >= self.maxsize and not force:
+                if self.policy == BLOCK:
+                    if not block:
+                        raise queue.Full
+                    while len(self.items) >= self.maxsize:
+                        self.condition.wait()
+                elif self.policy == DROP_NEWEST:
+                    if self.on_drop is not None:
+                        self.on_drop(item)
+                    return 1
+                else:
+                    while len(self.items) >= self.maxsize:
+                        dropped_item = self.items.popleft()
+                        if self.on_drop is not None:
+                            self.on_drop(dropped_item)
+                        dropped += 1
+            self.items.append(item)
+            self.condition.notify_all()
+            return dropped
+
+    def put_nowait(self, item):
+        return self.put(item, block=False)
+
+    def get(self, block=True):
+        # Raise queue.Empty when empty and block is False
+        with self.condition:
+            while len(self.items) == 0:
+                if not block:
+                    raise queue.Empty
+                self.condition.wait()
+            item = self.items.popleft()
+            self.condition.notify_all()
+            return item
+
+    def get_nowait(self):
+        return self.get(block=False)
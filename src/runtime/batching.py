@@ -0,0 +1,87 @@
+import asyncio
+import threading
+from concurrent.futures import Future
+
+
+class InferenceBatcher:
+    window = 0.005
+    pending = {}  # Model to ([images], [futures]) waiting for a batched run
+    plan = None
+    peers = {}  # Node tag to the node tags of its plan level
+    lock = None
+
+    def __init__(self, window=0.005):
+        self.window = window
+        self.pending = {}
+        self.plan = None
+        self.peers = {}
+        self.lock = threading.Lock()
+
+    def set_window(self, window):
+        # Longest wait for the other nodes of a model, 0 disables batching
+        self.window = max(0.0, window)
+
+    def set_plan(self, plan):
+        # Only nodes of one level run together, nodes of other levels (or
+        # pipelined stages) never join the batch of a node
+        if plan is self.plan:
+            return
+        peers = {}
+        for level in plan.levels:
+            node_tags = frozenset(node_step.node_tag for node_step in level)
+            for node_tag in node_tags:
+                peers[node_tag] = node_tags
+        self.peers = peers
+        self.plan = plan
+
+    def get_peers(self, node_tag):
+        # Node tags running in the level of a node, empty for an unknown node
+        return self.peers.get(node_tag, frozenset())
+
+    async def infer(self, model, image, size):
+        # Gather the frames of the nodes of a level sharing a model (size)
+        # within the window and run them as one batch, each node gets its own
+        # result
+        if size <= 1 or self.window <= 0 or not hasattr(model, "batch"):
+            return model(image)
+        future = Future()
+        with self.lock:
+            batch = self.pending.get(model, None)
+            if batch is None:
+                batch = ([], [])
+                self.pending[model] = batch
+            batch[0].append(image)
+            batch[1].append(future)
+            is_full = len(batch[0]) >= size
+            if is_full:
+                del self.pending[model]
+        if is_full:
+            self.run(model, batch)
+        waiter = asyncio.wrap_future(future)
+        if not waiter.done():
+            try:
+                await asyncio.wait_for(asyncio.shield(waiter), self.window)
+            except asyncio.TimeoutError:
+                # Run whatever arrived, the missing nodes have no frame this tick
+                with self.lock:
+                    is_owner = self.pending.get(model, None) is batch
+                    if is_owner:
+                        del self.pending[model]
+                if is_owner:
+                    self.run(model, batch)
+        return await waiter
+
+    def run(self, model, batch):
+        images, futures = batch
+        try:
+            results = model.batch(images)
+        except Exception as e:
+            for future in futures:
+                future.set_exception(e)
+            return
+        for future, result in zip(futures, results):
+            future.set_result(result)
+
+
+# Batched inference shared by every node of the process
+inference_batcher = InferenceBatcher()
@@ -0,0 +1,111 @@
+import threading
+import weakref
+
+import cv2
+import numpy as np
+
+
+class BufferPool:
+    max_free = 4
+    free_buffers = {}
+    leased = None  # Buffers handed out by acquire, weakly referenced by id
+    lease_counts = {}
+    lock = None
+
+    def __init__(self, max_free=4):
+        self.max_free = max_free
+        self.free_buffers = {}
+        self.leased = weakref.WeakValueDictionary()
+        self.lease_counts = {}
+        self.lock = threading.Lock()
+
+    def acquire(self, shape, dtype=np.uint8):
+        # Reuse a returned buffer of the same shape and dtype if any, the
+        # caller holds the one lease of the buffer
+        key = (tuple(shape), np.dtype(dtype).str)
+        with self.lock:
+            buffers = self.free_buffers.get(key, None)
+            buffer = buffers.pop() if buffers else None
+        if buffer is None:
+            buffer = np.empty(shape, dtype=dtype)
+            # A buffer nobody returns is left to the garbage collector
+            weakref.finalize(buffer, self.lease_counts.pop, id(buffer), None)
+        with self.lock:
+            self.leased[id(buffer)] = buffer
+            self.lease_counts[id(buffer)] = 1
+        return buffer
+
+    def get_buffer(self, frame):
+        # Leased buffer behind a frame or a view of it, None for other frames
+        while isinstance(frame, np.ndarray):
+            if self.leased.get(id(frame), None) is frame:
+                return frame
+            frame = frame.base
+        return None
+
+    def lease(self, frame):
+        # Take one more lease of the buffer of a frame (or of every frame of a
+        # batch) for a holder keeping it beyond the refresh that received it
+        if isinstance(frame, list):
+            for item in frame:
+                self.lease(item)
+            return
+        with self.lock:
+            buffer = self.get_buffer(frame)
+            if buffer is not None:
+                self.lease_counts[id(buffer)] += 1
+
+    def release(self, frame):
+        # Return one lease, the buffer is reused once every lease is returned.
+        # Holders must not read a frame after returning its lease
+        if isinstance(frame, list):
+            for item in frame:
+                self.release(item)
+            return
+        with self.lock:
+            buffer = self.get_buffer(frame)
+            if buffer is None:
+                return
+            self.lease_counts[id(buffer)] -= 1
+            if self.lease_counts[id(buffer)] > 0:
+                return
+            del self.leased[id(buffer)]
+            buffers = self.free_buffers.setdefault((buffer.shape, buffer.dtype.str), [])
+            if len(buffers) < self.max_free:
+                buffers.append(buffer)
+
+    def clear(self):
+        with self.lock:
+            self.free_buffers = {}
+
+    def get_stats(self):
+        with self.lock:
+            buffers = [b for bs in self.free_buffers.values() for b in bs]
+            leased = len(self.leased)
+        return {
+            "buffers": len(buffers),
+            "bytes": sum(buffer.nbytes for buffer in buffers),
+            "leased": leased,
+        }
+
+
+def read_capture(capture, pool=None):
+    # Read the next frame of a cv2.VideoCapture into a buffer of the pool,
+    # OpenCV allocates a new frame instead when the buffer does not fit
+    if pool is None:
+        pool = buffer_pool
+    width = int(capture.get(cv2.CAP_PROP_FRAME_WIDTH))
+    height = int(capture.get(cv2.CAP_PROP_FRAME_HEIGHT))
+    if width <= 0 or height <= 0:
+        return capture.read()
+    buffer = pool.acquire((height, width, 3))
+    ret, frame = capture.read(buffer)
+    if not ret or frame is not buffer:
+        pool.release(buffer)
+        if frame is buffer:
+            frame = None
+    return ret, frame
+
+
+# Buffers shared by every node of the process
+buffer_pool = BufferPool()
@@ -0,0 +1,92 @@
+import asyncio
+import logging
+import time
+
+
+class TickClock:
+    logger = None
+    period = None
+    next_deadline = None
+    tick_count = 0
+    missed_deadlines = 0
+    jitter = 0.0
+    max_jitter = 0.0
+    report_interval = None
+    last_report_time = None
+    last_report_missed = 0
+
+    def __init__(self, fps, report_interval=10.0, logger=logging.getLogger(__name__)):
+        self.logger = logger
+        self.period = 1.0 / fps
+        self.report_interval = report_interval
+        self.reset()
+
+    def reset(self):
+        self.next_deadline = None
+        self.tick_count = 0
+        self.missed_deadlines = 0
+        self.jitter = 0.0
+        self.max_jitter = 0.0
+        self.last_report_time = time.monotonic()
+        self.last_report_missed = 0
+
+    def set_fps(self, fps):
+        period = 1.0 / fps
+        if period != self.period:
+            self.period = period
+            self.next_deadline = None
+
+    def time_until_due(self):
+        if self.next_deadline is None:
+            return 0.0
+        return max(0.0, self.next_deadline - time.monotonic())
+
+    def is_due(self):
+        return self.next_deadline is None or time.monotonic() >= self.next_deadline
+
+    def mark_tick(self):
+        now = time.monotonic()
+        if self.next_deadline is None:
+            self.next_deadline = now + self.period
+        else:
+            lateness = now - self.next_deadline
+            self.jitter += (lateness - self.jitter) / 16.0
+            self.max_jitter = max(self.max_jitter, lateness)
+            if lateness >= self.period:
+                # Missed one or more ticks, resync instead of bursting to catch up
+                self.missed_deadlines += int(lateness / self.period)
+                self.next_deadline = now + self.period
+            else:
+                # Keep the deadline grid so the average rate does not drift
+                self.next_deadline += self.period
+        self.tick_count += 1
+        if now - self.last_report_time >= self.report_interval:
+            self.report()
+            self.last_report_time = now
+
+    async def wait(self):
+        # Sleep until the next tick deadline instead of spinning
+        await asyncio.sleep(self.time_until_due())
+
+    def get_stats(self):
+        return {
+            "fps": 1.0 / self.period,
+            "ticks": self.tick_count,
+            "missed_deadlines": self.missed_deadlines,
+            "jitter_ms": self.jitter * 1000.0,
+            "max_jitter_ms": self.max_jitter * 1000.0,
+        }
+
+    def report(self):
+        stats = self.get_stats()
+        message = "ticks={} missed={} jitter={:.2f}ms max_jitter={:.2f}ms".format(
+            stats["ticks"],
+            stats["missed_deadlines"],
+            stats["jitter_ms"],
+            stats["max_jitter_ms"],
+        )
+        if self.missed_deadlines > self.last_report_missed:
+            self.logger.warning(message)
+        else:
+            self.logger.info(message)
+        self.last_report_missed = self.missed_deadlines
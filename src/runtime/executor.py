@@ -0,0 +1,452 @@
+import asyncio
+import json
+import logging
+import os
+import queue
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from importlib import import_module
+
+from gui.constants import PinShape
+from runtime.backpressure import BLOCK, KEEP_LATEST, FrameQueue
+from runtime.buffers import buffer_pool
+from runtime.frame import (
+    FrameBatch,
+    FrameStamper,
+    get_batch_item,
+    get_frame_envelope,
+    get_shared_frame,
+)
+from runtime.sessions import pin_cpus, session_factory
+
+INLINE = "inline"
+THREAD = "thread"
+PROCESS = "process"
+EXECUTOR_MODES = [INLINE, THREAD, PROCESS]
+
+# Result of a refresh whose input was left to the policy of a busy node
+BUSY = "busy"
+
+# Thread local event loop to drive node coroutines off the main thread
+_thread_local = threading.local()
+
+# Node instance owned by a process pool worker
+_process_node = None
+
+
+def _run_coroutine(coroutine):
+    loop = getattr(_thread_local, "loop", None)
+    if loop is None:
+        loop = asyncio.new_event_loop()
+        _thread_local.loop = loop
+    return loop.run_until_complete(coroutine)
+
+
+def _refresh_in_thread(refresh, node_id, node_links, node_frames, node_messages):
+    return _run_coroutine(refresh(node_id, node_links, node_frames, node_messages))
+
+
+def _init_process_node(module_name, settings, node_id, params):
+    global _process_node
+    session_factory.set_profile(settings.get("onnxruntime", None))
+    session_factory.set_cpu_affinity(settings.get("cpu_affinity", None))
+    module = import_module(module_name)
+    _process_node = module.EdgeAINode(settings)
+
+    # Pin the worker of a node listed in the CPU affinity settings
+    node_tag = str(node_id) + ":" + _process_node.name.lower().replace(" ", "_")
+    cpus = settings.get("cpu_affinity", {}).get(node_tag, None)
+    if cpus is not None:
+        pin_cpus(cpus)
+    _process_node.add_node(None, node_id, params.get("position", [0, 0]))
+    _process_node.set_import_params(node_id, params)
+
+
+def _refresh_in_process(node_id, node_links, node_frames, node_messages):
+    return _run_coroutine(
+        _process_node.refresh(node_id, node_links, node_frames, node_messages)
+    )
+
+
+def get_node_timeout(params, default=None):
+    timeout = params.get("timeout", default)
+    try:
+        timeout = float(timeout) if timeout else None
+    except (TypeError, ValueError):
+        return default
+    if timeout is not None and timeout <= 0:
+        timeout = None
+    return timeout
+
+
+def get_linked_outputs(node_step, node_frames, node_messages):
+    # Only the upstream outputs a node reads
+    linked_frames = {}
+    linked_messages = {}
+    for link in node_step.node_links:
+        tag = link.source_node_tag
+        linked_frames[tag] = node_frames.get(tag, None)
+        linked_messages[tag] = node_messages.get(tag, None)
+    return linked_frames, linked_messages
+
+
+def release_inputs(item):
+    # Return the leases of an input kept by a busy node
+    for frame in item[0].values():
+        buffer_pool.release(frame)
+
+
+def get_process_settings(settings):
+    # Only plain values can be sent to a worker process, and it never owns the GUI
+    process_settings = {}
+    for key, value in settings.items():
+        try:
+            json.dumps(value)
+        except (TypeError, ValueError):
+            continue
+        process_settings[key] = value
+    process_settings["gui"] = False
+    process_settings["camera_capture_list"] = []
+    return process_settings
+
+
+class NodeExecutor:
+    settings = None
+    logger = None
+    stats = None
+    plan = None
+    thread_pool = None
+    watchdog_pool = None
+    process_pools = {}
+    stamper = None
+    pending_futures = {}
+    last_outputs = {}
+    inboxes = {}
+    inbox_tasks = {}
+
+    def __init__(self, settings, stats=None, logger=logging.getLogger(__name__)):
+        self.settings = settings
+        self.stats = stats
+        self.logger = logger
+        self.thread_pool = ThreadPoolExecutor(
+            max_workers=settings.get("executor_thread_workers", os.cpu_count()),
+            thread_name_prefix="wedx-node",
+        )
+        self.watchdog_pool = ThreadPoolExecutor(thread_name_prefix="wedx-watchdog")
+        self.stamper = FrameStamper()
+        self.process_pools = {}
+        self.pending_futures = {}
+        self.last_outputs = {}
+        self.inboxes = {}
+        self.inbox_tasks = {}
+
+    def prepare(self, plan):
+        # (Re)start one single worker process per process-mode node
+        if plan is self.plan:
+            return
+        self.plan = plan
+        self.close_process_pools()
+        process_settings = None
+        for node_tag, node_step in plan.steps.items():
+            if node_step.executor != PROCESS:
+                continue
+            if process_settings is None:
+                process_settings = get_process_settings(self.settings)
+            params = node_step.node_instance.get_export_params(node_step.node_id)
+            self.process_pools[node_tag] = ProcessPoolExecutor(
+                max_workers=1,
+                initializer=_init_process_node,
+                initargs=(
+                    node_step.node_instance.__class__.__module__,
+                    process_settings,
+                    node_step.node_id,
+                    params,
+                ),
+            )
+            self.logger.info("Start process worker for {}".format(node_tag))
+
+    async def run(self, node_step, node_frames, node_messages, deadline=None):
+        # Refresh a node and account it as late if it ends after the deadline,
+        # its output frame is shared read-only with every downstream node
+        start_time = time.monotonic()
+        batch_size = self.get_batch_size(node_step, node_frames, node_messages)
+        if batch_size is None:
+            result = await self._refresh(
+                node_step, node_frames, node_messages, start_time
+            )
+        else:
+            result = await self._refresh_batch(
+                node_step, node_frames, node_messages, batch_size, start_time
+            )
+        if result is BUSY:
+            return self.get_last_output(node_step.node_tag)
+        if result is None:
+            if self.stats is not None:
+                self.stats.add_timeout(node_step.node_tag)
+            return self.get_last_output(node_step.node_tag)
+        self.claim_frame(node_step, node_frames, result[0])
+        if node_step.timeout is not None:
+            self.set_last_output(node_step.node_tag, result)
+        if self.stats is not None:
+            end_time = time.monotonic()
+            self.stats.add_processed(
+                node_step.node_tag,
+                end_time - start_time,
+                deadline is not None and end_time > deadline,
+            )
+        return result
+
+    def claim_frame(self, node_step, node_frames, frame):
+        # The caller holds one lease of every pooled frame of a result, a
+        # node passing one of its input frames through gets a lease of its own
+        input_buffers = []
+        for link in node_step.node_links:
+            value = node_frames.get(link.source_node_tag, None)
+            for item in value if isinstance(value, FrameBatch) else [value]:
+                buffer = buffer_pool.get_buffer(item)
+                if buffer is not None:
+                    input_buffers.append(buffer)
+        if len(input_buffers) == 0:
+            return
+        for item in frame if isinstance(frame, FrameBatch) else [frame]:
+            buffer = buffer_pool.get_buffer(item)
+            if any(buffer is input_buffer for input_buffer in input_buffers):
+                buffer_pool.lease(item)
+
+    def get_last_output(self, node_tag):
+        # Replayed output, with a lease for the caller
+        frame, message = self.last_outputs.get(node_tag, (None, None))
+        buffer_pool.lease(frame)
+        return frame, message
+
+    def set_last_output(self, node_tag, result):
+        buffer_pool.lease(result[0])
+        previous = self.last_outputs.get(node_tag, None)
+        self.last_outputs[node_tag] = result
+        if previous is not None:
+            buffer_pool.release(previous[0])
+
+    def get_batch_size(self, node_step, node_frames, node_messages):
+        # Size of the micro-batch to fan out to a node that is not batch aware
+        if node_step.node_instance.batch_aware:
+            return None
+        batch_size = None
+        for link in node_step.node_links:
+            for value in (
+                node_frames.get(link.source_node_tag, None),
+                node_messages.get(link.source_node_tag, None),
+            ):
+                if isinstance(value, FrameBatch):
+                    batch_size = max(batch_size or 0, len(value))
+        return batch_size
+
+    async def _refresh(self, node_step, node_frames, node_messages, start_time):
+        # None when the node timed out, BUSY when it is still running
+        if node_step.timeout is None:
+            result = await self._dispatch(node_step, node_frames, node_messages)
+        else:
+            result = await self._dispatch_with_timeout(
+                node_step, node_frames, node_messages
+            )
+            if result is None or result is BUSY:
+                return result
+        frame, message = result
+        return self.share_frame(node_step, node_frames, frame, start_time), message
+
+    async def _refresh_batch(
+        self, node_step, node_frames, node_messages, batch_size, start_time
+    ):
+        # Refresh once per frame of the batch, in order, and batch the outputs
+        frames = FrameBatch()
+        messages = FrameBatch()
+        for index in range(batch_size):
+            item_frames = {}
+            item_messages = {}
+            for link in node_step.node_links:
+                tag = link.source_node_tag
+                item_frames[tag] = get_batch_item(node_frames.get(tag, None), index)
+                item_messages[tag] = get_batch_item(node_messages.get(tag, None), index)
+            result = await self._refresh(
+                node_step, item_frames, item_messages, start_time
+            )
+            if result is None or result is BUSY:
+                return result
+            frames.append(result[0])
+            messages.append(result[1])
+        return frames, messages
+
+    def share_frame(self, node_step, node_frames, frame, capture_time):
+        if isinstance(frame, FrameBatch):
+            return FrameBatch(
+                get_shared_frame(
+                    item,
+                    self.get_envelope(
+                        node_step, node_frames, item, capture_time, index
+                    ),
+                )
+                for index, item in enumerate(frame)
+            )
+        return get_shared_frame(
+            frame, self.get_envelope(node_step, node_frames, frame, capture_time)
+        )
+
+    def get_envelope(self, node_step, node_frames, frame, capture_time, index=None):
+        # Sources stamp a new envelope, other nodes carry the one of their video input
+        if frame is None:
+            return None
+        for link in node_step.node_links:
+            if link.pin_shape == PinShape.CIRCLE_FILLED:
+                return get_frame_envelope(
+                    get_batch_item(node_frames.get(link.source_node_tag, None), index)
+                )
+        return self.stamper.stamp(node_step.node_tag, capture_time)
+
+    async def _dispatch(self, node_step, node_frames, node_messages):
+        loop = asyncio.get_running_loop()
+        if node_step.executor == THREAD:
+            return await loop.run_in_executor(
+                self.thread_pool,
+                _refresh_in_thread,
+                node_step.refresh,
+                node_step.node_id,
+                node_step.node_links,
+                node_frames,
+                node_messages,
+            )
+        if node_step.executor == PROCESS and node_step.node_tag in self.process_pools:
+            # Send only the upstream outputs this node reads
+            linked_frames, linked_messages = get_linked_outputs(
+                node_step, node_frames, node_messages
+            )
+            return await loop.run_in_executor(
+                self.process_pools[node_step.node_tag],
+                _refresh_in_process,
+                node_step.node_id,
+                node_step.node_links,
+                linked_frames,
+                linked_messages,
+            )
+        return await node_step.refresh(
+            node_step.node_id, node_step.node_links, node_frames, node_messages
+        )
+
+    async def _dispatch_with_timeout(self, node_step, node_frames, node_messages):
+        # Return None when the node exceeds its time budget. A stuck refresh
+        # keeps running in its own thread until it returns, meanwhile new
+        # inputs wait for it (block) or are queued to the node (BUSY)
+        node_tag = node_step.node_tag
+        while self.is_busy(node_tag):
+            if (node_step.input_policy or KEEP_LATEST) != BLOCK:
+                self.queue_input(node_step, node_frames, node_messages)
+                return BUSY
+            busy_future = self.inbox_tasks.get(node_tag, None)
+            if busy_future is None:
+                busy_future = self.pending_futures[node_tag]
+            try:
+                await asyncio.wait_for(asyncio.shield(busy_future), node_step.timeout)
+            except asyncio.TimeoutError:
+                return None
+            except Exception:
+                pass
+        future = self._start(node_step, node_frames, node_messages)
+        self.pending_futures[node_tag] = future
+        try:
+            result = await asyncio.wait_for(asyncio.shield(future), node_step.timeout)
+        except asyncio.TimeoutError:
+            self.logger.warning(
+                "{} exceeded {}s timeout".format(node_tag, node_step.timeout)
+            )
+            return None
+        return result
+
+    def _start(self, node_step, node_frames, node_messages):
+        # The refresh may outlive the tick, it holds leases of its inputs
+        loop = asyncio.get_running_loop()
+        item = get_linked_outputs(node_step, node_frames, node_messages)
+        for frame in item[0].values():
+            buffer_pool.lease(frame)
+        if node_step.executor == PROCESS and node_step.node_tag in self.process_pools:
+            future = asyncio.ensure_future(self._dispatch(node_step, *item))
+        else:
+            future = loop.run_in_executor(
+                self.watchdog_pool,
+                _refresh_in_thread,
+                node_step.refresh,
+                node_step.node_id,
+                node_step.node_links,
+                *item,
+            )
+        future.add_done_callback(lambda _: release_inputs(item))
+        return future
+
+    def is_busy(self, node_tag):
+        if node_tag in self.inbox_tasks:
+            return True
+        pending_future = self.pending_futures.get(node_tag, None)
+        return pending_future is not None and not pending_future.done()
+
+    def queue_input(self, node_step, node_frames, node_messages):
+        # A busy node keeps its inputs in a queue of one, refreshed as soon
+        # as it returns, frames the input policy drops are counted
+        node_tag = node_step.node_tag
+        policy = node_step.input_policy or KEEP_LATEST
+        inbox = self.inboxes.get(node_tag, None)
+        if inbox is None or inbox.policy != policy:
+            inbox = FrameQueue(maxsize=1, policy=policy, on_drop=release_inputs)
+            self.inboxes[node_tag] = inbox
+        linked_frames, linked_messages = get_linked_outputs(
+            node_step, node_frames, node_messages
+        )
+        for frame in linked_frames.values():
+            buffer_pool.lease(frame)
+        dropped = inbox.put((linked_frames, linked_messages, time.monotonic()))
+        if dropped > 0 and self.stats is not None:
+            self.stats.add_dropped([node_tag], dropped)
+        if node_tag not in self.inbox_tasks:
+            self.inbox_tasks[node_tag] = asyncio.ensure_future(
+                self._run_inbox(node_step)
+            )
+
+    async def _run_inbox(self, node_step):
+        node_tag = node_step.node_tag
+        try:
+            while True:
+                pending_future = self.pending_futures.get(node_tag, None)
+                if pending_future is not None and not pending_future.done():
+                    await asyncio.wait([pending_future])
+                    continue
+                try:
+                    item = self.inboxes[node_tag].get_nowait()
+                except queue.Empty:
+                    break
+                node_frames, node_messages, start_time = item
+                future = self._start(node_step, node_frames, node_messages)
+                self.pending_futures[node_tag] = future
+                try:
+                    frame, message = await future
+                except Exception as e:
+                    self.logger.error("{} failed: {}".format(node_tag, e))
+                else:
+                    # No caller holds the output, last_outputs keeps its lease
+                    frame = self.share_frame(node_step, node_frames, frame, start_time)
+                    self.claim_frame(node_step, node_frames, frame)
+                    self.set_last_output(node_tag, (frame, message))
+                    buffer_pool.release(frame)
+                    if self.stats is not None:
+                        self.stats.add_processed(
+                            node_tag, time.monotonic() - start_time, False
+                        )
+                release_inputs(item)
+        finally:
+            del self.inbox_tasks[node_tag]
+
+    def close_process_pools(self):
+        for process_pool in self.process_pools.values():
+            process_pool.shutdown(wait=False, cancel_futures=True)
+        self.process_pools = {}
+
+    def shutdown(self):
+        self.close_process_pools()
+        self.thread_pool.shutdown(wait=False, cancel_futures=True)
+        self.watchdog_pool.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,101 @@
+import itertools
+import threading
+
+import numpy as np
+
+from runtime.buffers import buffer_pool
+
+
+class FrameEnvelope:
+    __slots__ = ("sequence", "capture_time", "source_id")
+
+    def __init__(self, sequence, capture_time, source_id):
+        self.sequence = sequence
+        self.capture_time = capture_time
+        self.source_id = source_id
+
+    def to_dict(self):
+        return {
+            "sequence": self.sequence,
+            "capture_time": self.capture_time,
+            "source_id": self.source_id,
+        }
+
+
+class SharedFrame(np.ndarray):
+    # Read-only frame view that carries the envelope of the captured frame,
+    # views and copies made by numpy keep the envelope
+    __slots__ = ("envelope",)
+
+    def __array_finalize__(self, obj):
+        self.envelope = getattr(obj, "envelope", None)
+
+
+class FrameBatch(list):
+    # Consecutive frames (or their messages) of one source emitted in a single
+    # tick, nodes that are not batch aware get them one by one in order
+    pass
+
+
+class FrameStamper:
+    sequences = {}
+    lock = None
+
+    def __init__(self):
+        self.sequences = {}
+        self.lock = threading.Lock()
+
+    def reset(self):
+        with self.lock:
+            self.sequences = {}
+
+    def stamp(self, source_id, capture_time):
+        # Per source sequence number starting at 0
+        sequence = self.sequences.get(source_id, None)
+        if sequence is None:
+            with self.lock:
+                sequence = self.sequences.setdefault(source_id, itertools.count())
+        return FrameEnvelope(next(sequence), capture_time, source_id)
+
+
+def get_frame_envelope(frame):
+    return getattr(frame, "envelope", None)
+
+
+def get_batch_item(value, index=None):
+    # Item of a batch (the last one without index), other values as they are
+    if not isinstance(value, FrameBatch):
+        return value
+    if index is None:
+        index = len(value) - 1
+    if 0 <= index < len(value):
+        return value[index]
+    return None
+
+
+def get_shared_frame(frame, envelope=None):
+    # Hand a frame to downstream nodes as a read-only view, no pixels are copied
+    if not isinstance(frame, np.ndarray):
+        return frame
+    if envelope is None:
+        envelope = get_frame_envelope(frame)
+    if (
+        isinstance(frame, SharedFrame)
+        and not frame.flags.writeable
+        and frame.envelope is envelope
+    ):
+        return frame
+    shared_frame = frame.view(SharedFrame)
+    shared_frame.envelope = envelope
+    shared_frame.flags.writeable = False
+    return shared_frame
+
+
+def get_writable_frame(frame):
+    # Copy on write, a node materializes a private copy only when it draws.
+    # The copy is a pooled buffer whose lease goes with the node output
+    if frame.flags.writeable:
+        return frame
+    writable_frame = buffer_pool.acquire(frame.shape, frame.dtype)
+    np.copyto(writable_frame, frame)
+    return writable_frame
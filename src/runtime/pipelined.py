@@ -0,0 +1,207 @@
+import asyncio
+import logging
+import queue
+import threading
+import time
+from collections import namedtuple
+
+from runtime.backpressure import BLOCK, DROP_NEWEST, FrameQueue, get_queue_policy
+from runtime.buffers import buffer_pool
+from runtime.plan import get_release_groups
+
+SEQUENTIAL = "sequential"
+PIPELINED = "pipelined"
+
+# Stage constants
+SOURCES = 0
+PROCESSORS = 1
+SINKS = 2
+STAGE_NAMES = ["sources", "processors", "sinks"]
+
+# Outputs of one tick travelling through the stages
+FramePacket = namedtuple(
+    "FramePacket", ["sequence", "timestamp", "node_frames", "node_messages"]
+)
+
+
+def release_packet(packet):
+    # Return the leases of the frames of a packet dropped by a queue
+    if packet is None:
+        return
+    for frame in packet.node_frames.values():
+        buffer_pool.release(frame)
+
+
+def get_node_stage(node_instance):
+    module_name = node_instance.__class__.__module__
+    if ".sources." in module_name:
+        return SOURCES
+    if ".sinks." in module_name or ".debugging." in module_name:
+        return SINKS
+    return PROCESSORS
+
+
+def build_stages(plan):
+    # A node never runs in an earlier stage than any of its upstream nodes
+    step_stages = {}
+    stages = [[] for _ in STAGE_NAMES]
+    for level in plan.levels:
+        level_stages = {}
+        for node_step in level:
+            stage = get_node_stage(node_step.node_instance)
+            for link in node_step.node_links:
+                stage = max(stage, step_stages.get(link.source_node_tag, SOURCES))
+            step_stages[node_step.node_tag] = stage
+            level_stages.setdefault(stage, []).append(node_step)
+        for stage, node_steps in level_stages.items():
+            stages[stage].append(tuple(node_steps))
+    return [(STAGE_NAMES[i], tuple(levels)) for i, levels in enumerate(stages)]
+
+
+class PipelinedScheduler:
+    settings = None
+    logger = None
+    executor = None
+    rate_gate = None
+    stats = None
+    plan = None
+    queues = []
+    queue_node_tags = []
+    threads = []
+    sequence = 0
+    skipped_ticks = 0
+    last_packet = None
+
+    def __init__(
+        self,
+        settings,
+        executor,
+        rate_gate,
+        stats,
+        logger=logging.getLogger(__name__),
+    ):
+        self.settings = settings
+        self.executor = executor
+        self.rate_gate = rate_gate
+        self.stats = stats
+        self.logger = logger
+        self.queues = []
+        self.queue_node_tags = []
+        self.threads = []
+
+    def prepare(self, plan):
+        # Restart stage threads for a new execution plan
+        if plan is self.plan:
+            return
+        self.stop()
+        self.plan = plan
+        stages = [stage for stage in build_stages(plan) if len(stage[1]) > 0]
+        queue_size = self.settings.get("pipelined_queue_size", 2)
+        self.queues = []
+        self.queue_node_tags = []
+        for index, (stage_name, levels) in enumerate(stages):
+            # Ticks are skipped rather than blocking the main loop
+            default_policy = DROP_NEWEST if index == 0 else BLOCK
+            node_steps = [node_step for level in levels for node_step in level]
+            policies = [s.input_policy for s in node_steps if s.input_policy]
+            policy = get_queue_policy(policies, default=default_policy)
+            self.queues.append(
+                FrameQueue(maxsize=queue_size, policy=policy, on_drop=release_packet)
+            )
+            self.queue_node_tags.append([s.node_tag for s in node_steps])
+        release_stages = get_release_groups(plan.consumers, self.queue_node_tags)
+        self.threads = []
+        for index, (stage_name, levels) in enumerate(stages):
+            thread = threading.Thread(
+                target=self._run_stage,
+                args=(index, levels, release_stages[index]),
+                name="wedx-stage-" + stage_name,
+                daemon=True,
+            )
+            thread.start()
+            self.threads.append(thread)
+
+    def tick(self):
+        # Feed a new sequence number into the first stage
+        if len(self.queues) == 0:
+            return False
+        packet = FramePacket(self.sequence, time.monotonic(), {}, {})
+        try:
+            dropped = self.queues[0].put_nowait(packet)
+        except queue.Full:
+            dropped = 1
+        self.sequence += 1
+        if dropped > 0:
+            self.skipped_ticks += dropped
+            self.stats.add_dropped(self.queue_node_tags[0], dropped)
+        return dropped == 0
+
+    def stop(self):
+        if len(self.queues) > 0:
+            self.queues[0].put(None, force=True)
+        for thread in self.threads:
+            thread.join(timeout=5.0)
+        self.queues = []
+        self.queue_node_tags = []
+        self.threads = []
+        self.plan = None
+
+    def _run_stage(self, index, levels, release_tags):
+        loop = asyncio.new_event_loop()
+        try:
+            loop.run_until_complete(self._stage_loop(index, levels, release_tags))
+        finally:
+            loop.close()
+
+    async def _stage_loop(self, index, levels, release_tags):
+        in_queue = self.queues[index]
+        out_queue = None
+        out_node_tags = None
+        if index + 1 < len(self.queues):
+            out_queue = self.queues[index + 1]
+            out_node_tags = self.queue_node_tags[index + 1]
+        # Each stage has one tick period to process a frame
+        period = 1.0 / self.settings["fps"]
+        while True:
+            packet = in_queue.get()
+            if packet is None:
+                if out_queue is not None:
+                    out_queue.put(None, force=True)
+                break
+            deadline = packet.timestamp + period * (index + 1)
+            for level in levels:
+                node_steps = self.rate_gate.get_due_steps(
+                    level, packet.sequence, packet.node_frames, packet.node_messages
+                )
+                results = await asyncio.gather(
+                    *[
+                        self.executor.run(
+                            node_step,
+                            packet.node_frames,
+                            packet.node_messages,
+                            deadline,
+                        )
+                        for node_step in node_steps
+                    ],
+                    return_exceptions=True,
+                )
+                for node_step, result in zip(node_steps, results):
+                    if isinstance(result, BaseException):
+                        self.logger.error(
+                            "{} failed at frame {}: {}".format(
+                                node_step.node_tag, packet.sequence, result
+                            )
+                        )
+                        result = (None, None)
+                    packet.node_frames[node_step.node_tag] = result[0]
+                    packet.node_messages[node_step.node_tag] = result[1]
+                    self.rate_gate.set_output(node_step, result[0], result[1])
+            # Return frames no later stage reads
+            for node_tag in release_tags:
+                buffer_pool.release(packet.node_frames.pop(node_tag, None))
+            if out_queue is not None:
+                dropped = out_queue.put(packet)
+                if dropped > 0:
+                    self.stats.add_dropped(out_node_tags, dropped)
+            else:
+                self.last_packet = packet
@@ -0,0 +1,155 @@
+import graphlib
+from collections import namedtuple
+from types import MappingProxyType
+
+from gui.constants import PinShape
+from runtime.executor import INLINE
+from runtime.rate import DEFAULT_RATE
+
+# A link resolved once at graph-change time, so refresh() needs no string work.
+#   source          : source pin tag (e.g. "3:object_detection:1:1")
+#   destination     : destination pin tag (e.g. "4:video_screen:1:0:2")
+#   source_node_tag : upstream node tag used as key of node_frames/node_messages
+#   pin_shape       : PinShape of the source pin (CIRCLE_FILLED=video, QUAD=message)
+#   input_index     : index of the destination pin on multi-input nodes, else None
+NodeLink = namedtuple(
+    "NodeLink",
+    ["source", "destination", "source_node_tag", "pin_shape", "input_index"],
+)
+
+# A node bound to its refresh callable with resolved inputs and output slot.
+# executor is the runtime.executor mode ("inline", "thread" or "process"),
+# rate is the runtime.rate.NodeRate of the node, input_policy is the
+# runtime.backpressure policy for frames queued to the node (None if unset),
+# timeout is the time budget of refresh() in seconds (None if unlimited).
+NodeStep = namedtuple(
+    "NodeStep",
+    [
+        "node_tag",
+        "node_id",
+        "node_name",
+        "node_instance",
+        "node_links",
+        "refresh",
+        "executor",
+        "rate",
+        "input_policy",
+        "timeout",
+    ],
+)
+
+# Immutable execution plan: levels is a tuple of tuples of NodeStep in
+# topological order, steps maps node tag to its NodeStep, consumers maps node
+# tag to the tags of the nodes reading its frame, release_levels holds per
+# level the node tags whose frame is no longer read once that level has run.
+ExecutionPlan = namedtuple(
+    "ExecutionPlan", ["levels", "steps", "consumers", "release_levels"]
+)
+
+EMPTY_PLAN = ExecutionPlan(
+    levels=(),
+    steps=MappingProxyType({}),
+    consumers=MappingProxyType({}),
+    release_levels=(),
+)
+
+
+def parse_link(node_link):
+    src_pin_tag, dst_pin_tag = node_link[0], node_link[1]
+    src_parts = src_pin_tag.split(":")
+    dst_parts = dst_pin_tag.split(":")
+    input_index = None
+    if len(dst_parts) > 4:
+        input_index = int(dst_parts[4])
+    return NodeLink(
+        source=src_pin_tag,
+        destination=dst_pin_tag,
+        source_node_tag=":".join(src_parts[:2]),
+        pin_shape=PinShape(int(src_parts[2])),
+        input_index=input_index,
+    )
+
+
+def get_release_groups(consumers, groups):
+    # For groups of node tags run in order, the tags whose frame has no
+    # consumer left once each group has run
+    done_tags = set()
+    released_tags = set()
+    release_groups = []
+    for group in groups:
+        done_tags.update(group)
+        release_group = tuple(
+            sorted(
+                tag
+                for tag in done_tags - released_tags
+                if consumers.get(tag, frozenset()) <= done_tags
+            )
+        )
+        released_tags.update(release_group)
+        release_groups.append(release_group)
+    return tuple(release_groups)
+
+
+def build_execution_plan(
+    node_refresh_graph,
+    node_link_graph,
+    get_node_instance,
+    node_executors={},
+    node_rates={},
+    node_input_policies={},
+    node_timeouts={},
+    default_timeout=None,
+):
+    # Resolve every node once
+    steps = {}
+    for dpg_node_tag in node_refresh_graph:
+        node_id, node_name = dpg_node_tag.split(":")
+        node_instance = get_node_instance(node_name)
+        if node_instance is None:
+            continue
+        steps[dpg_node_tag] = NodeStep(
+            node_tag=dpg_node_tag,
+            node_id=node_id,
+            node_name=node_name,
+            node_instance=node_instance,
+            node_links=tuple(
+                parse_link(node_link)
+                for node_link in node_link_graph.get(dpg_node_tag, [])
+            ),
+            refresh=node_instance.refresh,
+            executor=node_executors.get(dpg_node_tag, INLINE),
+            rate=node_rates.get(dpg_node_tag, DEFAULT_RATE),
+            input_policy=node_input_policies.get(dpg_node_tag, None),
+            timeout=node_timeouts.get(dpg_node_tag, default_timeout),
+        )
+
+    # Topological levels, each one can be refreshed concurrently
+    levels = []
+    ts = graphlib.TopologicalSorter(node_refresh_graph)
+    ts.prepare()
+    while ts.is_active():
+        ready_nodes = ts.get_ready()
+        level = tuple(steps[tag] for tag in sorted(ready_nodes) if tag in steps)
+        if len(level) > 0:
+            levels.append(level)
+        ts.done(*ready_nodes)
+
+    # Frame liveness, only video links keep an upstream frame alive
+    consumers = {}
+    for node_step in steps.values():
+        for link in node_step.node_links:
+            if link.pin_shape == PinShape.CIRCLE_FILLED:
+                consumers.setdefault(link.source_node_tag, set()).add(
+                    node_step.node_tag
+                )
+    consumers = {tag: frozenset(tags) for tag, tags in consumers.items()}
+    release_levels = get_release_groups(
+        consumers, [[node_step.node_tag for node_step in level] for level in levels]
+    )
+
+    return ExecutionPlan(
+        levels=tuple(levels),
+        steps=MappingProxyType(steps),
+        consumers=MappingProxyType(consumers),
+        release_levels=release_levels,
+    )
@@ -0,0 +1,190 @@
+import asyncio
+import logging
+import queue
+import threading
+import time
+
+from runtime.backpressure import BLOCK, FrameQueue
+from runtime.pipelined import PIPELINED, SEQUENTIAL, SOURCES, get_node_stage
+
+PUSH = "push"
+SCHEDULER_MODES = [SEQUENTIAL, PIPELINED, PUSH]
+
+
+def get_downstream_levels(plan, node_refresh_graph, source_tag):
+    # Levels of the plan restricted to nodes reachable from source_tag
+    children = {}
+    for node_tag, parent_tags in node_refresh_graph.items():
+        for parent_tag in parent_tags:
+            children.setdefault(parent_tag, []).append(node_tag)
+    downstream = set()
+    stack = list(children.get(source_tag, []))
+    while len(stack) > 0:
+        node_tag = stack.pop()
+        if node_tag not in downstream:
+            downstream.add(node_tag)
+            stack.extend(children.get(node_tag, []))
+    levels = []
+    for level in plan.levels:
+        node_steps = tuple(s for s in level if s.node_tag in downstream)
+        if len(node_steps) > 0:
+            levels.append(node_steps)
+    return tuple(levels)
+
+
+class PushScheduler:
+    settings = None
+    logger = None
+    executor = None
+    rate_gate = None
+    stats = None
+    plan = None
+    threads = []
+    stop_event = None  # Set to stop the source threads of the current plan
+    node_locks = {}
+    inboxes = {}
+    node_frames = {}
+    node_messages = {}
+
+    def __init__(
+        self,
+        settings,
+        executor,
+        rate_gate,
+        stats=None,
+        logger=logging.getLogger(__name__),
+    ):
+        self.settings = settings
+        self.executor = executor
+        self.rate_gate = rate_gate
+        self.stats = stats
+        self.logger = logger
+        self.threads = []
+        self.stop_event = threading.Event()
+        self.node_locks = {}
+        self.inboxes = {}
+        self.node_frames = {}
+        self.node_messages = {}
+
+    def prepare(self, plan, node_refresh_graph):
+        # Start one capture thread per source node of a new execution plan
+        if plan is self.plan:
+            return
+        self.stop(wait=False)
+        self.plan = plan
+        self.stop_event = threading.Event()
+        # Locks outlive a plan, a stopping thread may still refresh a node
+        for node_tag, node_step in plan.steps.items():
+            self.node_locks.setdefault(node_tag, threading.Lock())
+            if node_step.input_policy not in (None, BLOCK):
+                self.inboxes[node_tag] = FrameQueue(
+                    maxsize=1, policy=node_step.input_policy
+                )
+            else:
+                self.inboxes.pop(node_tag, None)
+        for node_tag, node_step in plan.steps.items():
+            if len(node_step.node_links) > 0:
+                continue
+            if get_node_stage(node_step.node_instance) != SOURCES:
+                continue
+            levels = get_downstream_levels(plan, node_refresh_graph, node_tag)
+            thread = threading.Thread(
+                target=self._run_source,
+                args=(node_step, levels, self.stop_event),
+                name="wedx-push-" + node_tag,
+                daemon=True,
+            )
+            thread.start()
+            self.threads.append(thread)
+
+    def stop(self, wait=True, timeout=5.0):
+        # Signal the source threads, they exit after their current frame.
+        # Only the final stop waits for them, with one timeout for all
+        self.stop_event.set()
+        if wait:
+            deadline = time.monotonic() + timeout
+            for thread in self.threads:
+                thread.join(timeout=max(0.0, deadline - time.monotonic()))
+        self.threads = []
+        self.plan = None
+
+    def _run_source(self, source_step, levels, stop_event):
+        loop = asyncio.new_event_loop()
+        try:
+            loop.run_until_complete(self._source_loop(source_step, levels, stop_event))
+        finally:
+            loop.close()
+
+    async def _source_loop(self, source_step, levels, stop_event):
+        sequence = 0
+        next_time = time.monotonic()
+        while not stop_event.is_set():
+            # Blocking sources (cameras) pace themselves, files are capped at fps
+            min_interval = 1.0 / self.settings["fps"]
+            if source_step.rate.target_fps is not None:
+                min_interval = max(min_interval, 1.0 / source_step.rate.target_fps)
+            wait_time = next_time - time.monotonic()
+            if wait_time > 0 and stop_event.wait(wait_time):
+                break
+            next_time = time.monotonic() + min_interval
+            if self.settings["state"] != "active":
+                continue
+
+            # New frame arrival triggers only the downstream subgraph
+            deadline = time.monotonic() + 1.0 / self.settings["fps"]
+            frame = await self._refresh(source_step, sequence, deadline)
+            if frame is None:
+                continue
+            for level in levels:
+                if stop_event.is_set():
+                    break
+                node_steps = self.rate_gate.get_due_steps(
+                    level, sequence, self.node_frames, self.node_messages
+                )
+                for node_step in node_steps:
+                    await self._refresh(node_step, sequence, deadline)
+            sequence += 1
+
+    async def _refresh(self, node_step, sequence, deadline):
+        # Nodes shared by several sources refresh one source at a time, each
+        # source thread holds at most one node lock so they cannot deadlock.
+        # A source finding the node busy waits for it (block) or leaves its
+        # frame to the input policy, the thread holding the lock refreshes
+        # the frames kept by the policy before it moves on
+        lock = self.node_locks[node_step.node_tag]
+        inbox = self.inboxes.get(node_step.node_tag, None)
+        if inbox is None:
+            with lock:
+                return await self._run(node_step, sequence, deadline)
+        dropped = inbox.put((sequence, deadline))
+        if dropped > 0 and self.stats is not None:
+            self.stats.add_dropped([node_step.node_tag], dropped)
+        # Check the queue again after release, a frame may come in between
+        while lock.acquire(blocking=False):
+            try:
+                while True:
+                    try:
+                        sequence, deadline = inbox.get_nowait()
+                    except queue.Empty:
+                        break
+                    await self._run(node_step, sequence, deadline)
+            finally:
+                lock.release()
+            if len(inbox.items) == 0:
+                break
+        return self.node_frames.get(node_step.node_tag, None)
+
+    async def _run(self, node_step, sequence, deadline):
+        try:
+            frame, message = await self.executor.run(
+                node_step, self.node_frames, self.node_messages, deadline
+            )
+        except Exception as e:
+            self.logger.error(
+                "{} failed at frame {}: {}".format(node_step.node_tag, sequence, e)
+            )
+            frame, message = None, None
+        self.node_frames[node_step.node_tag] = frame
+        self.node_messages[node_step.node_tag] = message
+        self.rate_gate.set_output(node_step, frame, message)
+        return frame
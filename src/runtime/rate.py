@@ -0,0 +1,77 @@
+import time
+from collections import namedtuple
+
+from runtime.buffers import buffer_pool
+
+# Per node refresh rate
+#   target_fps : refresh at most this often (None or 0 means every due tick)
+#   divisor    : refresh only on every Nth tick of the pipeline
+NodeRate = namedtuple("NodeRate", ["target_fps", "divisor"])
+
+DEFAULT_RATE = NodeRate(target_fps=None, divisor=1)
+
+
+def get_node_rate(params):
+    target_fps = params.get("target_fps", None)
+    divisor = params.get("tick_divisor", 1)
+    try:
+        target_fps = float(target_fps) if target_fps else None
+        divisor = max(1, int(divisor))
+    except (TypeError, ValueError):
+        return DEFAULT_RATE
+    if target_fps is not None and target_fps <= 0:
+        target_fps = None
+    return NodeRate(target_fps=target_fps, divisor=divisor)
+
+
+class RateGate:
+    next_due = {}
+    outputs = {}
+
+    def __init__(self):
+        self.next_due = {}
+        self.outputs = {}
+
+    def reset(self):
+        for frame, _ in self.outputs.values():
+            buffer_pool.release(frame)
+        self.next_due = {}
+        self.outputs = {}
+
+    def is_due(self, node_step, sequence, now):
+        rate = node_step.rate
+        if rate.divisor > 1 and sequence % rate.divisor != 0:
+            return False
+        if rate.target_fps is not None:
+            period = 1.0 / rate.target_fps
+            next_due = self.next_due.get(node_step.node_tag, None)
+            if next_due is not None and now < next_due:
+                return False
+            if next_due is None or now - next_due >= period:
+                self.next_due[node_step.node_tag] = now + period
+            else:
+                self.next_due[node_step.node_tag] = next_due + period
+        return True
+
+    def get_due_steps(self, level, sequence, node_frames, node_messages):
+        # Skipped nodes keep passing their last outputs downstream, each
+        # frame placed in node_frames holds a lease returned on its release
+        now = time.monotonic()
+        due_steps = []
+        for node_step in level:
+            if node_step.rate == DEFAULT_RATE or self.is_due(node_step, sequence, now):
+                due_steps.append(node_step)
+            else:
+                frame, message = self.outputs.get(node_step.node_tag, (None, None))
+                buffer_pool.lease(frame)
+                node_frames[node_step.node_tag] = frame
+                node_messages[node_step.node_tag] = message
+        return due_steps
+
+    def set_output(self, node_step, frame, message):
+        if node_step.rate != DEFAULT_RATE:
+            buffer_pool.lease(frame)
+            previous = self.outputs.get(node_step.node_tag, None)
+            self.outputs[node_step.node_tag] = (frame, message)
+            if previous is not None:
+                buffer_pool.release(previous[0])
@@ -0,0 +1,212 @@
+import logging
+import os
+import threading
+from collections import OrderedDict
+from concurrent.futures import Future
+
+import numpy as np
+
+# Cost of a model without known files (e.g. MediaPipe graphs)
+DEFAULT_MODEL_COST = 32 * 1024 * 1024
+
+
+def get_model_key(model_class, model_path=None, providers=None, **options):
+    # Same model file, providers and options share one model (session)
+    if model_path is not None:
+        model_path = os.path.realpath(model_path)
+    if providers is not None:
+        providers = tuple(providers)
+    return (
+        model_class.__module__ + "." + model_class.__qualname__,
+        model_path,
+        providers,
+        tuple(sorted(options.items())),
+    )
+
+
+def get_model_cost(model, model_path=None):
+    # Approximate memory cost, model files plus arrays held by the model
+    paths = set([model_path])
+    session = getattr(model, "session", None)
+    if session is not None:
+        paths.add(getattr(session, "_model_path", None))
+    cost = 0
+    for value in getattr(model, "__dict__", {}).values():
+        if isinstance(value, np.ndarray):
+            cost += value.nbytes
+        elif isinstance(value, str):
+            paths.add(value)
+    for path in paths:
+        if isinstance(path, str) and os.path.isfile(path):
+            cost += os.path.getsize(path)
+    return cost if cost > 0 else DEFAULT_MODEL_COST
+
+
+class LockedModel:
+    # A model shared by nodes of several threads (thread executor, push mode)
+    # that is not thread safe runs one call at a time. Models declaring
+    # thread_safe = True (ONNX Runtime sessions) are handed out as they are
+    model = None
+    lock = None
+
+    def __init__(self, model):
+        self.model = model
+        self.lock = threading.Lock()
+
+    def __call__(self, *args, **kwargs):
+        with self.lock:
+            return self.model(*args, **kwargs)
+
+    def __getattr__(self, name):
+        attribute = getattr(self.model, name)
+        if name != "batch":
+            return attribute
+
+        def batch(images):
+            with self.lock:
+                return attribute(images)
+
+        return batch
+
+
+def get_shared_model(model):
+    if getattr(model, "thread_safe", False):
+        return model
+    return LockedModel(model)
+
+
+class ModelRegistry:
+    models = {}  # Model key to [model, reference count, cost]
+    owners = {}  # Owner (node tag) to model key
+    idle = None  # Unreferenced model keys, least recently used first
+    loading = {}  # Model key to the Future of a load in progress
+    budget = 0
+    lock = None
+    logger = None
+
+    def __init__(self, budget=0, logger=logging.getLogger(__name__)):
+        self.models = {}
+        self.owners = {}
+        self.idle = OrderedDict()
+        self.loading = {}
+        self.budget = budget
+        self.lock = threading.RLock()
+        self.logger = logger
+
+    def set_budget(self, budget):
+        # Bytes kept for models, unreferenced models are evicted beyond it
+        with self.lock:
+            self.budget = max(0, budget)
+            self.evict()
+
+    def acquire(self, owner, key, loader):
+        # Hand out the shared model of the key, loading it on first use. An
+        # owner holds one model, acquiring another key releases the previous.
+        # A model loads outside the lock, other owners of the key wait for it
+        # while the rest keep acquiring their models
+        while True:
+            with self.lock:
+                if self.owners.get(owner, None) == key:
+                    return self.models[key][0]
+                self.release(owner)
+                entry = self.models.get(key, None)
+                if entry is not None:
+                    self.idle.pop(key, None)
+                    entry[1] += 1
+                    self.owners[owner] = key
+                    self.evict()
+                    return entry[0]
+                future = self.loading.get(key, None)
+                is_loader = future is None
+                if is_loader:
+                    future = Future()
+                    self.loading[key] = future
+            if is_loader:
+                self.load(key, loader, future)
+            else:
+                future.result()
+
+    def load(self, key, loader, future):
+        self.logger.info("Load model: {}".format(key))
+        try:
+            model = loader()
+            cost = get_model_cost(model, key[1])
+        except Exception as e:
+            with self.lock:
+                del self.loading[key]
+            future.set_exception(e)
+            raise
+        with self.lock:
+            self.models[key] = [get_shared_model(model), 0, cost]
+            del self.loading[key]
+        future.set_result(model)
+
+    def release(self, owner, discard=False):
+        # Keep an unreferenced model for reuse while within the budget, a
+        # model that failed to load is discarded
+        with self.lock:
+            key = self.owners.pop(owner, None)
+            if key is None:
+                return
+            entry = self.models[key]
+            entry[1] -= 1
+            if entry[1] <= 0:
+                self.idle[key] = None
+                if discard:
+                    self.unload(key)
+                self.evict()
+
+    def evict(self, budget=None):
+        # Unload least recently used idle models until within the budget
+        if budget is None:
+            budget = self.budget
+        with self.lock:
+            total = sum(entry[2] for entry in self.models.values())
+            while self.idle and total > budget:
+                key = next(iter(self.idle))
+                total -= self.models[key][2]
+                self.unload(key)
+
+    def unload(self, key):
+        with self.lock:
+            self.logger.info("Unload model: {}".format(key))
+            del self.idle[key]
+            del self.models[key]
+
+    def clear(self):
+        self.evict(0)
+
+    def get(self, owner):
+        with self.lock:
+            key = self.owners.get(owner, None)
+            if key is None:
+                return None
+            return self.models[key][0]
+
+    def get_references(self, owner, peers=None):
+        # Number of owners sharing the model of the owner, only counting the
+        # peers (e.g. node tags of one plan level) if given
+        with self.lock:
+            key = self.owners.get(owner, None)
+            if key is None:
+                return 0
+            if peers is None:
+                return self.models[key][1]
+            return sum(1 for peer in peers if self.owners.get(peer, None) == key)
+
+    def get_stats(self):
+        with self.lock:
+            return [
+                {
+                    "model": key[0],
+                    "path": key[1],
+                    "references": entry[1],
+                    "bytes": entry[2],
+                    "idle": key in self.idle,
+                }
+                for key, entry in self.models.items()
+            ]
+
+
+# Models shared by every node of the process
+model_registry = ModelRegistry()
@@ -0,0 +1,284 @@
+import hashlib
+import importlib.util
+import inspect
+import json
+import logging
+import os
+import platform
+import threading
+
+try:
+    import onnxruntime as ort
+except ImportError:
+    pass
+
+from models.common.graph import fold_model
+
+# ONNX Runtime session tuning profile
+#   graph_optimization_level : disable, basic, extended or all
+#   intra_op_num_threads     : threads of an operator, 0 lets ORT decide
+#   inter_op_num_threads     : threads across operators (parallel mode), 0 as above
+#   execution_mode           : sequential or parallel
+#   enable_cpu_mem_arena     : reuse CPU memory through the arena allocator
+#   enable_mem_pattern       : preallocate memory from the first run
+#   optimized_model_directory: cache of optimized models, null disables it
+#   global_thread_pools      : every session shares one process-wide intra-op
+#                              and inter-op pool instead of a pool per session
+#   fold_preprocess          : prepend the preprocessing of a model to its graph
+#                              (needs onnx), frames are fed as raw uint8 BGR
+DEFAULT_PROFILE = {
+    "graph_optimization_level": "all",
+    "intra_op_num_threads": 0,
+    "inter_op_num_threads": 0,
+    "execution_mode": "sequential",
+    "enable_cpu_mem_arena": True,
+    "enable_mem_pattern": True,
+    "optimized_model_directory": None,
+    "global_thread_pools": False,
+    "fold_preprocess": False,
+}
+
+GRAPH_OPTIMIZATION_LEVELS = {
+    "disable": "ORT_DISABLE_ALL",
+    "basic": "ORT_ENABLE_BASIC",
+    "extended": "ORT_ENABLE_EXTENDED",
+    "all": "ORT_ENABLE_ALL",
+}
+
+EXECUTION_MODES = {
+    "sequential": "ORT_SEQUENTIAL",
+    "parallel": "ORT_PARALLEL",
+}
+
+
+def get_cpu_list(cpus):
+    # CPU cores from a list or a string such as "0,1" or "0-3"
+    if cpus is None:
+        return []
+    if isinstance(cpus, int):
+        return [cpus]
+    if not isinstance(cpus, str):
+        return [int(cpu) for cpu in cpus]
+    cpu_list = []
+    for part in cpus.split(","):
+        if "-" in part:
+            first, last = part.split("-")
+            cpu_list += list(range(int(first), int(last) + 1))
+        elif part.strip():
+            cpu_list.append(int(part))
+    return cpu_list
+
+
+def pin_cpus(cpus, logger=logging.getLogger(__name__)):
+    # Pin the calling process and the threads it creates afterwards
+    if not hasattr(os, "sched_setaffinity"):
+        logger.warning("CPU affinity is not supported on this platform")
+        return False
+    os.sched_setaffinity(0, get_cpu_list(cpus))
+    return True
+
+
+def get_file_hash(filepath, chunk_size=1024 * 1024):
+    file_hash = hashlib.sha256()
+    with open(filepath, "rb") as fp:
+        for chunk in iter(lambda: fp.read(chunk_size), b""):
+            file_hash.update(chunk)
+    return file_hash.hexdigest()
+
+
+class SessionFactory:
+    profile = None
+    cpu_affinity = {}  # Model file name (or node tag) to CPU cores
+    global_thread_pools = None  # Whether the global pools are set up
+    file_hashes = {}  # (path, size, mtime) to hash of the model file
+    lock = None
+    logger = None
+
+    def __init__(self, profile=None, logger=logging.getLogger(__name__)):
+        self.profile = dict(DEFAULT_PROFILE)
+        self.cpu_affinity = {}
+        self.global_thread_pools = None
+        self.file_hashes = {}
+        self.lock = threading.Lock()
+        self.logger = logger
+        self.set_profile(profile)
+
+    def set_profile(self, profile):
+        if profile:
+            self.profile.update(profile)
+
+    def set_cpu_affinity(self, cpu_affinity):
+        # Models listed by file name run on their own pool pinned to the cores
+        self.cpu_affinity = dict(cpu_affinity or {})
+
+    def setup_thread_pools(self):
+        # The global pools must be sized before the first session is created.
+        # A session of a process using them cannot have its own pool, so they
+        # are left off when any model is pinned
+        with self.lock:
+            if self.global_thread_pools is not None:
+                return self.global_thread_pools
+            self.global_thread_pools = False
+            if not self.profile["global_thread_pools"]:
+                return False
+            # Node tags ("3:object_detection") pin process workers, not sessions
+            model_names = [name for name in self.cpu_affinity if ":" not in name]
+            if any(self.get_model_cpus(name) for name in model_names):
+                self.logger.warning("Global thread pools are off with cpu_affinity")
+                return False
+            set_sizes = getattr(
+                ort.capi._pybind_state, "set_global_thread_pool_sizes", None
+            )
+            if set_sizes is None:
+                self.logger.warning("Global thread pools are not supported")
+                return False
+            set_sizes(
+                int(self.profile["intra_op_num_threads"]),
+                int(self.profile["inter_op_num_threads"]),
+            )
+            self.global_thread_pools = True
+            return True
+
+    def get_model_cpus(self, model_path):
+        if not isinstance(model_path, str):
+            return []
+        return get_cpu_list(self.cpu_affinity.get(os.path.basename(model_path), None))
+
+    def get_session_options(self, model_path=None):
+        options = ort.SessionOptions()
+        options.graph_optimization_level = getattr(
+            ort.GraphOptimizationLevel,
+            GRAPH_OPTIMIZATION_LEVELS.get(
+                self.profile["graph_optimization_level"], "ORT_ENABLE_ALL"
+            ),
+        )
+        options.execution_mode = getattr(
+            ort.ExecutionMode,
+            EXECUTION_MODES.get(self.profile["execution_mode"], "ORT_SEQUENTIAL"),
+        )
+        options.intra_op_num_threads = int(self.profile["intra_op_num_threads"])
+        options.inter_op_num_threads = int(self.profile["inter_op_num_threads"])
+        options.enable_cpu_mem_arena = bool(self.profile["enable_cpu_mem_arena"])
+        options.enable_mem_pattern = bool(self.profile["enable_mem_pattern"])
+        cpus = self.get_model_cpus(model_path)
+        if self.setup_thread_pools():
+            if len(cpus) > 0:
+                self.logger.warning(
+                    "{} is not pinned, global thread pools are in use".format(
+                        model_path
+                    )
+                )
+            options.use_per_session_threads = False
+        elif len(cpus) > 0:
+            # Own pool with one thread pinned to each core. ORT counts the
+            # thread calling run() as the first thread of the pool, it runs
+            # wherever the caller runs, and takes 1-based ids for the others
+            options.intra_op_num_threads = len(cpus) + 1
+            options.add_session_config_entry(
+                "session.intra_op_thread_affinities",
+                ";".join(str(cpu + 1) for cpu in cpus),
+            )
+        return options
+
+    def get_model_hash(self, model_path):
+        # Hash a model file once per size and modification time
+        stat = os.stat(model_path)
+        key = (os.path.realpath(model_path), stat.st_size, stat.st_mtime)
+        with self.lock:
+            model_hash = self.file_hashes.get(key, None)
+        if model_hash is None:
+            model_hash = get_file_hash(model_path)
+            with self.lock:
+                self.file_hashes[key] = model_hash
+        return model_hash
+
+    def get_cache_path(self, model_path, providers):
+        # Optimized graphs depend on the model, providers, profile and machine
+        directory = self.profile["optimized_model_directory"]
+        if not directory or not isinstance(model_path, str):
+            return None
+        cache_key = json.dumps(
+            [
+                self.get_model_hash(model_path),
+                list(providers or []),
+                self.profile["graph_optimization_level"],
+                platform.machine(),
+                ort.__version__,
+            ]
+        )
+        cache_name = hashlib.sha256(cache_key.encode("utf-8")).hexdigest()
+        return os.path.join(directory, cache_name + ".onnx")
+
+    def prepare_model(self, model_path, preprocess):
+        # Fold the preprocessing into the graph once, the folded model is cached
+        # with the optimized models or kept in memory without a cache
+        if not self.profile["fold_preprocess"] or not isinstance(model_path, str):
+            return model_path
+        if importlib.util.find_spec("onnx") is None:
+            self.logger.warning("Preprocessing is not folded without onnx")
+            return model_path
+        directory = self.profile["optimized_model_directory"]
+        try:
+            if not directory:
+                return fold_model(model_path, **preprocess)
+            cache_key = json.dumps(
+                [self.get_model_hash(model_path), preprocess], sort_keys=True
+            )
+            cache_name = hashlib.sha256(cache_key.encode("utf-8")).hexdigest()
+            cache_path = os.path.join(directory, cache_name + ".onnx")
+            if not os.path.exists(cache_path):
+                os.makedirs(directory, exist_ok=True)
+                self.logger.info("Save model with preprocessing {}".format(cache_path))
+                fold_model(model_path, cache_path + ".tmp", **preprocess)
+                os.replace(cache_path + ".tmp", cache_path)
+            return cache_path
+        except Exception as e:
+            self.logger.warning(
+                "Preprocessing is not folded into {}: {}".format(model_path, e)
+            )
+            return model_path
+
+    def __call__(self, model_path, providers=None, preprocess=None):
+        # Sessions of a model run as given, optionally with the preprocessing
+        # folded into the graph (the input then becomes raw uint8 NHWC)
+        source_path = model_path
+        if preprocess is not None:
+            model_path = self.prepare_model(model_path, preprocess)
+        options = self.get_session_options(source_path)
+        cache_path = self.get_cache_path(model_path, providers)
+        if cache_path is None:
+            return ort.InferenceSession(
+                model_path, sess_options=options, providers=providers
+            )
+        if os.path.exists(cache_path):
+            # Already optimized, skip graph optimization at load time
+            options.graph_optimization_level = (
+                ort.GraphOptimizationLevel.ORT_DISABLE_ALL
+            )
+            try:
+                return ort.InferenceSession(
+                    cache_path, sess_options=options, providers=providers
+                )
+            except Exception as e:
+                self.logger.warning(
+                    "Discard optimized model {}: {}".format(cache_path, e)
+                )
+                os.remove(cache_path)
+                options = self.get_session_options(source_path)
+        os.makedirs(os.path.dirname(cache_path), exist_ok=True)
+        options.optimized_model_filepath = cache_path
+        self.logger.info("Save optimized model {}".format(cache_path))
+        return ort.InferenceSession(
+            model_path, sess_options=options, providers=providers
+        )
+
+
+def load_model(model_class, **kwargs):
+    # Models built on ONNX Runtime create their sessions through the factory
+    if "session_factory" in inspect.signature(model_class).parameters:
+        kwargs["session_factory"] = session_factory
+    return model_class(**kwargs)
+
+
+# ONNX Runtime sessions of the process
+session_factory = SessionFactory()
@@ -0,0 +1,69 @@
+import threading
+
+
+class NodeStats:
+    processed = 0
+    dropped = 0
+    late = 0
+    timeouts = 0
+    last_duration = 0.0
+
+    def __init__(self):
+        self.processed = 0
+        self.dropped = 0
+        self.late = 0
+        self.timeouts = 0
+        self.last_duration = 0.0
+
+    def to_dict(self):
+        return {
+            "processed": self.processed,
+            "dropped": self.dropped,
+            "late": self.late,
+            "timeouts": self.timeouts,
+            "last_duration_ms": self.last_duration * 1000.0,
+        }
+
+
+class PipelineStats:
+    nodes = {}
+    clock = None
+    lock = None
+
+    def __init__(self):
+        self.nodes = {}
+        self.lock = threading.Lock()
+
+    def reset(self):
+        with self.lock:
+            self.nodes = {}
+
+    def get_node(self, node_tag):
+        node_stats = self.nodes.get(node_tag, None)
+        if node_stats is None:
+            with self.lock:
+                node_stats = self.nodes.setdefault(node_tag, NodeStats())
+        return node_stats
+
+    def add_processed(self, node_tag, duration, is_late):
+        node_stats = self.get_node(node_tag)
+        node_stats.processed += 1
+        node_stats.last_duration = duration
+        if is_late:
+            node_stats.late += 1
+
+    def add_timeout(self, node_tag):
+        self.get_node(node_tag).timeouts += 1
+
+    def add_dropped(self, node_tags, count=1):
+        for node_tag in node_tags:
+            self.get_node(node_tag).dropped += count
+
+    def get_stats(self):
+        stats = {"nodes": {}}
+        with self.lock:
+            for node_tag, node_stats in self.nodes.items():
+                stats["nodes"][node_tag] = node_stats.to_dict()
+        if self.clock is not None:
+            stats["scheduler"] = self.clock.get_stats()
+        return stats
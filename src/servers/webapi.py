@@ -1,3 +1,4 @@
+import base64
 import json
 import multiprocessing.shared_memory as shared_memory
 import os
@@ -5,14 +6,17 @@
 import cv2
 import numpy as np
 from flasgger import Swagger
-from flask import Flask, Response, render_template, request
+from flask import Flask, Response, abort, render_template, request
 
 from links.mq_req_rep.link import MessageQueueReqRep
 
 app = Flask(__name__)
 mq = MessageQueueReqRep()
 shared_frame = None
+shared_frames = []
+shared_memories = []
 web_netron_port = None
+web_workers = []
 Swagger(app)
 
 # Set WeDX settings
@@ -22,6 +26,14 @@
     settings = json.load(fp)
 
 
+def get_worker_port():
+    # Legacy routes address one worker, selected by ?worker=<id> (default 0)
+    worker_id = request.args.get("worker", 0, type=int)
+    if worker_id < 0 or worker_id >= len(web_workers):
+        abort(404, "No worker " + str(worker_id))
+    return web_workers[worker_id]["mq_port"]
+
+
 @app.route("/", methods=["GET"])
 async def index():
     return render_template("index.html")
@@ -51,11 +63,20 @@ async def start_pipeline():
     ---
     tags:
         - WeDX Web API List
+    parameters:
+        -
+            name: worker
+            in: query
+            required: false
+            type: integer
+            description: Worker id of the supervisor (default 0)
     responses:
         200:
             description: OK
     """
-    message = await mq.client(message={"method": "start_pipeline"})
+    message = await mq.client(
+        port=get_worker_port(), message={"method": "start_pipeline"}
+    )
     return "Call Start Pipeline method : " + message
 
 
@@ -65,11 +86,20 @@ async def stop_pipeline():
     ---
     tags:
         - WeDX Web API List
+    parameters:
+        -
+            name: worker
+            in: query
+            required: false
+            type: integer
+            description: Worker id of the supervisor (default 0)
     responses:
         200:
             description: OK
     """
-    message = await mq.client(message={"method": "stop_pipeline"})
+    message = await mq.client(
+        port=get_worker_port(), message={"method": "stop_pipeline"}
+    )
     return "Call Stop Pipeline method : " + message
 
 
@@ -85,13 +115,22 @@ async def import_pipeline():
             in: body
             required: true
             type: string
+        -
+            name: worker
+            in: query
+            required: false
+            type: integer
+            description: Worker id of the supervisor (default 0)
     responses:
         200:
             description: OK
     """
     data = request.data.decode("utf-8")
     payload = json.loads(data)
-    message = await mq.client(message={"method": "import_pipeline", "payload": payload})
+    message = await mq.client(
+        port=get_worker_port(),
+        message={"method": "import_pipeline", "payload": payload},
+    )
     return "Call Import Pipeline method : " + message
 
 
@@ -101,22 +140,172 @@ async def export_pipeline():
     ---
     tags:
         - WeDX Web API List
+    parameters:
+        -
+            name: worker
+            in: query
+            required: false
+            type: integer
+            description: Worker id of the supervisor (default 0)
     responses:
         200:
             description: OK
     """
-    message = await mq.client(message={"method": "export_pipeline"})
+    message = await mq.client(
+        port=get_worker_port(), message={"method": "export_pipeline"}
+    )
+    return message
+
+
+@app.route("/pipelinestats", methods=["GET"])
+async def pipeline_stats():
+    """Get pipeline statistics
+    ---
+    tags:
+        - WeDX Web API List
+    parameters:
+        -
+            name: worker
+            in: query
+            required: false
+            type: integer
+            description: Worker id of the supervisor (default 0)
+    responses:
+        200:
+            description: Processed, dropped and late frame counts of each node
+    """
+    message = await mq.client(
+        port=get_worker_port(), message={"method": "get_pipeline_stats"}
+    )
     return message
 
 
+@app.route("/modelstats", methods=["GET"])
+async def model_stats():
+    """Get loaded models
+    ---
+    tags:
+        - WeDX Web API List
+    parameters:
+        -
+            name: worker
+            in: query
+            required: false
+            type: integer
+            description: Worker id of the supervisor (default 0)
+    responses:
+        200:
+            description: Approximate memory cost and references of each model
+    """
+    message = await mq.client(
+        port=get_worker_port(), message={"method": "get_model_stats"}
+    )
+    return {"models": message}
+
+
+@app.route("/thumbnail/<node_tag>", methods=["GET"])
+async def thumbnail(node_tag):
+    """Get the preview thumbnail of a node
+    ---
+    tags:
+        - WeDX Web API List
+    parameters:
+        -
+            name: node_tag
+            in: path
+            required: true
+            type: string
+        -
+            name: worker
+            in: query
+            required: false
+            type: integer
+            description: Worker id of the supervisor (default 0)
+    responses:
+        200:
+            description: JPEG thumbnail (requires web_thumbnails in settings)
+        404:
+            description: No thumbnail for the node
+    """
+    message = await mq.client(
+        port=get_worker_port(),
+        message={"method": "get_thumbnail", "payload": node_tag},
+    )
+    if message is None:
+        return Response("No thumbnail for " + node_tag, status=404)
+    return Response(base64.b64decode(message), mimetype="image/jpeg")
+
+
+async def request_workers(message):
+    # Send a request to every worker, an unresponsive worker replies None
+    responses = {}
+    for worker in web_workers:
+        responses[worker["name"]] = await mq.client(
+            port=worker["mq_port"], message=message, timeout=1000
+        )
+    return responses
+
+
+@app.route("/workers", methods=["GET"])
+async def workers():
+    """Get pipeline statistics of all workers
+    ---
+    tags:
+        - WeDX Web API List
+    responses:
+        200:
+            description: Pipeline statistics keyed by worker name
+    """
+    return await request_workers({"method": "get_pipeline_stats"})
+
+
+@app.route("/workers/modelstats", methods=["GET"])
+async def workers_model_stats():
+    """Get loaded models of all workers
+    ---
+    tags:
+        - WeDX Web API List
+    responses:
+        200:
+            description: Loaded models keyed by worker name
+    """
+    return await request_workers({"method": "get_model_stats"})
+
+
+@app.route("/workers/startpipeline", methods=["POST"])
+async def start_workers_pipeline():
+    """Start pipeline of all workers
+    ---
+    tags:
+        - WeDX Web API List
+    responses:
+        200:
+            description: OK
+    """
+    return await request_workers({"method": "start_pipeline"})
+
+
+@app.route("/workers/stoppipeline", methods=["POST"])
+async def stop_workers_pipeline():
+    """Stop pipeline of all workers
+    ---
+    tags:
+        - WeDX Web API List
+    responses:
+        200:
+            description: OK
+    """
+    return await request_workers({"method": "stop_pipeline"})
+
+
 @app.route("/stream", methods=["GET"])
 async def stream():
     return render_template("stream.html")
 
 
-def gen():
+def gen(frame_buffer):
     while True:
-        _, frame = cv2.imencode(".jpg", shared_frame)
+        _, frame = cv2.imencode(".jpg", frame_buffer)
         if frame is not None:
             yield (
                 b"--frame\r\n"
@@ -126,15 +315,34 @@ def gen():
 
 @app.route("/video_feed", methods=["GET"])
 async def video_feed():
-    return Response(gen(), mimetype="multipart/x-mixed-replace; boundary=frame")
+    return Response(
+        gen(shared_frame), mimetype="multipart/x-mixed-replace; boundary=frame"
+    )
+
 
+@app.route("/workers/<int:worker_id>/video_feed", methods=["GET"])
+async def worker_video_feed(worker_id):
+    if worker_id >= len(shared_frames):
+        abort(404, "No worker " + str(worker_id))
+    return Response(
+        gen(shared_frames[worker_id]),
+        mimetype="multipart/x-mixed-replace; boundary=frame",
+    )
 
-def run_api(width, height, netron_port, **kwargs):
+
+def run_api(width, height, netron_port, workers=None, **kwargs):
     global shared_frame
     global web_netron_port
-    existing_shm = shared_memory.SharedMemory(name="wedx_shm")
-    shared_frame = np.ndarray(
-        (height, width, 3), dtype=np.uint8, buffer=existing_shm.buf
-    )
+    global web_workers
+    if workers is None:
+        workers = [{"name": "wedx", "mq_port": 5555, "shm_name": "wedx_shm"}]
+    for worker in workers:
+        existing_shm = shared_memory.SharedMemory(name=worker["shm_name"])
+        shared_memories.append(existing_shm)
+        shared_frames.append(
+            np.ndarray((height, width, 3), dtype=np.uint8, buffer=existing_shm.buf)
+        )
+    shared_frame = shared_frames[0]
     web_netron_port = netron_port
+    web_workers = workers
     app.run(**kwargs)
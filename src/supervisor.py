@@ -0,0 +1,194 @@
+#!/usr/bin/env python
+"""WeDX Supervisor - Run several headless pipelines in worker processes"""
+
+import argparse
+import json
+import logging
+import logging.config
+import multiprocessing
+import multiprocessing.shared_memory as shared_memory
+import os
+import subprocess
+import sys
+import time
+
+from runtime.push import SCHEDULER_MODES
+from servers.webapi import run_api
+
+# Restart of crashed workers, the delay doubles on every crash in a row
+RESTART_DELAY = 1.0
+RESTART_MAX_DELAY = 60.0
+RESTART_LIMIT = 10  # Crashes in a row before giving up on a worker
+RESTART_STABLE_TIME = 60.0  # A worker running this long is no longer crashing
+
+
+def parse_worker(worker_spec, worker_id, settings):
+    # "<pipeline file>[@<cpu>,<cpu>...]"
+    pipeline, _, cpus = worker_spec.partition("@")
+    return {
+        "name": "worker" + str(worker_id),
+        "pipeline": os.path.abspath(pipeline),
+        "cpus": cpus,
+        "mq_port": settings["supervisor_mq_base_port"] + worker_id,
+        "shm_name": "wedx_shm_" + str(worker_id),
+    }
+
+
+def start_worker(current_path, worker, scheduler=None):
+    command = [
+        sys.executable,
+        "main.py",
+        "--no_gui",
+        "--no_webapi",
+        "--no_webapp",
+        "--skip_detect_cameras",
+        "--pipeline",
+        worker["pipeline"],
+        "--shm_name",
+        worker["shm_name"],
+        "--mq_port",
+        str(worker["mq_port"]),
+    ]
+    if worker["cpus"]:
+        command += ["--cpus", worker["cpus"]]
+    if scheduler:
+        command += ["--scheduler", scheduler]
+    return subprocess.Popen(
+        command, cwd=current_path, stdout=sys.stdout, stderr=sys.stderr
+    )
+
+
+def main():
+    # Arguments
+    current_path = os.path.dirname(os.path.abspath(__file__))
+    parser = argparse.ArgumentParser()
+    parser.add_argument(
+        "--worker",
+        action="append",
+        required=True,
+        help="Pipeline file and optional CPUs, e.g. PL1.wedx@0,1",
+    )
+    parser.add_argument("--scheduler", choices=SCHEDULER_MODES)
+    parser.add_argument("--no_webapi", action="store_true")
+    args = parser.parse_args()
+
+    # Set settings
+    settings = None
+    with open(os.path.abspath(os.path.join(current_path, ".wedx/settings.json"))) as fp:
+        settings = json.load(fp)
+
+    # Set Logger
+    logging.config.dictConfig(settings["logger"])
+    logger = logging.getLogger(__name__)
+
+    # Create one shared memory segment per worker for video streaming
+    workers = [
+        parse_worker(worker_spec, worker_id, settings)
+        for worker_id, worker_spec in enumerate(args.worker)
+    ]
+    shm_size = (
+        settings["video_streaming_height"] * settings["video_streaming_width"] * 3
+    )
+    created_shms = []
+    for worker in workers:
+        try:
+            created_shm = shared_memory.SharedMemory(
+                name=worker["shm_name"], create=True, size=shm_size
+            )
+        except FileExistsError:
+            created_shm = shared_memory.SharedMemory(
+                name=worker["shm_name"], create=False, size=shm_size
+            )
+        created_shms.append(created_shm)
+
+    # Start Processes
+    proc = {}
+    for worker in workers:
+        proc[worker["name"]] = start_worker(current_path, worker, args.scheduler)
+        worker["started_at"] = time.monotonic()
+        worker["crashes"] = 0
+        worker["restart_at"] = None
+        logger.info("Start {} with {}".format(worker["name"], worker["pipeline"]))
+    if not args.no_webapi:
+        proc["webapi"] = multiprocessing.Process(
+            target=run_api,
+            args=(
+                (
+                    settings["video_streaming_width"],
+                    settings["video_streaming_height"],
+                    settings["netron_port"],
+                )
+            ),
+            kwargs={
+                "host": "0.0.0.0",
+                "port": settings["webapi_port"],
+                "workers": [
+                    {
+                        "name": worker["name"],
+                        "mq_port": worker["mq_port"],
+                        "shm_name": worker["shm_name"],
+                    }
+                    for worker in workers
+                ],
+            },
+        )
+        proc["webapi"].start()
+
+    # Restart workers that exit, with a capped exponential backoff
+    try:
+        while True:
+            time.sleep(1.0)
+            now = time.monotonic()
+            for worker in workers:
+                name = worker["name"]
+                if worker["restart_at"] is not None:
+                    if now >= worker["restart_at"]:
+                        proc[name] = start_worker(current_path, worker, args.scheduler)
+                        worker["started_at"] = now
+                        worker["restart_at"] = None
+                    continue
+                if proc[name] is None:
+                    continue
+                if proc[name].poll() is None:
+                    if now - worker["started_at"] >= RESTART_STABLE_TIME:
+                        worker["crashes"] = 0
+                    continue
+                worker["crashes"] += 1
+                if worker["crashes"] > RESTART_LIMIT:
+                    logger.error(
+                        "{} exited with {} {} times in a row, give up".format(
+                            name, proc[name].returncode, worker["crashes"]
+                        )
+                    )
+                    proc[name] = None
+                    continue
+                delay = min(
+                    RESTART_MAX_DELAY, RESTART_DELAY * 2 ** (worker["crashes"] - 1)
+                )
+                logger.warning(
+                    "{} exited with {}, restart in {:.0f}s".format(
+                        name, proc[name].returncode, delay
+                    )
+                )
+                worker["restart_at"] = now + delay
+    except KeyboardInterrupt:
+        pass
+
+    # Terminate Processes
+    for worker in workers:
+        if proc[worker["name"]] is not None:
+            proc[worker["name"]].terminate()
+    if not args.no_webapi:
+        proc["webapi"].terminate()
+
+    # Release shared memory
+    for created_shm in created_shms:
+        created_shm.unlink()
+
+
+if __name__ == "__main__":
+    if not sys.version >= "3.9":
+        raise Exception(
+            "WeDX requires python 3.9+. Current version of Python: %s" % sys.version
+        )
+    sys.exit(main())
@@ -0,0 +1,142 @@
+import asyncio
+import queue
+import threading
+import time
+
+import pytest
+
+from runtime.backpressure import (
+    BLOCK,
+    DROP_NEWEST,
+    DROP_OLDEST,
+    KEEP_LATEST,
+    FrameQueue,
+    get_queue_policy,
+)
+from runtime.executor import BUSY, NodeExecutor
+from runtime.plan import build_execution_plan
+from runtime.stats import PipelineStats
+
+
+def get_items(frame_queue):
+    return [frame_queue.get() for _ in range(len(frame_queue.items))]
+
+
+def test_drop_oldest():
+    frame_queue = FrameQueue(2, DROP_OLDEST)
+    assert [frame_queue.put(item) for item in range(4)] == [0, 0, 1, 1]
+    assert get_items(frame_queue) == [2, 3]
+
+
+def test_drop_newest():
+    frame_queue = FrameQueue(2, DROP_NEWEST)
+    assert [frame_queue.put(item) for item in range(4)] == [0, 0, 1, 1]
+    assert get_items(frame_queue) == [0, 1]
+
+
+def test_keep_latest():
+    frame_queue = FrameQueue(4, KEEP_LATEST)
+    assert frame_queue.maxsize == 1
+    assert [frame_queue.put(item) for item in range(3)] == [0, 1, 1]
+    assert get_items(frame_queue) == [2]
+
+
+def test_block():
+    frame_queue = FrameQueue(1, BLOCK)
+    frame_queue.put(0)
+    with pytest.raises(queue.Full):
+        frame_queue.put_nowait(1)
+    thread = threading.Thread(target=frame_queue.put, args=(1,))
+    thread.start()
+    assert frame_queue.get() == 0
+    thread.join(5)
+    assert not thread.is_alive()
+    assert get_items(frame_queue) == [1]
+
+
+def test_force():
+    frame_queue = FrameQueue(1, BLOCK)
+    frame_queue.put(0)
+    assert frame_queue.put(None, force=True) == 0
+    assert get_items(frame_queue) == [0, None]
+
+
+def test_get_queue_policy():
+    assert get_queue_policy([]) == BLOCK
+    assert get_queue_policy([], KEEP_LATEST) == KEEP_LATEST
+    assert get_queue_policy([KEEP_LATEST, DROP_OLDEST]) == DROP_OLDEST
+    assert get_queue_policy([KEEP_LATEST, DROP_NEWEST, BLOCK]) == BLOCK
+
+
+class StuckNode:
+    # The first refresh takes delay seconds
+    batch_aware = False
+
+    def __init__(self, delay):
+        self.delay = delay
+        self.frames = []
+
+    async def refresh(self, node_id, node_links, node_frames, node_messages):
+        frame = node_frames[node_links[0].source_node_tag]
+        self.frames.append(frame)
+        if len(self.frames) == 1:
+            time.sleep(self.delay)
+        return frame, None
+
+
+def get_busy_node(policy, delay, timeout):
+    node = StuckNode(delay)
+    plan = build_execution_plan(
+        {"1:webcam": [], "2:object_detection": ["1:webcam"]},
+        {"2:object_detection": [["1:webcam:1:0", "2:object_detection:1:0"]]},
+        {"webcam": None, "object_detection": node}.get,
+        node_input_policies={"2:object_detection": policy},
+        node_timeouts={"2:object_detection": timeout},
+    )
+    stats = PipelineStats()
+    return node, plan.steps["2:object_detection"], NodeExecutor({}, stats), stats
+
+
+async def run_busy_node(executor, node_step, frames):
+    results = []
+    for frame in frames:
+        results.append(await executor.run(node_step, {"1:webcam": frame}, {}))
+    while len(executor.inbox_tasks) > 0:
+        await asyncio.sleep(0.01)
+    return results
+
+
+@pytest.mark.parametrize(
+    "policy, frames, dropped",
+    [(None, [1, 3], 1), (KEEP_LATEST, [1, 3], 1), (DROP_NEWEST, [1, 2], 1)],
+)
+def test_busy_node_queues_inputs(policy, frames, dropped):
+    node, node_step, executor, stats = get_busy_node(policy, 0.2, 0.05)
+    results = asyncio.run(run_busy_node(executor, node_step, [1, 2, 3]))
+    executor.shutdown()
+    assert results == [(None, None)] * 3
+    assert node.frames == frames
+    assert executor.last_outputs[node_step.node_tag] == (frames[-1], None)
+    node_stats = stats.get_node(node_step.node_tag)
+    assert (node_stats.timeouts, node_stats.dropped) == (1, dropped)
+    assert node_stats.processed == 1
+
+
+def test_busy_node_blocks():
+    node, node_step, executor, stats = get_busy_node(BLOCK, 0.3, 0.2)
+    results = asyncio.run(run_busy_node(executor, node_step, [1, 2]))
+    executor.shutdown()
+    assert results == [(None, None), (2, None)]
+    assert node.frames == [1, 2]
+    assert stats.get_node(node_step.node_tag).dropped == 0
+
+
+def test_busy_node_result():
+    node, node_step, executor, stats = get_busy_node(None, 0.2, 0.05)
+
+    async def run():
+        await executor.run(node_step, {"1:webcam": 1}, {})
+        return await executor._refresh(node_step, {"1:webcam": 2}, {}, 0.0)
+
+    assert asyncio.run(run()) is BUSY
+    executor.shutdown()
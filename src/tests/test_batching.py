@@ -0,0 +1,108 @@
+import asyncio
+
+import pytest
+
+from runtime.batching import InferenceBatcher
+from runtime.plan import build_execution_plan
+
+
+class Model:
+    def __init__(self):
+        self.calls = []
+
+    def __call__(self, image):
+        self.calls.append([image])
+        return image * 10
+
+    def batch(self, images):
+        self.calls.append(list(images))
+        return [image * 10 for image in images]
+
+
+class FailingModel(Model):
+    def batch(self, images):
+        raise RuntimeError("batch failed")
+
+
+async def infer_all(batcher, model, images, size):
+    return await asyncio.gather(
+        *[batcher.infer(model, image, size) for image in images],
+        return_exceptions=True,
+    )
+
+
+def test_single_node():
+    model = Model()
+    results = asyncio.run(infer_all(InferenceBatcher(), model, [1], 1))
+    assert results == [10]
+    assert model.calls == [[1]]
+
+
+def test_group():
+    model = Model()
+    results = asyncio.run(infer_all(InferenceBatcher(), model, [1, 2, 3], 3))
+    assert results == [10, 20, 30]
+    assert model.calls == [[1, 2, 3]]
+
+
+def test_groups_per_size():
+    model = Model()
+    results = asyncio.run(infer_all(InferenceBatcher(), model, [1, 2, 3, 4], 2))
+    assert results == [10, 20, 30, 40]
+    assert model.calls == [[1, 2], [3, 4]]
+
+
+def test_missing_node_after_window():
+    model = Model()
+    batcher = InferenceBatcher(window=0.01)
+    results = asyncio.run(infer_all(batcher, model, [1, 2], 3))
+    assert results == [10, 20]
+    assert model.calls == [[1, 2]]
+    assert batcher.pending == {}
+
+
+def test_disabled():
+    model = Model()
+    batcher = InferenceBatcher()
+    batcher.set_window(0)
+    results = asyncio.run(infer_all(batcher, model, [1, 2], 2))
+    assert results == [10, 20]
+    assert model.calls == [[1], [2]]
+
+
+def test_exception():
+    results = asyncio.run(infer_all(InferenceBatcher(), FailingModel(), [1, 2], 2))
+    assert all(isinstance(result, RuntimeError) for result in results)
+
+
+class Node:
+    async def refresh(self, node_id, node_links, node_frames, node_messages):
+        return None, None
+
+
+def test_peers():
+    plan = build_execution_plan(
+        {
+            "1:webcam": [],
+            "2:object_detection": ["1:webcam"],
+            "3:object_detection": ["1:webcam"],
+            "4:object_detection": ["2:object_detection"],
+        },
+        {},
+        lambda node_name: Node(),
+    )
+    batcher = InferenceBatcher()
+    batcher.set_plan(plan)
+    assert batcher.get_peers("2:object_detection") == frozenset(
+        ["2:object_detection", "3:object_detection"]
+    )
+    assert batcher.get_peers("4:object_detection") == frozenset(["4:object_detection"])
+    assert batcher.get_peers("5:object_detection") == frozenset()
+
+
+@pytest.mark.parametrize("size", [0, 1])
+def test_no_batch_method(size):
+    results = asyncio.run(
+        infer_all(InferenceBatcher(), lambda image: -image, [1], size)
+    )
+    assert results == [-1]
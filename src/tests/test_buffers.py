@@ -0,0 +1,150 @@
+import asyncio
+
+import numpy as np
+
+from gui.preview import PreviewEngine
+from runtime.buffers import BufferPool, buffer_pool, read_capture
+from runtime.executor import NodeExecutor
+from runtime.frame import FrameBatch, get_shared_frame, get_writable_frame
+from runtime.plan import build_execution_plan
+from runtime.rate import NodeRate, RateGate
+
+
+class Capture:
+    def __init__(self, width, height):
+        self.width = width
+        self.height = height
+        self.count = 0
+
+    def get(self, prop):
+        return {3: self.width, 4: self.height}[prop]
+
+    def read(self, image=None):
+        # Like cv2, fill the given image when it fits or allocate a new one
+        self.count += 1
+        if image is None or image.shape != (self.height, 4, 3):
+            image = np.empty((self.height, 4, 3), dtype=np.uint8)
+        image[:] = self.count
+        return True, image
+
+
+class PassThrough:
+    batch_aware = False
+
+    async def refresh(self, node_id, node_links, node_frames, node_messages):
+        return node_frames[node_links[0].source_node_tag], None
+
+
+def is_free(pool, buffer):
+    return any(b is buffer for bs in pool.free_buffers.values() for b in bs)
+
+
+def test_release_reuses_buffer():
+    pool = BufferPool()
+    buffer = pool.acquire((2, 2, 3))
+    pool.release(buffer)
+    assert pool.acquire((2, 2, 3)) is buffer
+    assert pool.acquire((2, 2, 3)) is not buffer
+
+
+def test_leases():
+    pool = BufferPool()
+    buffer = pool.acquire((2, 2, 3))
+    frame = get_shared_frame(buffer)
+    assert pool.get_buffer(frame) is buffer
+    pool.lease(frame)
+    pool.release(buffer)
+    assert not is_free(pool, buffer)
+    pool.release(frame)
+    assert is_free(pool, buffer)
+    # Returned buffers and other frames are ignored
+    pool.release(frame)
+    pool.release(np.zeros((2, 2, 3), dtype=np.uint8))
+    pool.release(None)
+    assert pool.get_stats()["buffers"] == 1
+
+
+def test_batch_leases():
+    pool = BufferPool()
+    batch = FrameBatch([pool.acquire((1, 1)), pool.acquire((1, 1))])
+    pool.release(batch)
+    assert pool.get_stats() == {"buffers": 2, "bytes": 2, "leased": 0}
+
+
+def test_read_capture():
+    pool = BufferPool()
+    ret, frame = read_capture(Capture(4, 2), pool)
+    assert ret and pool.get_buffer(frame) is frame
+    # OpenCV allocates a frame that does not fit the buffer
+    ret, frame = read_capture(Capture(8, 2), pool)
+    assert ret and pool.get_buffer(frame) is None
+    assert pool.get_stats()["buffers"] == 1
+
+
+def test_writable_frame_is_pooled():
+    frame = get_shared_frame(np.ones((2, 2, 3), dtype=np.uint8))
+    writable_frame = get_writable_frame(frame)
+    assert writable_frame.flags.writeable
+    assert np.array_equal(writable_frame, frame)
+    assert buffer_pool.get_buffer(writable_frame) is writable_frame
+    buffer_pool.release(writable_frame)
+    assert is_free(buffer_pool, writable_frame)
+    buffer_pool.clear()
+
+
+def test_pass_through_frame_gets_a_lease():
+    plan = build_execution_plan(
+        {"1:webcam": [], "2:object_detection": ["1:webcam"]},
+        {"2:object_detection": [["1:webcam:1:0", "2:object_detection:1:0"]]},
+        {"webcam": None, "object_detection": PassThrough()}.get,
+    )
+    buffer = buffer_pool.acquire((2, 2, 3))
+    node_frames = {"1:webcam": get_shared_frame(buffer)}
+    executor = NodeExecutor({})
+    frame, _ = asyncio.run(
+        executor.run(plan.steps["2:object_detection"], node_frames, {})
+    )
+    executor.shutdown()
+    node_frames["2:object_detection"] = frame
+    # Released in level order, the buffer is reused after its last frame
+    buffer_pool.release(node_frames.pop("1:webcam"))
+    assert not is_free(buffer_pool, buffer)
+    buffer_pool.release(node_frames.pop("2:object_detection"))
+    assert is_free(buffer_pool, buffer)
+    buffer_pool.clear()
+
+
+def test_replayed_frames_hold_leases():
+    plan = build_execution_plan(
+        {"1:webcam": []},
+        {},
+        {"webcam": PassThrough()}.get,
+        node_rates={"1:webcam": NodeRate(target_fps=None, divisor=2)},
+    )
+    node_step = plan.steps["1:webcam"]
+    rate_gate = RateGate()
+    buffer = buffer_pool.acquire((2, 2, 3))
+    rate_gate.set_output(node_step, buffer, None)
+    buffer_pool.release(buffer)
+    node_frames = {}
+    assert rate_gate.get_due_steps(plan.levels[0], 1, node_frames, {}) == []
+    assert node_frames["1:webcam"] is buffer
+    buffer_pool.release(node_frames.pop("1:webcam"))
+    assert not is_free(buffer_pool, buffer)
+    rate_gate.reset()
+    assert is_free(buffer_pool, buffer)
+    buffer_pool.clear()
+
+
+def test_preview_holds_a_lease():
+    preview_engine = PreviewEngine()
+    preview_engine.set_outputs(False, web_thumbnails=True)
+    buffer = buffer_pool.acquire((4, 4, 3))
+    buffer[:] = 0
+    preview_engine.submit("1:webcam", buffer, 2, 2)
+    buffer_pool.release(buffer)
+    assert not is_free(buffer_pool, buffer)
+    assert preview_engine.render() == 0
+    assert preview_engine.get_thumbnail("1:webcam") is not None
+    assert is_free(buffer_pool, buffer)
+    buffer_pool.clear()
@@ -0,0 +1,43 @@
+import time
+
+from runtime.clock import TickClock
+
+
+def test_tick_clock():
+    clock = TickClock(10)
+    assert clock.is_due()
+    clock.mark_tick()
+    assert not clock.is_due()
+    assert 0.0 < clock.time_until_due() <= 0.1
+    assert clock.tick_count == 1
+
+
+def test_tick_clock_keeps_grid():
+    clock = TickClock(10)
+    clock.mark_tick()
+    deadline = time.monotonic() - 0.01
+    clock.next_deadline = deadline
+    clock.mark_tick()
+    assert clock.next_deadline == deadline + clock.period
+    assert clock.missed_deadlines == 0
+    assert clock.jitter > 0.0
+
+
+def test_tick_clock_missed_deadlines():
+    clock = TickClock(10)
+    clock.mark_tick()
+    clock.next_deadline = time.monotonic() - 0.35
+    clock.mark_tick()
+    assert clock.missed_deadlines == 3
+    assert clock.next_deadline > time.monotonic()
+    assert clock.get_stats()["ticks"] == 2
+
+
+def test_tick_clock_set_fps():
+    clock = TickClock(10)
+    clock.mark_tick()
+    clock.set_fps(20)
+    assert clock.period == 0.05
+    assert clock.is_due()
+    clock.reset()
+    assert clock.tick_count == 0
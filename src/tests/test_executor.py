@@ -0,0 +1,181 @@
+import asyncio
+import os
+import threading
+import time
+
+import numpy as np
+
+from runtime.executor import (
+    INLINE,
+    PROCESS,
+    THREAD,
+    NodeExecutor,
+    get_node_timeout,
+    get_process_settings,
+)
+from runtime.plan import build_execution_plan
+from runtime.stats import PipelineStats
+
+
+class EdgeAINode:
+    # Node of this module, also built by the worker process of process mode
+    name = "Counter"
+    batch_aware = False
+
+    def __init__(self, settings=None):
+        self.settings = settings
+        self.params = {}
+
+    def add_node(self, parent, node_id, pos):
+        pass
+
+    def get_export_params(self, node_id):
+        return {"position": [0, 0], "step": 2}
+
+    def set_import_params(self, node_id, params):
+        self.params = params
+
+    async def refresh(self, node_id, node_links, node_frames, node_messages):
+        frame = node_frames[node_links[0].source_node_tag] + self.params.get("step", 1)
+        message = {
+            "pid": os.getpid(),
+            "thread": threading.current_thread().name,
+            "gui": self.settings.get("gui", None) if self.settings else None,
+        }
+        return frame, message
+
+
+def get_step(executor_mode, **kwargs):
+    plan = build_execution_plan(
+        {"1:webcam": [], "2:counter": ["1:webcam"]},
+        {"2:counter": [["1:webcam:1:0", "2:counter:1:0"]]},
+        {"webcam": None, "counter": EdgeAINode()}.get,
+        node_executors={"2:counter": executor_mode},
+        **kwargs
+    )
+    return plan, plan.steps["2:counter"]
+
+
+def run(executor, node_step, frame):
+    return asyncio.run(executor.run(node_step, {"1:webcam": frame}, {}))
+
+
+def test_inline_mode():
+    _, node_step = get_step(INLINE)
+    stats = PipelineStats()
+    executor = NodeExecutor({}, stats)
+    frame, message = run(executor, node_step, np.zeros(2))
+    executor.shutdown()
+    assert np.array_equal(frame, [1, 1])
+    assert not frame.flags.writeable
+    assert message["thread"] == threading.current_thread().name
+    assert stats.get_node("2:counter").processed == 1
+
+
+def test_thread_mode():
+    _, node_step = get_step(THREAD)
+    executor = NodeExecutor({"executor_thread_workers": 1})
+    frame, message = run(executor, node_step, np.zeros(2))
+    executor.shutdown()
+    assert np.array_equal(frame, [1, 1])
+    assert message["thread"].startswith("wedx-node")
+
+
+def test_process_mode():
+    plan, node_step = get_step(PROCESS)
+    executor = NodeExecutor({"gui": True, "logger": object()})
+    executor.prepare(plan)
+    assert list(executor.process_pools) == ["2:counter"]
+    frame, message = run(executor, node_step, np.zeros(2))
+    executor.shutdown()
+    # The worker node is built from the exported params, without GUI
+    assert np.array_equal(frame, [2, 2])
+    assert message["pid"] != os.getpid()
+    assert message["gui"] is False
+
+
+def test_process_mode_without_worker_runs_inline():
+    _, node_step = get_step(PROCESS)
+    executor = NodeExecutor({})
+    frame, message = run(executor, node_step, np.zeros(2))
+    executor.shutdown()
+    assert np.array_equal(frame, [1, 1])
+    assert message["pid"] == os.getpid()
+
+
+def test_process_settings():
+    settings = {"fps": 30, "logger": object(), "camera_capture_list": [object()]}
+    assert get_process_settings(settings) == {
+        "fps": 30,
+        "gui": False,
+        "camera_capture_list": [],
+    }
+
+
+class SlowNode:
+    # Refresh takes delay seconds once
+    batch_aware = False
+
+    def __init__(self, delay):
+        self.delay = delay
+        self.event = threading.Event()
+
+    async def refresh(self, node_id, node_links, node_frames, node_messages):
+        frame = node_frames[node_links[0].source_node_tag]
+        if not self.event.is_set():
+            self.event.set()
+            time.sleep(self.delay)
+        return frame, None
+
+
+def get_slow_step(node, **kwargs):
+    plan = build_execution_plan(
+        {"1:webcam": [], "2:slow": ["1:webcam"]},
+        {"2:slow": [["1:webcam:1:0", "2:slow:1:0"]]},
+        {"webcam": None, "slow": node}.get,
+        **kwargs
+    )
+    return plan.steps["2:slow"]
+
+
+def test_get_node_timeout():
+    assert get_node_timeout({}) is None
+    assert get_node_timeout({}, default=2.0) == 2.0
+    assert get_node_timeout({"timeout": "0.5"}) == 0.5
+    assert get_node_timeout({"timeout": 0}) is None
+    assert get_node_timeout({"timeout": -1}) is None
+    assert get_node_timeout({"timeout": "never"}, default=1.0) == 1.0
+
+
+def test_default_timeout():
+    node_step = get_slow_step(SlowNode(0), default_timeout=0.5)
+    assert node_step.timeout == 0.5
+    node_step = get_slow_step(
+        SlowNode(0), node_timeouts={"2:slow": 0.1}, default_timeout=0.5
+    )
+    assert node_step.timeout == 0.1
+
+
+def test_timeout_does_not_stall_the_tick():
+    node = SlowNode(0.3)
+    node_step = get_slow_step(node, node_timeouts={"2:slow": 0.05})
+    stats = PipelineStats()
+    executor = NodeExecutor({}, stats)
+
+    async def run_ticks():
+        start_time = time.monotonic()
+        timed_out = await executor.run(node_step, {"1:webcam": 1}, {})
+        duration = time.monotonic() - start_time
+        while not executor.pending_futures[node_step.node_tag].done():
+            await asyncio.sleep(0.01)
+        recovered = await executor.run(node_step, {"1:webcam": 2}, {})
+        return timed_out, duration, recovered
+
+    timed_out, duration, recovered = asyncio.run(run_ticks())
+    executor.shutdown()
+    assert timed_out == (None, None)
+    assert duration < 0.3
+    assert recovered == (2, None)
+    assert executor.last_outputs[node_step.node_tag] == (2, None)
+    node_stats = stats.get_node(node_step.node_tag)
+    assert (node_stats.timeouts, node_stats.processed) == (1, 1)
@@ -0,0 +1,113 @@
+import asyncio
+
+import numpy as np
+
+from runtime.buffers import buffer_pool
+from runtime.executor import NodeExecutor
+from runtime.frame import (
+    FrameBatch,
+    FrameStamper,
+    get_frame_envelope,
+    get_shared_frame,
+    get_writable_frame,
+)
+from runtime.plan import build_execution_plan
+
+
+def test_shared_frame_is_a_read_only_view():
+    frame = np.zeros((2, 2, 3), dtype=np.uint8)
+    shared_frame = get_shared_frame(frame)
+    assert np.shares_memory(shared_frame, frame)
+    assert not shared_frame.flags.writeable
+    assert frame.flags.writeable
+    assert get_shared_frame(shared_frame) is shared_frame
+    assert get_shared_frame(None) is None
+    assert get_shared_frame([1, 2]) == [1, 2]
+
+
+def test_writable_frame_copies_on_write():
+    frame = np.zeros((2, 2, 3), dtype=np.uint8)
+    assert get_writable_frame(frame) is frame
+    shared_frame = get_shared_frame(frame)
+    writable_frame = get_writable_frame(shared_frame)
+    assert writable_frame.flags.writeable
+    assert not np.shares_memory(writable_frame, frame)
+    writable_frame[:] = 255
+    assert not frame.any()
+    buffer_pool.release(writable_frame)
+    buffer_pool.clear()
+
+
+class Node:
+    batch_aware = False
+
+    async def refresh(self, node_id, node_links, node_frames, node_messages):
+        if len(node_links) == 0:
+            return np.zeros((2, 2, 3), dtype=np.uint8), None
+        frame = node_frames[node_links[0].source_node_tag]
+        return frame + 1, None
+
+
+def test_stamper():
+    stamper = FrameStamper()
+    envelopes = [stamper.stamp(source_id, 1.0) for source_id in "aab"]
+    assert [e.sequence for e in envelopes] == [0, 1, 0]
+    assert envelopes[1].to_dict() == {
+        "sequence": 1,
+        "capture_time": 1.0,
+        "source_id": "a",
+    }
+    stamper.reset()
+    assert stamper.stamp("a", 2.0).sequence == 0
+
+
+def test_envelope_survives_numpy_operations():
+    envelope = FrameStamper().stamp("1:webcam", 1.0)
+    frame = get_shared_frame(np.zeros((4, 4, 3), dtype=np.uint8), envelope)
+    assert get_frame_envelope(frame[1:3]) is envelope
+    assert get_frame_envelope(frame.copy()) is envelope
+    assert get_frame_envelope(frame + 1) is envelope
+    assert get_frame_envelope(np.zeros(1)) is None
+
+
+def test_envelope_propagation():
+    plan = build_execution_plan(
+        {"1:webcam": [], "2:object_detection": ["1:webcam"]},
+        {"2:object_detection": [["1:webcam:1:0", "2:object_detection:1:0"]]},
+        {"webcam": Node(), "object_detection": Node()}.get,
+    )
+    executor = NodeExecutor({})
+
+    async def run_ticks():
+        node_frames = {}
+        envelopes = []
+        for _ in range(2):
+            for level in plan.levels:
+                for node_step in level:
+                    frame, _ = await executor.run(node_step, node_frames, {})
+                    node_frames[node_step.node_tag] = frame
+            envelopes.append(
+                [get_frame_envelope(node_frames[tag]) for tag in plan.steps]
+            )
+        return envelopes
+
+    envelopes = asyncio.run(run_ticks())
+    executor.shutdown()
+    # Sources stamp every frame, processors carry the envelope of their input
+    for sequence, (source_envelope, envelope) in enumerate(envelopes):
+        assert source_envelope.source_id == "1:webcam"
+        assert source_envelope.sequence == sequence
+        assert envelope is source_envelope
+
+
+def test_batch_envelopes():
+    executor = NodeExecutor({})
+    plan = build_execution_plan({"1:video_file": []}, {}, {"video_file": Node()}.get)
+    frames = executor.share_frame(
+        plan.steps["1:video_file"],
+        {},
+        FrameBatch([np.zeros(1), np.zeros(1)]),
+        1.0,
+    )
+    executor.shutdown()
+    assert [get_frame_envelope(frame).sequence for frame in frames] == [0, 1]
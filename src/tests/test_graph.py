@@ -0,0 +1,55 @@
+import numpy as np
+import pytest
+
+from models.common.preprocess import Preprocessor
+
+
+def get_image(height, width, seed=0):
+    return np.random.default_rng(seed).integers(
+        0, 256, (height, width, 3), dtype=np.uint8
+    )
+
+
+@pytest.mark.parametrize(
+    "layout, swap_rb, scale, dtype",
+    [
+        ("NCHW", False, None, np.float32),
+        ("NCHW", True, 1 / 255.0, np.float32),
+        ("NHWC", True, None, np.float32),
+        ("NHWC", False, 1 / 255.0, np.float16),
+    ],
+)
+def test_fold_preprocess(layout, swap_rb, scale, dtype):
+    onnx = pytest.importorskip("onnx")
+    ort = pytest.importorskip("onnxruntime")
+    from models.common.graph import fold_preprocess
+
+    elem_type = (
+        onnx.TensorProto.FLOAT if dtype == np.float32 else onnx.TensorProto.FLOAT16
+    )
+    shape = [1, 3, 48, 64] if layout == "NCHW" else [1, 48, 64, 3]
+    graph = onnx.helper.make_graph(
+        [onnx.helper.make_node("Identity", ["images"], ["output"])],
+        "identity",
+        [onnx.helper.make_tensor_value_info("images", elem_type, shape)],
+        [onnx.helper.make_tensor_value_info("output", elem_type, shape)],
+    )
+    model = onnx.helper.make_model(
+        graph, opset_imports=[onnx.helper.make_opsetid("", 13)]
+    )
+    model.ir_version = 8
+    model = fold_preprocess(model, layout=layout, swap_rb=swap_rb, scale=scale)
+    session = ort.InferenceSession(
+        model.SerializeToString(), providers=["CPUExecutionProvider"]
+    )
+    assert session.get_inputs()[0].type == "tensor(uint8)"
+    assert session.get_inputs()[0].shape == [1, 48, 64, 3]
+
+    image = get_image(96, 80)
+    raw, _ = Preprocessor((48, 64), layout="NHWC", dtype=np.uint8)([image])
+    expected, _ = Preprocessor(
+        (48, 64), layout=layout, swap_rb=swap_rb, scale=scale, dtype=dtype
+    )([image])
+    outputs = session.run(None, {session.get_inputs()[0].name: raw})[0]
+    assert outputs.dtype == dtype
+    assert np.array_equal(outputs, expected)
@@ -0,0 +1,38 @@
+import numpy as np
+
+from models.common.inference import run_batches
+
+
+class Session:
+    def __init__(self, batch_size=None):
+        self.batch_size = batch_size
+        self.sizes = []
+
+    def run(self, output_names, inputs):
+        images = inputs["images"]
+        if self.batch_size is not None:
+            assert len(images) == self.batch_size
+        self.sizes.append(len(images))
+        return [images * 2]
+
+
+def test_dynamic_batch():
+    session = Session()
+    inputs = np.arange(5, dtype=np.float32).reshape(5, 1)
+    assert np.array_equal(run_batches(session, "images", inputs), inputs * 2)
+    assert session.sizes == [5]
+
+
+def test_fixed_batch_pads_last_chunk():
+    session = Session(batch_size=4)
+    inputs = np.arange(10, dtype=np.float32).reshape(10, 1)
+    outputs = run_batches(session, "images", inputs, 4)
+    assert np.array_equal(outputs, inputs * 2)
+    assert session.sizes == [4, 4, 4]
+
+
+def test_fixed_batch_of_one():
+    session = Session(batch_size=1)
+    inputs = np.arange(3, dtype=np.float32).reshape(3, 1)
+    assert np.array_equal(run_batches(session, "images", inputs, 1), inputs * 2)
+    assert session.sizes == [1, 1, 1]
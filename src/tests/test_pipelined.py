@@ -0,0 +1,148 @@
+import time
+
+from runtime.pipelined import (
+    PROCESSORS,
+    SINKS,
+    SOURCES,
+    PipelinedScheduler,
+    build_stages,
+    get_node_stage,
+)
+from runtime.plan import build_execution_plan
+from runtime.rate import RateGate
+from runtime.stats import PipelineStats
+
+
+class Source:
+    def __init__(self, delay=0.0):
+        self.delay = delay
+        self.count = 0
+
+    async def refresh(self, node_id, node_links, node_frames, node_messages):
+        time.sleep(self.delay)
+        self.count += 1
+        return self.count, None
+
+
+class Processor:
+    async def refresh(self, node_id, node_links, node_frames, node_messages):
+        frame = node_frames[node_links[0].source_node_tag] * 10
+        return frame, frame
+
+
+class Sink:
+    def __init__(self):
+        self.frames = []
+
+    async def refresh(self, node_id, node_links, node_frames, node_messages):
+        self.frames.append(node_frames[node_links[0].source_node_tag])
+        return None, None
+
+
+Source.__module__ = "nodes.edge_ai_pipeline.sources.fake"
+Processor.__module__ = "nodes.edge_ai_pipeline.processors.fake"
+Sink.__module__ = "nodes.edge_ai_pipeline.sinks.fake"
+
+
+class Executor:
+    async def run(self, node_step, node_frames, node_messages, deadline=None):
+        return await node_step.refresh(
+            node_step.node_id, node_step.node_links, node_frames, node_messages
+        )
+
+
+NODE_REFRESH_GRAPH = {
+    "1:webcam": [],
+    "2:object_detection": ["1:webcam"],
+    "3:video_screen": ["2:object_detection"],
+}
+NODE_LINK_GRAPH = {
+    "2:object_detection": [["1:webcam:1:0", "2:object_detection:1:0"]],
+    "3:video_screen": [["2:object_detection:1:1", "3:video_screen:1:0"]],
+}
+
+
+def get_scheduler(nodes, queue_size=2):
+    plan = build_execution_plan(NODE_REFRESH_GRAPH, NODE_LINK_GRAPH, nodes.get)
+    settings = {"fps": 100, "pipelined_queue_size": queue_size}
+    stats = PipelineStats()
+    return PipelinedScheduler(settings, Executor(), RateGate(), stats), plan
+
+
+def wait_for(condition, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while not condition() and time.monotonic() < deadline:
+        time.sleep(0.01)
+    return condition()
+
+
+def test_node_stage():
+    assert get_node_stage(Source()) == SOURCES
+    assert get_node_stage(Processor()) == PROCESSORS
+    assert get_node_stage(Sink()) == SINKS
+
+
+def test_build_stages():
+    # A processor fed by a sink runs in the sinks stage
+    nodes = {"webcam": Source(), "video_screen": Sink(), "face_detection": Processor()}
+    plan = build_execution_plan(
+        {
+            "1:webcam": [],
+            "2:video_screen": ["1:webcam"],
+            "3:face_detection": ["2:video_screen"],
+        },
+        {
+            "2:video_screen": [["1:webcam:1:0", "2:video_screen:1:0"]],
+            "3:face_detection": [["2:video_screen:1:1", "3:face_detection:1:0"]],
+        },
+        nodes.get,
+    )
+    stages = [
+        (name, [[s.node_tag for s in level] for level in levels])
+        for name, levels in build_stages(plan)
+    ]
+    assert stages == [
+        ("sources", [["1:webcam"]]),
+        ("processors", []),
+        ("sinks", [["2:video_screen"], ["3:face_detection"]]),
+    ]
+
+
+def test_frames_flow_through_stages():
+    sink = Sink()
+    nodes = {"webcam": Source(), "object_detection": Processor(), "video_screen": sink}
+    pipelined, plan = get_scheduler(nodes)
+    pipelined.prepare(plan)
+    assert [thread.name for thread in pipelined.threads] == [
+        "wedx-stage-sources",
+        "wedx-stage-processors",
+        "wedx-stage-sinks",
+    ]
+    for _ in range(3):
+        assert wait_for(lambda: len(pipelined.queues[0].items) == 0)
+        assert pipelined.tick()
+    assert wait_for(lambda: len(sink.frames) == 3)
+    pipelined.stop()
+    assert sink.frames == [10, 20, 30]
+    # Frames are released once no later stage reads them, messages are kept
+    packet = pipelined.last_packet
+    assert packet.sequence == 2
+    assert packet.node_frames == {}
+    assert packet.node_messages["2:object_detection"] == 30
+    assert pipelined.threads == []
+
+
+def test_busy_sources_skip_ticks():
+    nodes = {
+        "webcam": Source(delay=0.2),
+        "object_detection": Processor(),
+        "video_screen": Sink(),
+    }
+    pipelined, plan = get_scheduler(nodes, queue_size=1)
+    pipelined.prepare(plan)
+    results = [pipelined.tick() for _ in range(5)]
+    pipelined.stop()
+    assert results[0] is True
+    assert False in results
+    assert pipelined.skipped_ticks == results.count(False)
+    assert pipelined.stats.get_node("1:webcam").dropped == pipelined.skipped_ticks
@@ -0,0 +1,118 @@
+import graphlib
+
+import pytest
+
+from runtime.executor import INLINE, THREAD
+from runtime.plan import EMPTY_PLAN, build_execution_plan, get_release_groups
+from runtime.rate import DEFAULT_RATE
+
+
+class Node:
+    async def refresh(self, node_id, node_links, node_frames, node_messages):
+        return None, None
+
+
+NODES = {
+    "webcam": Node(),
+    "object_detection": Node(),
+    "image_classification": Node(),
+    "video_screen": Node(),
+    "mqtt_client": Node(),
+}
+
+# Webcam feeds both processors, detection feeds a screen by video and
+# classification a client by message only
+NODE_REFRESH_GRAPH = {
+    "1:webcam": [],
+    "2:object_detection": ["1:webcam"],
+    "3:image_classification": ["1:webcam"],
+    "4:video_screen": ["2:object_detection"],
+    "5:mqtt_client": ["3:image_classification"],
+}
+NODE_LINK_GRAPH = {
+    "2:object_detection": [["1:webcam:1:0", "2:object_detection:1:0"]],
+    "3:image_classification": [["1:webcam:1:0", "3:image_classification:1:0"]],
+    "4:video_screen": [["2:object_detection:1:1", "4:video_screen:1:0"]],
+    "5:mqtt_client": [["3:image_classification:4:2", "5:mqtt_client:4:0"]],
+}
+
+
+def get_plan(**kwargs):
+    return build_execution_plan(
+        NODE_REFRESH_GRAPH, NODE_LINK_GRAPH, NODES.get, **kwargs
+    )
+
+
+def get_level_tags(plan):
+    return [[node_step.node_tag for node_step in level] for level in plan.levels]
+
+
+def test_levels():
+    plan = get_plan()
+    assert get_level_tags(plan) == [
+        ["1:webcam"],
+        ["2:object_detection", "3:image_classification"],
+        ["4:video_screen", "5:mqtt_client"],
+    ]
+    assert set(plan.steps) == set(NODE_REFRESH_GRAPH)
+
+
+def test_steps():
+    plan = get_plan(
+        node_executors={"2:object_detection": THREAD},
+        node_timeouts={"2:object_detection": 0.5},
+        default_timeout=1.0,
+    )
+    node_step = plan.steps["2:object_detection"]
+    assert node_step.node_id == "2"
+    assert node_step.node_name == "object_detection"
+    assert node_step.executor == THREAD
+    assert node_step.timeout == 0.5
+    assert node_step.rate == DEFAULT_RATE
+    assert node_step.node_links[0].source_node_tag == "1:webcam"
+    assert plan.steps["1:webcam"].executor == INLINE
+    assert plan.steps["1:webcam"].timeout == 1.0
+    link = plan.steps["5:mqtt_client"].node_links[0]
+    assert link.input_index is None
+    assert link.source_node_tag == "3:image_classification"
+
+
+def test_release_levels():
+    plan = get_plan()
+    assert plan.consumers == {
+        "1:webcam": frozenset(["2:object_detection", "3:image_classification"]),
+        "2:object_detection": frozenset(["4:video_screen"]),
+    }
+    assert plan.release_levels == (
+        (),
+        ("1:webcam", "3:image_classification"),
+        ("2:object_detection", "4:video_screen", "5:mqtt_client"),
+    )
+
+
+def test_release_groups():
+    consumers = {"a": frozenset(["b", "c"]), "b": frozenset(["c"])}
+    assert get_release_groups(consumers, [["a"], ["b"], ["c"]]) == (
+        (),
+        (),
+        ("a", "b", "c"),
+    )
+    assert get_release_groups(consumers, [["a", "b", "c"]]) == (("a", "b", "c"),)
+
+
+def test_unknown_node_is_skipped():
+    graph = dict(NODE_REFRESH_GRAPH, **{"6:unknown": ["1:webcam"]})
+    plan = build_execution_plan(graph, NODE_LINK_GRAPH, NODES.get)
+    assert "6:unknown" not in plan.steps
+    assert len(plan.levels) == 3
+
+
+def test_cycle():
+    graph = {"1:webcam": ["2:object_detection"], "2:object_detection": ["1:webcam"]}
+    with pytest.raises(graphlib.CycleError):
+        build_execution_plan(graph, {}, NODES.get)
+
+
+def test_empty_plan():
+    assert EMPTY_PLAN.levels == ()
+    assert EMPTY_PLAN.release_levels == ()
@@ -0,0 +1,90 @@
+import cv2 as cv
+import numpy as np
+
+from models.common.postprocess import batched_nms, decode_yolox, multiclass_nms
+
+# Two overlapping boxes, a box of its own and a box overlapping the first
+BOXES = np.array(
+    [
+        [0, 0, 10, 10],
+        [1, 1, 11, 11],
+        [50, 50, 60, 60],
+        [0, 0, 10, 9],
+    ],
+    dtype=np.float32,
+)
+SCORES = np.array(
+    [
+        [0.9, 0.1],
+        [0.2, 0.8],
+        [0.05, 0.6],
+        [0.7, 0.0],
+    ],
+    dtype=np.float32,
+)
+
+
+def test_class_agnostic():
+    boxes, scores, class_ids = multiclass_nms(BOXES, SCORES, 0.3, 0.45)
+    assert np.array_equal(boxes, BOXES[[0, 2]])
+    assert np.allclose(scores, [0.9, 0.6])
+    assert np.array_equal(class_ids, [0, 1])
+    assert boxes.dtype == np.float32
+    assert scores.dtype == np.float32
+    assert class_ids.dtype == np.int64
+
+
+def test_per_class():
+    boxes, scores, class_ids = multiclass_nms(
+        BOXES, SCORES, 0.3, 0.45, class_agnostic=False
+    )
+    assert np.array_equal(boxes, BOXES[[0, 1, 2]])
+    assert np.allclose(scores, [0.9, 0.8, 0.6])
+    assert np.array_equal(class_ids, [0, 1, 1])
+
+
+def test_score_threshold():
+    _, scores, _ = multiclass_nms(BOXES, SCORES, 0.65, 0.45, class_agnostic=False)
+    assert np.allclose(scores, [0.9, 0.8])
+
+
+def test_max_detections_after_nms():
+    boxes, _, _ = multiclass_nms(BOXES, SCORES, 0.3, 0.45, max_detections=1)
+    assert np.array_equal(boxes, BOXES[[0]])
+    keep = batched_nms(BOXES, SCORES[:, 0], iou_threshold=0.45, max_detections=2)
+    assert np.array_equal(keep, [0, 2])
+
+
+def test_no_detections():
+    boxes, scores, class_ids = multiclass_nms(BOXES, SCORES, 0.95, 0.45)
+    assert boxes.shape == (0, 4)
+    assert len(scores) == 0
+    assert len(class_ids) == 0
+    assert len(batched_nms(np.zeros((0, 4)), np.zeros(0))) == 0
+
+
+def test_batched_nms_by_class():
+    keep = batched_nms(BOXES[:2], [0.9, 0.8], [0, 1], iou_threshold=0.45)
+    assert np.array_equal(keep, [0, 1])
+    keep = batched_nms(BOXES[:2], [0.9, 0.8], [0, 0], iou_threshold=0.45)
+    assert np.array_equal(keep, [0])
+
+
+def test_batched_nms_without_opencv_batched(monkeypatch):
+    monkeypatch.delattr(cv.dnn, "NMSBoxesBatched", raising=False)
+    keep = batched_nms(BOXES, [0.9, 0.8, 0.6, 0.7], [0, 1, 1, 0], iou_threshold=0.45)
+    assert np.array_equal(keep, [0, 1, 2])
+
+
+def test_decode_yolox():
+    input_shape = (64, 64)
+    predictions = np.zeros((8 * 8 + 4 * 4 + 2 * 2, 7), dtype=np.float32)
+    predictions[:, 4] = 1.0
+    predictions[:, 5] = 0.5
+    boxes, scores = decode_yolox(predictions, input_shape)
+    assert boxes.shape == (84, 4)
+    assert np.allclose(boxes[0], [-4, -4, 4, 4])
+    assert np.allclose(boxes[9], [4, 4, 12, 12])
+    assert np.allclose(boxes[64], [-8, -8, 8, 8])
+    assert np.allclose(scores[:, 0], 0.5)
+    assert np.allclose(scores[:, 1], 0.0)
@@ -0,0 +1,91 @@
+import cv2 as cv
+import numpy as np
+
+from models.common.preprocess import Preprocessor
+
+
+def get_image(height, width, seed=0):
+    return np.random.default_rng(seed).integers(
+        0, 256, (height, width, 3), dtype=np.uint8
+    )
+
+
+def letterbox(image, input_size):
+    # Preprocessing of YOLOX Nano before the Preprocessor
+    padded_image = np.ones((input_size[0], input_size[1], 3), dtype=np.uint8) * 114
+    ratio = min(input_size[0] / image.shape[0], input_size[1] / image.shape[1])
+    resized_image = cv.resize(
+        image,
+        (int(image.shape[1] * ratio), int(image.shape[0] * ratio)),
+        interpolation=cv.INTER_LINEAR,
+    )
+    padded_image[
+        : int(image.shape[0] * ratio), : int(image.shape[1] * ratio)
+    ] = resized_image
+    return (
+        np.ascontiguousarray(padded_image.transpose(2, 0, 1), dtype=np.float32),
+        ratio,
+    )
+
+
+def resize_rgb(image, input_shape):
+    # Preprocessing of EfficientNet-B0 before the Preprocessor
+    return np.expand_dims(
+        cv.resize(
+            cv.cvtColor(image, cv.COLOR_BGR2RGB),
+            dsize=(input_shape[1], input_shape[0]),
+        ),
+        axis=0,
+    ).astype("float32")
+
+
+def test_letterbox():
+    preprocessor = Preprocessor((416, 416), letterbox=True)
+    images = [get_image(480, 640), get_image(360, 200, 1)]
+    inputs, ratios = preprocessor(images)
+    assert inputs.shape == (2, 3, 416, 416)
+    for index, image in enumerate(images):
+        expected, ratio = letterbox(image, (416, 416))
+        assert np.array_equal(inputs[index], expected)
+        assert ratios[index] == ratio
+
+
+def test_resize_rgb():
+    preprocessor = Preprocessor((224, 224), layout="NHWC", swap_rb=True)
+    image = get_image(480, 640)
+    inputs, ratios = preprocessor([image])
+    assert np.array_equal(inputs, resize_rgb(image, (224, 224)))
+    assert ratios == [None]
+
+
+def test_scale_and_dtype():
+    preprocessor = Preprocessor((64, 64), scale=1 / 255.0, dtype=np.float16)
+    image = get_image(100, 100)
+    inputs, _ = preprocessor([image])
+    expected = cv.resize(image, (64, 64)).transpose(2, 0, 1) * np.float16(1 / 255.0)
+    assert inputs.dtype == np.float16
+    assert np.array_equal(inputs[0], expected.astype(np.float16))
+
+
+def test_grayscale():
+    preprocessor = Preprocessor((32, 32), layout="NHWC", dtype=np.uint8)
+    image = get_image(64, 64)[..., 0]
+    inputs, _ = preprocessor([image])
+    expected = cv.resize(cv.cvtColor(image, cv.COLOR_GRAY2BGR), (32, 32))
+    assert np.array_equal(inputs[0], expected)
+
+
+def test_resolution_change_pads_again():
+    preprocessor = Preprocessor((64, 64), letterbox=True)
+    preprocessor([get_image(64, 64)])
+    image = get_image(32, 64, 1)
+    inputs, _ = preprocessor([image])
+    assert np.array_equal(inputs[0], letterbox(image, (64, 64))[0])
+
+
+def test_inputs_are_reused():
+    preprocessor = Preprocessor((32, 32))
+    first, _ = preprocessor([get_image(48, 48), get_image(48, 48, 1)])
+    second, _ = preprocessor([get_image(48, 48, 2)])
+    assert np.shares_memory(first, second)
+    assert len(second) == 1
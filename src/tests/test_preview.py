@@ -0,0 +1,111 @@
+import numpy as np
+
+from gui import preview
+from gui.preview import PreviewEngine
+
+
+def test_image_texture():
+    preview_engine = PreviewEngine()
+    image = np.zeros((4, 4, 3), dtype=np.uint8)
+    image[:, :, 2] = 255
+    texture = preview_engine.get_image_texture(image, 2, 2)
+    assert texture.dtype == np.float32
+    assert np.array_equal(texture.reshape(2, 2, 4)[0, 0], [1.0, 0.0, 0.0, 1.0])
+    gray = np.full((4, 4), 51, dtype=np.uint8)
+    texture = preview_engine.get_image_texture(gray, 2, 2)
+    assert np.allclose(texture.reshape(2, 2, 4)[0, 0], [0.2, 0.2, 0.2, 1.0])
+    bgra = np.zeros((4, 4, 4), dtype=np.uint8)
+    texture = preview_engine.get_image_texture(bgra, 2, 2)
+    assert np.array_equal(texture.reshape(2, 2, 4)[0, 0], [0.0, 0.0, 0.0, 0.0])
+
+
+def test_texture_buffers_are_cached():
+    preview_engine = PreviewEngine()
+    image = np.zeros((4, 4, 3), dtype=np.uint8)
+    texture = preview_engine.get_image_texture(image, 2, 2, "1:webcam")
+    buffer = preview_engine.textures["1:webcam"]
+    assert np.shares_memory(texture, buffer)
+    image[:] = 255
+    texture = preview_engine.get_image_texture(image, 2, 2, "1:webcam")
+    assert preview_engine.textures["1:webcam"] is buffer
+    assert texture.min() == 1.0
+    resized = preview_engine.get_image_texture(image, 3, 2, "1:webcam")
+    assert resized.size == 3 * 2 * 4
+    preview_engine.release("1:webcam")
+    assert preview_engine.textures == {}
+
+
+def test_blank_texture():
+    preview_engine = PreviewEngine()
+    blank_texture = preview_engine.get_blank_texture(2, 2)
+    assert preview_engine.get_blank_texture(2, 2) is blank_texture
+    assert np.array_equal(blank_texture.reshape(2, 2, 4)[1, 1], [0, 0, 0, 1])
+
+
+class Dpg:
+    # Items of the node editor, hidden ones are outside the editor view
+    def __init__(self, visible, hidden):
+        self.visible = visible
+        self.hidden = hidden
+        self.values = {}
+
+    def does_item_exist(self, item):
+        return item in self.visible or item in self.hidden
+
+    def is_item_visible(self, item):
+        return item in self.visible
+
+    def set_value(self, item, value):
+        self.values[item] = value
+
+
+def test_previews_are_throttled(monkeypatch):
+    dpg = Dpg({"1:webcam:image"}, set())
+    monkeypatch.setattr(preview, "dpg", dpg, raising=False)
+    preview_engine = PreviewEngine(fps=0.5)
+    image = np.zeros((4, 4, 3), dtype=np.uint8)
+    preview_engine.submit("1:webcam", image, 2, 2)
+    assert preview_engine.render() == 1
+    # Until the next preview update only the latest frame is kept
+    preview_engine.submit("1:webcam", image, 2, 2)
+    preview_engine.submit("1:webcam", image + 255, 2, 2)
+    assert preview_engine.render() == 0
+    assert len(preview_engine.pending) == 1
+    preview_engine.next_due = 0.0
+    assert preview_engine.render() == 1
+    assert dpg.values["1:webcam:texture"].min() == 1.0
+
+
+def test_hidden_previews_are_culled(monkeypatch):
+    dpg = Dpg({"1:webcam:image"}, {"2:video_file:image"})
+    monkeypatch.setattr(preview, "dpg", dpg, raising=False)
+    preview_engine = PreviewEngine()
+    image = np.zeros((4, 4, 3), dtype=np.uint8)
+    for key in ("1:webcam", "2:video_file", "3:deleted"):
+        preview_engine.submit(key, image, 2, 2)
+    assert preview_engine.render() == 1
+    assert list(dpg.values) == ["1:webcam:texture"]
+    assert list(preview_engine.textures) == ["1:webcam"]
+
+
+def test_headless_previews_are_skipped(monkeypatch):
+    # Without GUI Dear PyGui is never called
+    monkeypatch.setattr(preview, "dpg", None, raising=False)
+    preview_engine = PreviewEngine()
+    preview_engine.set_outputs(False)
+    assert not preview_engine.is_enabled()
+    preview_engine.submit("1:webcam", np.zeros((4, 4, 3), dtype=np.uint8), 2, 2)
+    assert preview_engine.pending == {}
+    assert preview_engine.render() == 0
+
+
+def test_headless_web_thumbnails(monkeypatch):
+    monkeypatch.setattr(preview, "dpg", None, raising=False)
+    preview_engine = PreviewEngine()
+    preview_engine.set_outputs(False, web_thumbnails=True, jpeg_quality=50)
+    preview_engine.submit("1:webcam", np.zeros((4, 4, 3), dtype=np.uint8), 2, 2)
+    assert preview_engine.render() == 0
+    assert preview_engine.get_thumbnail("1:webcam").startswith(b"\xff\xd8")
+    assert preview_engine.textures == {}
+    preview_engine.set_outputs(False)
+    assert preview_engine.get_thumbnail("1:webcam") is None
@@ -0,0 +1,173 @@
+import asyncio
+import time
+
+from runtime.backpressure import KEEP_LATEST
+from runtime.plan import build_execution_plan
+from runtime.push import PushScheduler, get_downstream_levels
+from runtime.rate import RateGate
+from runtime.stats import PipelineStats
+
+
+class Source:
+    def __init__(self):
+        self.count = 0
+
+    async def refresh(self, node_id, node_links, node_frames, node_messages):
+        self.count += 1
+        return self.count, None
+
+
+Source.__module__ = "nodes.edge_ai_pipeline.sources.fake"
+
+
+class Processor:
+    def __init__(self, delay=0.0):
+        self.delay = delay
+        self.frames = []
+
+    async def refresh(self, node_id, node_links, node_frames, node_messages):
+        time.sleep(self.delay)
+        frame = node_frames.get(node_links[0].source_node_tag, None)
+        self.frames.append(frame)
+        return frame, None
+
+
+class Executor:
+    async def run(self, node_step, node_frames, node_messages, deadline=None):
+        return await node_step.refresh(
+            node_step.node_id, node_step.node_links, node_frames, node_messages
+        )
+
+
+NODE_REFRESH_GRAPH = {
+    "1:webcam": [],
+    "2:video_file": [],
+    "3:object_detection": ["1:webcam"],
+    "4:image_classification": ["3:object_detection"],
+}
+NODE_LINK_GRAPH = {
+    "3:object_detection": [["1:webcam:1:0", "3:object_detection:1:0"]],
+    "4:image_classification": [
+        ["3:object_detection:1:1", "4:image_classification:1:0"]
+    ],
+}
+
+
+def get_scheduler(nodes, **kwargs):
+    plan = build_execution_plan(
+        NODE_REFRESH_GRAPH, NODE_LINK_GRAPH, nodes.get, **kwargs
+    )
+    settings = {"fps": 100, "state": "active"}
+    return PushScheduler(settings, Executor(), RateGate(), PipelineStats()), plan
+
+
+def wait_for(condition, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while not condition() and time.monotonic() < deadline:
+        time.sleep(0.01)
+    return condition()
+
+
+def test_downstream_levels():
+    nodes = {
+        "webcam": Source(),
+        "video_file": Source(),
+        "object_detection": Processor(),
+        "image_classification": Processor(),
+    }
+    plan = build_execution_plan(NODE_REFRESH_GRAPH, NODE_LINK_GRAPH, nodes.get)
+    levels = get_downstream_levels(plan, NODE_REFRESH_GRAPH, "1:webcam")
+    assert [[step.node_tag for step in level] for level in levels] == [
+        ["3:object_detection"],
+        ["4:image_classification"],
+    ]
+    assert get_downstream_levels(plan, NODE_REFRESH_GRAPH, "2:video_file") == ()
+
+
+def test_frames_are_pushed_downstream():
+    processor = Processor()
+    nodes = {
+        "webcam": Source(),
+        "video_file": Source(),
+        "object_detection": Processor(),
+        "image_classification": processor,
+    }
+    push, plan = get_scheduler(nodes)
+    push.prepare(plan, NODE_REFRESH_GRAPH)
+    assert len(push.threads) == 2
+    assert wait_for(lambda: len(processor.frames) >= 3)
+    push.stop()
+    assert processor.frames[:3] == [1, 2, 3]
+    assert push.threads == []
+
+
+def test_stop_does_not_wait():
+    processor = Processor(delay=0.5)
+    nodes = {
+        "webcam": Source(),
+        "video_file": Source(),
+        "object_detection": processor,
+        "image_classification": Processor(),
+    }
+    push, plan = get_scheduler(nodes)
+    push.prepare(plan, NODE_REFRESH_GRAPH)
+    threads = list(push.threads)
+    assert wait_for(lambda: nodes["webcam"].count > 0)
+    start_time = time.monotonic()
+    push.stop(wait=False)
+    assert time.monotonic() - start_time < 0.1
+    for thread in threads:
+        thread.join(5)
+        assert not thread.is_alive()
+
+
+def test_new_plan_keeps_node_locks():
+    nodes = {
+        "webcam": Source(),
+        "video_file": Source(),
+        "object_detection": Processor(),
+        "image_classification": Processor(),
+    }
+    push, plan = get_scheduler(nodes)
+    push.prepare(plan, NODE_REFRESH_GRAPH)
+    lock = push.node_locks["3:object_detection"]
+    stop_event = push.stop_event
+    _, new_plan = get_scheduler(nodes)
+    push.prepare(new_plan, NODE_REFRESH_GRAPH)
+    assert stop_event.is_set()
+    assert not push.stop_event.is_set()
+    assert push.node_locks["3:object_detection"] is lock
+    push.stop()
+    assert push.threads == []
+
+
+def test_busy_node_keeps_latest_frame():
+    processor = Processor()
+    nodes = {
+        "webcam": Source(),
+        "video_file": Source(),
+        "object_detection": processor,
+        "image_classification": Processor(),
+    }
+    push, plan = get_scheduler(
+        nodes, node_input_policies={"3:object_detection": KEEP_LATEST}
+    )
+    # Plan a paused scheduler, the test drives the refreshes
+    push.settings["state"] = "paused"
+    push.prepare(plan, NODE_REFRESH_GRAPH)
+    push.stop()
+    node_step = plan.steps["3:object_detection"]
+    lock = push.node_locks[node_step.node_tag]
+
+    async def refresh(frame):
+        push.node_frames["1:webcam"] = frame
+        return await push._refresh(node_step, frame, None)
+
+    # Another source is refreshing the node, frames do not wait for it
+    lock.acquire()
+    assert asyncio.run(refresh(1)) is None
+    assert asyncio.run(refresh(2)) is None
+    lock.release()
+    assert asyncio.run(refresh(3)) == 3
+    assert processor.frames == [3]
+    assert push.stats.get_node(node_step.node_tag).dropped == 2
@@ -0,0 +1,66 @@
+import pytest
+
+from runtime.plan import NodeStep
+from runtime.rate import DEFAULT_RATE, NodeRate, RateGate, get_node_rate
+
+
+def get_step(node_tag, rate):
+    return NodeStep(
+        node_tag=node_tag,
+        node_id=node_tag.split(":")[0],
+        node_name=node_tag.split(":")[1],
+        node_instance=None,
+        node_links=(),
+        refresh=None,
+        executor=None,
+        rate=rate,
+        input_policy=None,
+        timeout=None,
+    )
+
+
+def test_get_node_rate():
+    assert get_node_rate({}) == DEFAULT_RATE
+    assert get_node_rate({"target_fps": "5", "tick_divisor": 3}) == NodeRate(5.0, 3)
+    assert get_node_rate({"target_fps": -1, "tick_divisor": 0}) == NodeRate(None, 1)
+    assert get_node_rate({"tick_divisor": "x"}) == DEFAULT_RATE
+
+
+def test_rate_gate_divisor():
+    rate_gate = RateGate()
+    node_step = get_step("2:object_detection", NodeRate(None, 3))
+    due = [rate_gate.is_due(node_step, sequence, 0.0) for sequence in range(7)]
+    assert due == [True, False, False, True, False, False, True]
+
+
+def test_rate_gate_target_fps():
+    rate_gate = RateGate()
+    node_step = get_step("2:object_detection", NodeRate(10.0, 1))
+    assert rate_gate.is_due(node_step, 0, 0.0)
+    assert not rate_gate.is_due(node_step, 1, 0.05)
+    assert rate_gate.is_due(node_step, 2, 0.1)
+    # A late refresh keeps the grid, a refresh a period late resyncs
+    assert rate_gate.is_due(node_step, 3, 0.25)
+    assert rate_gate.next_due[node_step.node_tag] == pytest.approx(0.3)
+    assert rate_gate.is_due(node_step, 4, 1.0)
+    assert rate_gate.next_due[node_step.node_tag] == pytest.approx(1.1)
+
+
+def test_rate_gate_skipped_outputs():
+    rate_gate = RateGate()
+    default_step = get_step("1:webcam", DEFAULT_RATE)
+    node_step = get_step("2:object_detection", NodeRate(None, 2))
+    node_frames = {}
+    node_messages = {}
+    level = (default_step, node_step)
+    assert rate_gate.get_due_steps(level, 0, node_frames, node_messages) == [
+        default_step,
+        node_step,
+    ]
+    rate_gate.set_output(node_step, "frame", "message")
+    rate_gate.set_output(default_step, "frame", "message")
+    assert rate_gate.get_due_steps(level, 1, node_frames, node_messages) == [
+        default_step
+    ]
+    assert node_frames == {node_step.node_tag: "frame"}
+    assert node_messages == {node_step.node_tag: "message"}
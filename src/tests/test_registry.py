@@ -0,0 +1,201 @@
+import threading
+import time
+
+import numpy as np
+import pytest
+
+from runtime.registry import LockedModel, ModelRegistry, get_model_key
+
+
+class Model:
+    def __init__(self, size=1024):
+        self.weights = np.zeros(size, dtype=np.uint8)
+
+
+class OtherModel(Model):
+    pass
+
+
+def get_loader(loads, size=1024):
+    def loader():
+        loads.append(size)
+        return Model(size)
+
+    return loader
+
+
+def get_key(name):
+    return get_model_key(Model, name)
+
+
+def test_get_model_key():
+    assert get_model_key(Model, "a.onnx") == get_model_key(Model, "./a.onnx")
+    assert get_model_key(Model) != get_model_key(OtherModel)
+    assert get_model_key(Model, providers=["CPUExecutionProvider"])[2] == (
+        "CPUExecutionProvider",
+    )
+
+
+def test_shared_model():
+    loads = []
+    registry = ModelRegistry()
+    model = registry.acquire("1:object_detection", get_key("a"), get_loader(loads))
+    assert registry.acquire("2:object_detection", get_key("a"), get_loader(loads))
+    assert registry.get("2:object_detection") is model
+    assert loads == [1024]
+    assert registry.get_references("1:object_detection") == 2
+    assert registry.get_references("3:object_detection") == 0
+
+
+def test_reacquire_same_key():
+    registry = ModelRegistry()
+    registry.acquire("1:object_detection", get_key("a"), Model)
+    registry.acquire("1:object_detection", get_key("a"), Model)
+    assert registry.get_references("1:object_detection") == 1
+
+
+def test_release_discard():
+    registry = ModelRegistry(budget=4096)
+    registry.acquire("1:object_detection", get_key("a"), Model)
+    registry.release("1:object_detection", discard=True)
+    assert registry.models == {}
+
+
+def test_acquire_other_key_releases():
+    registry = ModelRegistry(budget=0)
+    registry.acquire("1:object_detection", get_key("a"), Model)
+    registry.acquire("1:object_detection", get_key("b"), Model)
+    assert get_key("a") not in registry.models
+    assert registry.get_references("1:object_detection") == 1
+
+
+def test_release_keeps_within_budget():
+    loads = []
+    registry = ModelRegistry(budget=4096)
+    registry.acquire("1:object_detection", get_key("a"), get_loader(loads))
+    registry.release("1:object_detection")
+    assert registry.get_references("1:object_detection") == 0
+    assert get_key("a") in registry.idle
+    registry.acquire("2:object_detection", get_key("a"), get_loader(loads))
+    assert loads == [1024]
+    assert get_key("a") not in registry.idle
+
+
+def test_lru_eviction():
+    registry = ModelRegistry(budget=3072)
+    for index, name in enumerate(["a", "b", "c"]):
+        registry.acquire(str(index) + ":object_detection", get_key(name), Model)
+    for index in range(3):
+        registry.release(str(index) + ":object_detection")
+    assert list(registry.idle) == [get_key("a"), get_key("b"), get_key("c")]
+
+    # A used model moves to the back and the least recently used one goes
+    registry.acquire("4:object_detection", get_key("a"), Model)
+    registry.release("4:object_detection")
+    registry.acquire("5:object_detection", get_key("d"), Model)
+    assert set(registry.models) == set([get_key("a"), get_key("c"), get_key("d")])
+    registry.set_budget(1024)
+    assert set(registry.models) == set([get_key("d")])
+
+
+def test_referenced_models_are_kept():
+    registry = ModelRegistry(budget=0)
+    registry.acquire("1:object_detection", get_key("a"), Model)
+    registry.acquire("2:object_detection", get_key("b"), Model)
+    registry.release("2:object_detection")
+    assert set(registry.models) == set([get_key("a")])
+    registry.clear()
+    assert set(registry.models) == set([get_key("a")])
+    stats = registry.get_stats()
+    assert stats[0]["references"] == 1
+    assert stats[0]["bytes"] == 1024
+    assert not stats[0]["idle"]
+
+
+def test_get_references_of_peers():
+    registry = ModelRegistry()
+    for owner in ("1:object_detection", "2:object_detection", "3:object_detection"):
+        registry.acquire(owner, get_key("a"), Model)
+    registry.acquire("4:object_detection", get_key("b"), Model)
+    peers = ["1:object_detection", "2:object_detection", "4:object_detection"]
+    assert registry.get_references("1:object_detection", peers) == 2
+    assert registry.get_references("4:object_detection", peers) == 1
+
+
+def test_load_outside_lock():
+    registry = ModelRegistry()
+    started = threading.Event()
+    finish = threading.Event()
+    loads = []
+
+    def slow_loader():
+        loads.append("a")
+        started.set()
+        finish.wait(5)
+        return Model()
+
+    owners = ["1:object_detection", "2:object_detection"]
+    threads = [
+        threading.Thread(
+            target=registry.acquire, args=(owner, get_key("a"), slow_loader)
+        )
+        for owner in owners
+    ]
+    threads[0].start()
+    started.wait(5)
+    threads[1].start()
+
+    # Another model is handed out while the first one is still loading
+    assert registry.acquire("3:object_detection", get_key("b"), Model)
+    assert get_key("a") in registry.loading
+    finish.set()
+    for thread in threads:
+        thread.join(5)
+    assert loads == ["a"]
+    assert registry.get_references("1:object_detection") == 2
+    assert registry.get("1:object_detection") is registry.get("2:object_detection")
+
+
+def test_failed_load():
+    registry = ModelRegistry()
+
+    def failing_loader():
+        raise RuntimeError("load failed")
+
+    with pytest.raises(RuntimeError):
+        registry.acquire("1:object_detection", get_key("a"), failing_loader)
+    assert registry.loading == {}
+    assert registry.get("1:object_detection") is None
+    assert registry.acquire("1:object_detection", get_key("a"), Model)
+
+
+class SafeModel(Model):
+    thread_safe = True
+
+
+class SlowModel:
+    def __init__(self):
+        self.active = 0
+        self.overlaps = 0
+
+    def __call__(self, image):
+        self.active += 1
+        self.overlaps += self.active > 1
+        time.sleep(0.01)
+        self.active -= 1
+        return image
+
+
+def test_shared_models_are_locked():
+    registry = ModelRegistry()
+    model = registry.acquire("1:face_detection", get_key("a"), SlowModel)
+    assert isinstance(model, LockedModel)
+    assert not hasattr(model, "batch")
+    threads = [threading.Thread(target=model, args=(index,)) for index in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join(5)
+    assert model.overlaps == 0
+    model = registry.acquire("2:object_detection", get_model_key(SafeModel), SafeModel)
+    assert isinstance(model, SafeModel)
@@ -0,0 +1,148 @@
+import os
+
+import numpy as np
+import pytest
+
+from runtime import sessions
+from runtime.sessions import SessionFactory, get_cpu_list, load_model
+
+
+def save_model(path):
+    onnx = pytest.importorskip("onnx")
+    graph = onnx.helper.make_graph(
+        [onnx.helper.make_node("Relu", ["x"], ["y"])],
+        "relu",
+        [onnx.helper.make_tensor_value_info("x", onnx.TensorProto.FLOAT, [1, 4])],
+        [onnx.helper.make_tensor_value_info("y", onnx.TensorProto.FLOAT, [1, 4])],
+    )
+    model = onnx.helper.make_model(
+        graph, opset_imports=[onnx.helper.make_opsetid("", 13)]
+    )
+    model.ir_version = 8
+    onnx.save(model, path)
+    return str(path)
+
+
+def test_get_cpu_list():
+    assert get_cpu_list(None) == []
+    assert get_cpu_list(2) == [2]
+    assert get_cpu_list([1, 3]) == [1, 3]
+    assert get_cpu_list("0,2-4") == [0, 2, 3, 4]
+
+
+def test_pinned_session_after_unpinned(tmp_path):
+    pytest.importorskip("onnxruntime")
+    unpinned_path = save_model(tmp_path / "unpinned.onnx")
+    pinned_path = save_model(tmp_path / "pinned.onnx")
+    factory = SessionFactory({"global_thread_pools": True})
+    factory.set_cpu_affinity({"pinned.onnx": [0]})
+    x = np.array([[-1.0, 0.0, 1.0, 2.0]], dtype=np.float32)
+    for path in (unpinned_path, pinned_path):
+        session = factory(path, providers=["CPUExecutionProvider"])
+        y = session.run(None, {"x": x})[0]
+        assert np.array_equal(y, np.maximum(x, 0))
+    assert factory.global_thread_pools is False
+
+
+def test_single_cpu_is_pinned():
+    pytest.importorskip("onnxruntime")
+    factory = SessionFactory()
+    factory.set_cpu_affinity({"pinned.onnx": "0"})
+    options = factory.get_session_options(os.path.join("models", "pinned.onnx"))
+    assert options.intra_op_num_threads == 2
+    assert options.get_session_config_entry("session.intra_op_thread_affinities") == "1"
+    options = factory.get_session_options("unpinned.onnx")
+    assert options.intra_op_num_threads == 0
+
+
+def test_pinned_node_keeps_global_thread_pools(monkeypatch):
+    ort = pytest.importorskip("onnxruntime")
+    sizes = []
+    # Record the sizes, global pools would outlive the test in this process
+    monkeypatch.setattr(
+        ort.capi._pybind_state,
+        "set_global_thread_pool_sizes",
+        lambda intra, inter: sizes.append((intra, inter)),
+        raising=False,
+    )
+    factory = SessionFactory({"global_thread_pools": True})
+    factory.set_cpu_affinity({"3:object_detection": [0]})
+    options = factory.get_session_options("model.onnx")
+    assert sizes == [(0, 0)]
+    assert options.use_per_session_threads is False
+    factory = SessionFactory({"global_thread_pools": True})
+    factory.set_cpu_affinity({"3:object_detection": [0], "pinned.onnx": [1]})
+    factory.get_session_options("model.onnx")
+    assert factory.global_thread_pools is False
+    assert len(sizes) == 1
+
+
+def test_session_profile():
+    ort = pytest.importorskip("onnxruntime")
+    factory = SessionFactory(
+        {
+            "graph_optimization_level": "basic",
+            "execution_mode": "parallel",
+            "intra_op_num_threads": 2,
+            "enable_mem_pattern": False,
+        }
+    )
+    options = factory.get_session_options("model.onnx")
+    level = ort.GraphOptimizationLevel.ORT_ENABLE_BASIC
+    assert options.graph_optimization_level == level
+    assert options.execution_mode == ort.ExecutionMode.ORT_PARALLEL
+    assert options.intra_op_num_threads == 2
+    assert options.enable_mem_pattern is False
+    assert options.enable_cpu_mem_arena is True
+    factory.set_profile({"graph_optimization_level": "unknown"})
+    options = factory.get_session_options("model.onnx")
+    assert options.graph_optimization_level == ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+
+
+def test_optimized_model_cache(tmp_path):
+    pytest.importorskip("onnxruntime")
+    model_path = save_model(tmp_path / "relu.onnx")
+    cache_directory = tmp_path / "cache"
+    factory = SessionFactory({"optimized_model_directory": str(cache_directory)})
+    providers = ["CPUExecutionProvider"]
+    cache_path = factory.get_cache_path(model_path, providers)
+    assert cache_path.startswith(str(cache_directory))
+    assert factory.get_cache_path(model_path, []) != cache_path
+    x = np.array([[-1.0, 0.0, 1.0, 2.0]], dtype=np.float32)
+    for _ in range(2):
+        session = factory(model_path, providers=providers)
+        assert np.array_equal(session.run(None, {"x": x})[0], np.maximum(x, 0))
+        assert os.path.exists(cache_path)
+    # A broken cache file is replaced
+    with open(cache_path, "wb") as fp:
+        fp.write(b"broken")
+    session = factory(model_path, providers=providers)
+    assert np.array_equal(session.run(None, {"x": x})[0], np.maximum(x, 0))
+    assert os.path.getsize(cache_path) > len(b"broken")
+    assert SessionFactory().get_cache_path(model_path, providers) is None
+
+
+def test_model_hash_is_computed_once(tmp_path, monkeypatch):
+    model_path = tmp_path / "model.onnx"
+    model_path.write_bytes(b"model")
+    hashes = []
+    monkeypatch.setattr(
+        sessions, "get_file_hash", lambda path: hashes.append(path) or "hash"
+    )
+    factory = SessionFactory()
+    assert factory.get_model_hash(str(model_path)) == "hash"
+    assert factory.get_model_hash(str(model_path)) == "hash"
+    assert len(hashes) == 1
+
+
+def test_load_model():
+    class Model:
+        def __init__(self, session_factory=None):
+            self.session_factory = session_factory
+
+    class OtherModel:
+        def __init__(self, score_th=0.5):
+            self.score_th = score_th
+
+    assert load_model(Model).session_factory is sessions.session_factory
+    assert load_model(OtherModel, score_th=0.3).score_th == 0.3
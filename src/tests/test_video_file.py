@@ -0,0 +1,81 @@
+import asyncio
+
+import cv2
+import numpy as np
+
+from gui.preview import preview_engine
+from nodes.edge_ai_pipeline.sources.video_file import EdgeAINode
+from runtime.buffers import buffer_pool
+from runtime.frame import FrameBatch
+
+NODE_TAG = "1:video_file"
+
+
+def get_node(tmp_path, **params):
+    # Headless node playing a video of 5 frames of values 0, 40, ..., 160
+    path = str(tmp_path / "video.avi")
+    writer = cv2.VideoWriter(path, cv2.VideoWriter_fourcc(*"MJPG"), 10, (8, 6))
+    for index in range(5):
+        writer.write(np.full((6, 8, 3), index * 40, dtype=np.uint8))
+    writer.release()
+    node = EdgeAINode({"gui": False, "node_width": 4, "node_height": 3})
+    node.add_node(None, 1, [0, 0])
+    node.set_import_params(1, dict(params, video_filepath=path))
+    return node, path
+
+
+def refresh(node):
+    return asyncio.run(node.refresh(1, [], {}, {}))
+
+
+def get_index(frame):
+    return int(round(frame.mean() / 40))
+
+
+def test_frames_are_read_into_pooled_buffers(tmp_path, monkeypatch):
+    monkeypatch.setattr(preview_engine, "gui", False)
+    node, path = get_node(tmp_path)
+    frames = []
+    for _ in range(6):
+        frame, message = refresh(node)
+        assert buffer_pool.get_buffer(frame) is frame
+        frames.append(get_index(frame))
+        buffer_pool.release(frame)
+    # The video loops by default
+    assert frames == [0, 1, 2, 3, 4, 0]
+    assert message[0]["image"] == {"source": path, "width": 8.0, "height": 6.0}
+    buffer_pool.clear()
+
+
+def test_skip_rate_returns_skipped_buffers(tmp_path, monkeypatch):
+    monkeypatch.setattr(preview_engine, "gui", False)
+    node, _ = get_node(tmp_path, skiprate=2, loop=False)
+    frame, _ = refresh(node)
+    assert get_index(frame) == 1
+    # The buffer of the skipped frame is read into again
+    assert buffer_pool.get_stats()["leased"] == 1
+    assert buffer_pool.get_stats()["buffers"] == 0
+    buffer_pool.release(frame)
+    frame, _ = refresh(node)
+    assert get_index(frame) == 3
+    buffer_pool.release(frame)
+    # The end of a video without loop stops the node
+    assert refresh(node) == (None, None)
+    assert NODE_TAG not in node.configs["video_captures"]
+    buffer_pool.clear()
+
+
+def test_micro_batch(tmp_path, monkeypatch):
+    monkeypatch.setattr(preview_engine, "gui", False)
+    node, _ = get_node(tmp_path, batchsize=3, loop=False)
+    frames, messages = refresh(node)
+    assert isinstance(frames, FrameBatch) and isinstance(messages, FrameBatch)
+    assert [get_index(frame) for frame in frames] == [0, 1, 2]
+    assert len(messages) == 3
+    buffer_pool.release(frames)
+    # A batch ends with the video
+    frames, messages = refresh(node)
+    assert [get_index(frame) for frame in frames] == [3, 4]
+    assert len(messages) == 2
+    buffer_pool.release(frames)
+    buffer_pool.clear()
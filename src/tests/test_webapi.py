@@ -0,0 +1,64 @@
+import numpy as np
+import pytest
+
+pytest.importorskip("flask")
+pytest.importorskip("flasgger")
+pytest.importorskip("zmq")
+
+from servers import webapi
+
+WORKERS = [
+    {"name": "wedx-0", "mq_port": 5600, "shm_name": "wedx_shm_0"},
+    {"name": "wedx-1", "mq_port": 5601, "shm_name": "wedx_shm_1"},
+]
+
+
+@pytest.fixture
+def requests(monkeypatch):
+    requests = []
+
+    async def client(port=5555, message=None, timeout=None):
+        requests.append((port, message["method"]))
+        if message["method"] == "get_thumbnail":
+            return None
+        return "done"
+
+    monkeypatch.setattr(webapi.mq, "client", client)
+    monkeypatch.setattr(webapi, "web_workers", WORKERS)
+    monkeypatch.setattr(
+        webapi, "shared_frames", [np.zeros((4, 4, 3), dtype=np.uint8)] * 2
+    )
+    return requests
+
+
+def test_default_worker(requests):
+    response = webapi.app.test_client().post("/startpipeline")
+    assert response.status_code == 200
+    assert requests == [(5600, "start_pipeline")]
+
+
+def test_worker_query(requests):
+    client = webapi.app.test_client()
+    assert client.post("/stoppipeline?worker=1").status_code == 200
+    assert client.get("/pipelinestats?worker=1").status_code == 200
+    assert requests == [(5601, "stop_pipeline"), (5601, "get_pipeline_stats")]
+
+
+def test_unknown_worker(requests):
+    client = webapi.app.test_client()
+    assert client.post("/startpipeline?worker=2").status_code == 404
+    assert client.post("/startpipeline?worker=-1").status_code == 404
+    assert client.get("/workers/2/video_feed").status_code == 404
+    assert requests == []
+
+
+def test_all_workers(requests):
+    response = webapi.app.test_client().post("/workers/startpipeline")
+    assert response.get_json() == {"wedx-0": "done", "wedx-1": "done"}
+    assert requests == [(5600, "start_pipeline"), (5601, "start_pipeline")]
+
+
+def test_missing_thumbnail(requests):
+    response = webapi.app.test_client().get("/thumbnail/1:webcam?worker=1")
+    assert response.status_code == 404
+    assert requests == [(5601, "get_thumbnail")]
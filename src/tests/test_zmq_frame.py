@@ -0,0 +1,69 @@
+import struct
+
+import numpy as np
+import pytest
+
+pytest.importorskip("zmq")
+
+from links.zmq_frame.link import (
+    ENCODING_JPEG,
+    ENCODING_RAW,
+    HEADER,
+    decode_frame,
+    encode_frame,
+)
+
+
+def get_frame():
+    frame = np.zeros((48, 64, 3), dtype=np.uint8)
+    frame[:, :32] = (255, 128, 0)
+    return frame
+
+
+def test_raw():
+    frame = get_frame()
+    message = [{"class_id": np.int64(1), "score": np.float32(0.5)}]
+    parts = encode_frame(frame, message, 7, encoding=ENCODING_RAW)
+    decoded_frame, decoded_message, sequence, timestamp = decode_frame(parts)
+    assert np.array_equal(decoded_frame, frame)
+    assert decoded_message == [{"class_id": 1, "score": 0.5}]
+    assert sequence == 7
+    assert timestamp > 0
+
+
+def test_raw_grayscale():
+    frame = get_frame()[..., 0]
+    parts = encode_frame(frame, None, 1, encoding=ENCODING_RAW)
+    decoded_frame, decoded_message, _, _ = decode_frame(parts)
+    assert np.array_equal(decoded_frame, frame)
+    assert decoded_message is None
+
+
+def test_jpeg():
+    frame = get_frame()
+    parts = encode_frame(frame, {"fps": 30}, 2, encoding=ENCODING_JPEG)
+    decoded_frame, decoded_message, sequence, _ = decode_frame(parts)
+    assert decoded_frame.shape == frame.shape
+    assert np.abs(decoded_frame.astype(int) - frame).mean() < 2
+    assert decoded_message == {"fps": 30}
+    assert sequence == 2
+
+
+def test_no_frame():
+    parts = encode_frame(None, {"fps": 30}, 3)
+    decoded_frame, decoded_message, _, _ = decode_frame(parts)
+    assert decoded_frame is None
+    assert decoded_message == {"fps": 30}
+
+
+def test_malformed():
+    header, payload, message = encode_frame(get_frame(), {}, 4, encoding=ENCODING_RAW)
+    version = struct.pack("!B", 99) + header[1:]
+    assert decode_frame([header, payload]) is None
+    assert decode_frame([header[:-1], payload, message]) is None
+    assert decode_frame([version, payload, message]) is None
+    assert decode_frame([header, payload[:-1], message]) is None
+    assert decode_frame([header, payload, b"{"]) is None
+    assert decode_frame([header, payload, b"\xff"]) is None
+    jpeg_header = HEADER.pack(1, ENCODING_JPEG, 3, 48, 64, 4, 0.0)
+    assert decode_frame([jpeg_header, b"not a jpeg", message]) is None